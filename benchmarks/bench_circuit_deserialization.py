@@ -0,0 +1,55 @@
+"""
+Times sequence_to_quasar (the decoder used for qio.loader and
+circuit_in_basis results) against the former add_gate-based decoder
+for circuits of 10^3 to 10^6 gates.
+
+    python benchmarks/bench_circuit_deserialization.py
+"""
+import argparse
+from quasar import Circuit
+from qcware.util.serialize_quasar import (quasar_to_list,
+                                          sequence_to_quasar, make_gate)
+from bench_circuit_serialization import random_circuit, best_of
+
+
+def add_gate_sequence_to_quasar(s) -> Circuit:
+    "The previous decoder, which went through Circuit.add_gate per gate"
+    result = Circuit()
+    for instruction in s:
+        gate = make_gate(instruction['gate'], instruction['parameters'])
+        result.add_gate(gate,
+                        tuple(instruction['bits']),
+                        times=tuple(instruction['times']))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ngate',
+                        type=int,
+                        nargs='+',
+                        default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--nqubit', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument(
+        '--add-gate-max',
+        type=int,
+        default=100000,
+        help='largest ngate to time the add_gate decoder at (it is slow)')
+    args = parser.parse_args()
+
+    print(f"{'ngate':>8} {'add_gate s':>12} {'bulk s':>10}")
+    for ngate in args.ngate:
+        s = quasar_to_list(random_circuit(ngate, args.nqubit))
+        bulk_time = best_of(lambda: sequence_to_quasar(s), args.repeat)
+        if ngate <= args.add_gate_max:
+            add_gate_time = best_of(lambda: add_gate_sequence_to_quasar(s),
+                                    args.repeat)
+            add_gate_time = f'{add_gate_time:>12.4f}'
+        else:
+            add_gate_time = f"{'-':>12}"
+        print(f'{ngate:>8} {add_gate_time} {bulk_time:>10.4f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+Compares circuit_fingerprint with hashing the serialized circuit
+(quasar_to_string and quasar_to_compact_string) on deep random circuits.
+
+    python benchmarks/bench_circuit_fingerprint.py --ngate 100000
+"""
+import argparse
+import hashlib
+from bench_circuit_serialization import random_circuit, best_of
+from qcware.util.serialize_quasar import (quasar_to_string,
+                                          quasar_to_compact_string,
+                                          circuit_fingerprint,
+                                          circuit_structure_fingerprint)
+
+
+def hash_of(encode):
+    return lambda circuit: hashlib.blake2b(encode(circuit).encode('utf-8'),
+                                           digest_size=16).hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ngate', type=int, nargs='+', default=[1000, 100000])
+    parser.add_argument('--nqubit', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    methods = (('hash(json)', hash_of(quasar_to_string)),
+               ('hash(compact)', hash_of(quasar_to_compact_string)),
+               ('fingerprint', circuit_fingerprint),
+               ('structure', circuit_structure_fingerprint))
+    print(f"{'ngate':>8} {'method':>14} {'seconds':>10}")
+    for ngate in args.ngate:
+        circuit = random_circuit(ngate, args.nqubit)
+        for name, f in methods:
+            seconds = best_of(lambda: f(circuit), args.repeat)
+            print(f'{ngate:>8} {name:>14} {seconds:>10.4f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Compares the JSON circuit serialization (quasar_to_string) with the
+compact binary format (quasar_to_compact_string) on deep random circuits.
+
+    python benchmarks/bench_circuit_serialization.py --ngate 100000
+"""
+import argparse
+import time
+import numpy as np
+import quasar
+from qcware.util.serialize_quasar import (quasar_to_string,
+                                          quasar_to_compact_string,
+                                          string_to_quasar, gates_to_quasar)
+
+
+def random_circuit(ngate: int, nqubit: int, seed: int = 0) -> quasar.Circuit:
+    # the circuit is built with gates_to_quasar, since building a deep
+    # circuit through add_gate is far slower than serializing it
+    rng = np.random.default_rng(seed)
+    gates = []
+    next_time = [0] * nqubit
+    for _ in range(ngate):
+        kind = rng.integers(4)
+        qubit = int(rng.integers(nqubit - 1))
+        if kind == 0:
+            gate, qubits = quasar.Gate.H, (qubit, )
+        elif kind == 1:
+            gate, qubits = quasar.Gate.CX, (qubit, qubit + 1)
+        elif kind == 2:
+            gate = quasar.Gate.Ry(float(rng.uniform(-np.pi, np.pi)))
+            qubits = (qubit, )
+        else:
+            gate = quasar.Gate.Rz(float(rng.uniform(-np.pi, np.pi)))
+            qubits = (qubit, )
+        t = max(next_time[q] for q in qubits)
+        gates.append((((t, ), qubits), gate))
+        for q in qubits:
+            next_time[q] = t + 1
+    return gates_to_quasar(gates)
+
+
+def best_of(f, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ngate', type=int, nargs='+', default=[1000, 100000])
+    parser.add_argument('--nqubit', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'ngate':>8} {'format':>8} {'encode s':>10} {'decode s':>10} "
+          f"{'bytes':>10}")
+    for ngate in args.ngate:
+        circuit = random_circuit(ngate, args.nqubit)
+        for name, encode in (('json', quasar_to_string),
+                             ('compact', quasar_to_compact_string)):
+            s = encode(circuit)
+            encode_time = best_of(lambda: encode(circuit), args.repeat)
+            decode_time = best_of(lambda: string_to_quasar(s), args.repeat)
+            print(f'{ngate:>8} {name:>8} {encode_time:>10.4f} '
+                  f'{decode_time:>10.4f} {len(s):>10}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Compares building qio loader circuits locally (qcware.qio.local_loader,
+without and with its cache) against calling the qio.loader endpoint.  The
+endpoint is modelled as the API round trip latency, plus encoding the
+data and the returned circuit and decoding the circuit as the client
+does.  It then compares decoding the loaders of --nrow rows returned
+one call per row with decoding them from one qio.loader_batch result,
+which shares their structure.
+
+    python benchmarks/bench_local_loader.py --latency 0.5
+"""
+import argparse
+import json
+import numpy as np
+from bench_circuit_serialization import best_of
+from qcware.qio.local_loader import (build_loader, build_loader_batch,
+                                     local_loader)
+from qcware.util.serialize_quasar import (circuits_to_dict, dict_to_circuits,
+                                          quasar_to_list, sequence_to_quasar)
+from qcware.util.transforms import ndarray_to_dict
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--latency', type=float, default=0.5)
+    parser.add_argument('--d', type=int, nargs='+', default=[16, 64, 256])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--nrow', type=int, default=2000)
+    parser.add_argument('--ncolumn', type=int, default=64)
+    args = parser.parse_args()
+
+    print(f"{'d':>6} {'mode':>10} {'local s':>10} {'cached s':>10} "
+          f"{'forge s':>10}")
+    for d in args.d:
+        x = np.random.rand(d)
+        x = x / np.linalg.norm(x)
+        for mode in ('optimized', 'parallel'):
+            local = best_of(lambda: build_loader(x, mode), args.repeat)
+            local_loader(x, mode)
+            cached = best_of(lambda: local_loader(x, mode), args.repeat)
+            circuit = build_loader(x, mode)
+
+            def round_trip():
+                json.dumps(ndarray_to_dict(x))
+                wire = json.loads(json.dumps(quasar_to_list(circuit)))
+                sequence_to_quasar(wire)
+
+            forge = args.latency + best_of(round_trip, args.repeat)
+            print(f'{d:>6} {mode:>10} {local:>10.5f} {cached:>10.5f} '
+                  f'{forge:>10.5f}')
+
+    circuits = build_loader_batch(np.random.rand(args.nrow, args.ncolumn))
+    per_row = [json.dumps(quasar_to_list(c)) for c in circuits]
+    batch = json.dumps(circuits_to_dict(circuits))
+    per_row_seconds = best_of(
+        lambda: [sequence_to_quasar(json.loads(s)) for s in per_row], 1)
+    batch_seconds = best_of(lambda: dict_to_circuits(json.loads(batch)), 1)
+    print(f'decoding {args.nrow} loaders of {args.ncolumn} values:')
+    print(f'  one result per row {sum(map(len, per_row)):>10} bytes '
+          f'{per_row_seconds:.3f}s')
+    print(f'  loader_batch       {len(batch):>10} bytes {batch_seconds:.3f}s')
+
+
+if __name__ == '__main__':
+    main()
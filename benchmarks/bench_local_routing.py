@@ -0,0 +1,48 @@
+"""
+Finds the qubit count at which running run_statevector on Forge becomes
+faster than simulating locally, to choose the local routing threshold of
+QuasarBackend.  The local time is measured with the quasar simulator; the
+Forge time is modelled as the API round trip latency, plus the same
+simulation on a server --server-speedup times faster, plus downloading
+the statevector at --bandwidth bytes per second.
+
+    python benchmarks/bench_local_routing.py --latency 0.5
+"""
+import argparse
+import quasar
+from bench_circuit_serialization import random_circuit, best_of
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--latency', type=float, default=0.5)
+    parser.add_argument('--server-speedup', type=float, default=8.0)
+    parser.add_argument('--bandwidth', type=float, default=50e6)
+    parser.add_argument('--depth', type=int, default=20)
+    parser.add_argument('--nqubit', type=int, nargs='+',
+                        default=list(range(4, 25, 2)))
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    simulator = quasar.QuasarSimulatorBackend()
+    crossover = None
+    print(f"{'nqubit':>7} {'local s':>10} {'forge s':>10} {'faster':>8}")
+    for nqubit in args.nqubit:
+        circuit = random_circuit(args.depth * nqubit, nqubit)
+        local = best_of(lambda: simulator.run_statevector(circuit=circuit),
+                        args.repeat)
+        forge = (args.latency + local / args.server_speedup +
+                 16 * 2**nqubit / args.bandwidth)
+        faster = 'local' if local <= forge else 'forge'
+        if faster == 'forge' and crossover is None:
+            crossover = nqubit
+        print(f'{nqubit:>7} {local:>10.4f} {forge:>10.4f} {faster:>8}')
+    if crossover is None:
+        print('local simulation was faster at every size measured')
+    else:
+        print(f'Forge is faster from {crossover} qubits; use a local '
+              f'routing threshold of {crossover - 1}')
+
+
+if __name__ == '__main__':
+    main()
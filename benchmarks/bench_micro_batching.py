@@ -0,0 +1,80 @@
+"""
+Measures the throughput of QuasarBackend.run_pauli_expectation_value
+called from many threads, with and without micro-batching.  Forge is
+replaced by the local quasar simulator behind a fixed simulated round
+trip latency per API call, with at most --max-concurrent-calls calls in
+flight at once (as with an account's limit on concurrent jobs).
+
+    python benchmarks/bench_micro_batching.py --latency 0.2
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import quasar
+import qcware.circuits.quasar_backend
+from qcware.circuits.backend_extensions import run_extended_backend_method
+from qcware.circuits.quasar_backend import QuasarBackend
+
+
+class SimulatedForge(object):
+    def __init__(self, latency: float, max_concurrent_calls: int):
+        self.latency = latency
+        self.simulator = quasar.QuasarSimulatorBackend()
+        self.slots = threading.Semaphore(max_concurrent_calls)
+        self.ncall = 0
+
+    def run_backend_method(self, backend, method, kwargs, **extra):
+        with self.slots:
+            self.ncall += 1
+            time.sleep(self.latency)
+            return run_extended_backend_method(self.simulator, method,
+                                               kwargs)
+
+
+def throughput(backend: QuasarBackend, nthread: int, ncall: int) -> float:
+    I, X, Y, Z = quasar.Pauli.IXYZ()
+    pauli = Z[0] * Z[1] + X[0]
+
+    def call(i):
+        circuit = quasar.Circuit().Ry(0, theta=0.01 * i).CX(0, 1)
+        return backend.run_pauli_expectation_value(circuit=circuit,
+                                                   pauli=pauli)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(nthread) as pool:
+        list(pool.map(call, range(ncall)))
+    return ncall / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--max-concurrent-calls', type=int, default=4)
+    parser.add_argument('--nthread', type=int, nargs='+', default=[1, 8, 64])
+    parser.add_argument('--ncall', type=int, default=256)
+    parser.add_argument('--window', type=float, default=0.01)
+    parser.add_argument('--max-batch-size', type=int, default=100)
+    args = parser.parse_args()
+
+    forge = SimulatedForge(args.latency, args.max_concurrent_calls)
+    qcware.circuits.quasar_backend.run_backend_method = \
+        forge.run_backend_method
+    plain = QuasarBackend('classical/simulator')
+    batched = QuasarBackend('classical/simulator',
+                            micro_batch=dict(
+                                window=args.window,
+                                max_batch_size=args.max_batch_size))
+    print(f"{'nthread':>8} {'mode':>8} {'call/s':>10} {'API calls':>10}")
+    for nthread in args.nthread:
+        # keep single-threaded runs short; they are latency bound
+        ncall = min(args.ncall, 16 * nthread)
+        for name, backend in (('plain', plain), ('batched', batched)):
+            forge.ncall = 0
+            calls_per_second = throughput(backend, nthread, ncall)
+            print(f'{nthread:>8} {name:>8} {calls_per_second:>10.1f} '
+                  f'{forge.ncall:>10}')
+
+
+if __name__ == '__main__':
+    main()
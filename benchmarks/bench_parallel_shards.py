@@ -0,0 +1,65 @@
+"""
+Measures the wall-clock time of QuasarBackend.run_measurement split into
+--shards parallel shards.  Forge is replaced by the local quasar
+simulator behind a simulated job time of a fixed round trip latency plus
+--seconds-per-shot for each shot, with at most --capacity jobs running at
+once (the backend capacity available to the account).
+
+    python benchmarks/bench_parallel_shards.py --capacity 4
+"""
+import argparse
+import threading
+import time
+import quasar
+import qcware.circuits.quasar_backend
+from qcware.circuits.backend_extensions import run_extended_backend_method
+from qcware.circuits.quasar_backend import QuasarBackend
+
+
+class SimulatedForge(object):
+    def __init__(self, latency: float, seconds_per_shot: float,
+                 capacity: int):
+        self.latency = latency
+        self.seconds_per_shot = seconds_per_shot
+        self.simulator = quasar.QuasarSimulatorBackend()
+        self.slots = threading.Semaphore(capacity)
+
+    def run_backend_method(self, backend, method, kwargs, **extra):
+        with self.slots:
+            time.sleep(self.latency +
+                       self.seconds_per_shot * kwargs['nmeasurement'])
+            return run_extended_backend_method(self.simulator, method,
+                                               kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--seconds-per-shot', type=float, default=2e-6)
+    parser.add_argument('--capacity', type=int, default=4)
+    parser.add_argument('--nmeasurement', type=int, default=10**6)
+    parser.add_argument('--shards', type=int, nargs='+',
+                        default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    forge = SimulatedForge(args.latency, args.seconds_per_shot,
+                           args.capacity)
+    qcware.circuits.quasar_backend.run_backend_method = \
+        forge.run_backend_method
+    backend = QuasarBackend('classical/simulator')
+    circuit = quasar.Circuit().H(0).CX(0, 1).CX(1, 2)
+    print(f"{'shards':>7} {'seconds':>9} {'speedup':>8}")
+    baseline = None
+    for shards in args.shards:
+        start = time.perf_counter()
+        histogram = backend.run_measurement(circuit=circuit,
+                                            nmeasurement=args.nmeasurement,
+                                            parallel_shards=shards)
+        seconds = time.perf_counter() - start
+        assert histogram.nmeasurement == args.nmeasurement
+        baseline = seconds if baseline is None else baseline
+        print(f'{shards:>7} {seconds:>9.3f} {baseline / seconds:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
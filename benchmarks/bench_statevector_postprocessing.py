@@ -0,0 +1,69 @@
+"""
+Compares evaluating expectation values, diagonals and measurement
+histograms from a statevector already returned by run_statevector (with
+qcware.circuits.statevector) against making further Forge calls on the
+same circuit.  A Forge call is modelled as the API round trip latency
+plus the quasar simulator running the call from the circuit.
+
+    python benchmarks/bench_statevector_postprocessing.py --latency 0.5
+"""
+import argparse
+import quasar
+from bench_circuit_serialization import random_circuit, best_of
+from qcware.circuits.statevector import (measurement_histogram,
+                                         pauli_diagonal,
+                                         pauli_expectation_value)
+
+
+def random_pauli(nqubit: int, nterm: int) -> quasar.Pauli:
+    I, X, Y, Z = quasar.Pauli.IXYZ()
+    operators = (X, Y, Z)
+    pauli = quasar.Pauli.zero()
+    for term in range(nterm):
+        string = I[0]
+        for qubit in range(nqubit):
+            if (term + qubit) % 3 == 0:
+                string = string * operators[(term * qubit) % 3][qubit]
+        pauli = pauli + (1.0 + term) * string
+    return pauli
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--latency', type=float, default=0.5)
+    parser.add_argument('--depth', type=int, default=20)
+    parser.add_argument('--nterm', type=int, default=20)
+    parser.add_argument('--nqubit', type=int, nargs='+',
+                        default=[8, 12, 16, 20])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    simulator = quasar.QuasarSimulatorBackend()
+    print(f"{'nqubit':>7} {'call':>28} {'local s':>10} {'forge s':>10}")
+    for nqubit in args.nqubit:
+        circuit = random_circuit(args.depth * nqubit, nqubit)
+        pauli = random_pauli(nqubit, args.nterm)
+        statevector = simulator.run_statevector(circuit=circuit)
+        calls = (
+            ('run_pauli_expectation_value',
+             lambda: pauli_expectation_value(statevector, pauli),
+             lambda: simulator.run_pauli_expectation_value(
+                 circuit=circuit, pauli=pauli, nqubit=nqubit)),
+            ('run_pauli_diagonal',
+             lambda: pauli_diagonal(pauli, 0, nqubit),
+             lambda: simulator.run_pauli_diagonal(
+                 pauli=pauli, min_qubit=0, nqubit=nqubit)),
+            ('run_measurement',
+             lambda: measurement_histogram(statevector, 10000),
+             lambda: simulator.run_measurement(circuit=circuit,
+                                               nmeasurement=10000)),
+        )
+        for name, local, remote in calls:
+            local_seconds = best_of(local, args.repeat)
+            forge_seconds = args.latency + best_of(remote, args.repeat)
+            print(f'{nqubit:>7} {name:>28} {local_seconds:>10.4f} '
+                  f'{forge_seconds:>10.4f}')
+
+
+if __name__ == '__main__':
+    main()
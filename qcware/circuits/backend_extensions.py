@@ -0,0 +1,124 @@
+"""
+Backend methods which Forge provides to QuasarBackend in addition to
+those of quasar.Backend.  Each takes the quasar backend instance doing the
+work as its first argument, followed by the (decoded) keyword arguments
+of the call.
+"""
+import numpy as np
+from quasar.backend import Backend
+from ..util.shots import MeasurementShots, sample_packed_shots
+from ..util.transforms.result_policy import ResultWithPolicy
+
+
+def run_measurement_shots(backend: Backend,
+                          circuit,
+                          nmeasurement: int,
+                          statevector=None,
+                          min_qubit=None,
+                          nqubit=None,
+                          dtype=np.complex128,
+                          **kwargs) -> MeasurementShots:
+    """
+    As run_measurement, but returns every shot as packed bits rather than
+    aggregating them into a ProbabilityHistogram
+    """
+    if not isinstance(nmeasurement, int):
+        raise RuntimeError('nmeasurement must be int: %s' % nmeasurement)
+    if not backend.has_run_statevector:
+        raise NotImplementedError(
+            'run_measurement_shots requires a statevector backend')
+    statevector = backend.run_statevector(circuit=circuit,
+                                          statevector=statevector,
+                                          min_qubit=min_qubit,
+                                          nqubit=nqubit,
+                                          dtype=dtype,
+                                          **kwargs)
+    nqubit = (len(statevector) - 1).bit_length()
+    probabilities = (np.conj(statevector) * statevector).real
+    return MeasurementShots(
+        nqubit, sample_packed_shots(probabilities, nmeasurement, nqubit))
+
+
+def run_pauli_expectation_value_sweep(backend: Backend,
+                                      circuit,
+                                      pauli,
+                                      parameter_matrix: np.ndarray,
+                                      nmeasurement=None,
+                                      statevector=None,
+                                      min_qubit=None,
+                                      nqubit=None,
+                                      dtype=np.complex128,
+                                      parameter_indices=None,
+                                      **kwargs) -> np.ndarray:
+    """
+    The Pauli expectation value of the circuit with its parameters (or
+    those in parameter_indices) set to each row of parameter_matrix
+    """
+    if parameter_indices is None:
+        parameter_indices = list(range(circuit.nparameter))
+    if parameter_matrix.ndim != 2 or parameter_matrix.shape[1] != len(
+            parameter_indices):
+        raise ValueError(
+            f'parameter_matrix must have shape (npoint, '
+            f'{len(parameter_indices)}): {parameter_matrix.shape}')
+    circuit = circuit.copy()
+    result = np.zeros((parameter_matrix.shape[0], ), dtype=dtype)
+    for index, parameter_values in enumerate(parameter_matrix.tolist()):
+        circuit.set_parameter_values(parameter_values,
+                                     parameter_indices=parameter_indices)
+        result[index] = backend.run_pauli_expectation_value(
+            circuit=circuit,
+            pauli=pauli,
+            nmeasurement=nmeasurement,
+            statevector=statevector,
+            min_qubit=min_qubit,
+            nqubit=nqubit,
+            dtype=dtype,
+            **kwargs)
+    return result
+
+
+def run_batch(backend: Backend,
+              method: str,
+              batch: list,
+              shared_kwargs: dict = None) -> dict:
+    """
+    Runs a backend method once for each dict of keyword arguments in
+    batch (each merged over shared_kwargs), returning the method name and
+    the list of results in the order of batch
+    """
+    shared_kwargs = {} if shared_kwargs is None else shared_kwargs
+    return dict(method=method,
+                results=[
+                    run_extended_backend_method(backend, method, {
+                        **shared_kwargs,
+                        **kwargs
+                    }) for kwargs in batch
+                ])
+
+
+Backend_extensions = {
+    'run_measurement_shots': run_measurement_shots,
+    'run_pauli_expectation_value_sweep': run_pauli_expectation_value_sweep,
+    'run_batch': run_batch,
+}
+
+
+def run_extended_backend_method(backend: Backend, method: str, kwargs: dict):
+    """
+    Runs a backend method by name, looking first in Backend_extensions
+    and then on the backend itself.  A result_policy keyword argument is
+    not passed to the method; the result is returned with it as a
+    ResultWithPolicy, for the result transforms to apply.
+    """
+    result_policy = kwargs.get('result_policy', None)
+    if result_policy is not None:
+        kwargs = {k: v for k, v in kwargs.items() if k != 'result_policy'}
+    f = Backend_extensions.get(method, None)
+    if f is not None:
+        result = f(backend, **kwargs)
+    else:
+        result = getattr(backend, method)(**kwargs)
+    if result_policy is not None:
+        return ResultWithPolicy(result, result_policy)
+    return result
@@ -0,0 +1,78 @@
+"""
+A least-recently-used cache of the expectation values of individual Pauli
+strings, so that evaluating a growing Hamiltonian against the same
+circuit and angles only computes the new terms.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+import numpy as np
+from quasar.circuit import Circuit
+from ..util.serialize_quasar import circuit_fingerprint
+
+
+def statevector_digest(statevector: Optional[np.ndarray]) -> Optional[str]:
+    "A digest of an initial statevector (None for the default |0...0>)"
+    if statevector is None:
+        return None
+    statevector = np.ascontiguousarray(statevector)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str((statevector.dtype.str, statevector.shape)).encode('utf-8'))
+    h.update(statevector.tobytes())
+    return h.hexdigest()
+
+
+def expectation_context(circuit: Circuit,
+                        statevector: Optional[np.ndarray] = None,
+                        min_qubit: Optional[int] = None,
+                        nqubit: Optional[int] = None,
+                        dtype=np.complex128) -> Tuple:
+    """
+    Everything besides the Pauli string which determines an (ideal)
+    expectation value: the circuit with its parameter values, the initial
+    statevector and the qubit range and dtype of the simulation
+    """
+    return (circuit_fingerprint(circuit), statevector_digest(statevector),
+            min_qubit, nqubit, np.dtype(dtype).str)
+
+
+class PauliExpectationCache(object):
+    """
+    Maps (expectation context, PauliString) to the expectation value of
+    that Pauli string, evicting the least recently used entries beyond
+    max_size.  Only ideal (infinitely sampled) expectation values should
+    be cached, since sampled ones vary from call to call.
+    """
+    def __init__(self, max_size: int = 100000):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._values)
+
+    def get(self, context: Tuple, pauli_string):
+        "The cached value, or None"
+        key = (context, pauli_string)
+        with self._lock:
+            value = self._values.get(key, None)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._values.move_to_end(key)
+            return value
+
+    def put(self, context: Tuple, pauli_string, value):
+        with self._lock:
+            self._values[(context, pauli_string)] = value
+            self._values.move_to_end((context, pauli_string))
+            while len(self._values) > self.max_size:
+                self._values.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
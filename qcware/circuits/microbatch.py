@@ -0,0 +1,93 @@
+"""
+Coalescing of concurrent backend calls into batches.  Calls of the same
+method submitted within a short window of each other (from any thread)
+are sent to Forge as one batch, and each caller gets its own result back
+through a future.
+"""
+import threading
+from concurrent.futures import Future
+from typing import Callable, List
+
+
+class _PendingBatch(object):
+    def __init__(self):
+        self.kwargs = []
+        self.futures = []
+        self.timer = None
+
+
+class MicroBatcher(object):
+    """
+    Collects calls submitted with submit() and passes them to run_batch
+    as a list of keyword argument dicts, grouped by method.  A batch is
+    sent window seconds after its first call, or as soon as it holds
+    max_batch_size calls, whichever comes first.
+    """
+    def __init__(self,
+                 run_batch: Callable[[str, List[dict]], list],
+                 window: float = 0.01,
+                 max_batch_size: int = 100):
+        if max_batch_size < 1:
+            raise ValueError('max_batch_size must be at least 1')
+        self.run_batch = run_batch
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    def submit(self, method: str, kwargs: dict) -> Future:
+        """
+        Adds a call to the pending batch for method, returning a future
+        for its result
+        """
+        future = Future()
+        full_batch = None
+        with self._lock:
+            batch = self._pending.get(method, None)
+            if batch is None:
+                batch = _PendingBatch()
+                self._pending[method] = batch
+                batch.timer = threading.Timer(self.window, self._flush,
+                                              (method, batch))
+                batch.timer.daemon = True
+                batch.timer.start()
+            batch.kwargs.append(kwargs)
+            batch.futures.append(future)
+            if len(batch.kwargs) >= self.max_batch_size:
+                del self._pending[method]
+                batch.timer.cancel()
+                full_batch = batch
+        if full_batch is not None:
+            self._run(method, full_batch)
+        return future
+
+    def flush(self):
+        "Sends every pending batch now, in the calling thread"
+        with self._lock:
+            pending = list(self._pending.items())
+            self._pending.clear()
+        for method, batch in pending:
+            batch.timer.cancel()
+            self._run(method, batch)
+
+    def _flush(self, method: str, batch: _PendingBatch):
+        with self._lock:
+            # the batch may already have been sent because it filled up
+            if self._pending.get(method, None) is not batch:
+                return
+            del self._pending[method]
+        self._run(method, batch)
+
+    def _run(self, method: str, batch: _PendingBatch):
+        try:
+            results = self.run_batch(method, batch.kwargs)
+            if len(results) != len(batch.futures):
+                raise RuntimeError(
+                    f'{len(results)} results for a batch of '
+                    f'{len(batch.futures)} calls of {method}')
+        except Exception as e:
+            for future in batch.futures:
+                future.set_exception(e)
+        else:
+            for future, result in zip(batch.futures, results):
+                future.set_result(result)
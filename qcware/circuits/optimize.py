@@ -0,0 +1,190 @@
+"""
+A light client-side optimization pass for quasar circuits, run before a
+circuit is sent to Forge.  It removes identity gates, cancels adjacent
+inverse pairs, merges consecutive Rx/Ry/Rz rotations on the same qubit
+and can optionally fuse runs of single-qubit gates into U1 gates.
+
+Merging and fusing change the parameters of the circuit (and so the
+order of `Circuit.parameter_values`), which is why the pass is opt-in.
+"""
+import numpy as np
+from typing import Tuple
+from quasar.circuit import Circuit, CompositeGate, ControlledGate, Gate
+from sortedcontainers import SortedSet
+from ..util.serialize_quasar import (base_gate_name, num_adjoints,
+                                     gates_to_quasar)
+
+Rotation_gate_functions = {'Rx': Gate.Rx, 'Ry': Gate.Ry, 'Rz': Gate.Rz}
+
+# gates whose operator is a matrix rather than a function of parameters
+Matrix_gate_names = ('U1', 'U2')
+
+# merged rotations whose angle is within this of zero are removed
+Rotation_tolerance = 1e-12
+
+
+class CircuitOptimizationReport(object):
+    """
+    The changes made by optimize_circuit: gate and parameter counts
+    before and after, and the number of each kind of reduction
+    """
+    def __init__(self, ngate_before: int, nparameter_before: int):
+        self.ngate_before = ngate_before
+        self.nparameter_before = nparameter_before
+        self.ngate_after = ngate_before
+        self.nparameter_after = nparameter_before
+        self.identities_removed = 0
+        self.inverse_pairs_cancelled = 0
+        self.rotations_merged = 0
+        self.gates_fused = 0
+
+    @property
+    def gates_removed(self) -> int:
+        return self.ngate_before - self.ngate_after
+
+    def __str__(self):
+        return (f'{self.ngate_before} -> {self.ngate_after} gates '
+                f'({self.identities_removed} identities removed, '
+                f'{self.inverse_pairs_cancelled} inverse pairs cancelled, '
+                f'{self.rotations_merged} rotations merged, '
+                f'{self.gates_fused} gates fused)')
+
+
+def _is_opaque(gate: Gate) -> bool:
+    "Gates the pass never looks inside of"
+    return isinstance(gate,
+                      (CompositeGate, ControlledGate)) or gate.ntime != 1
+
+
+def _are_inverse(a: Gate, b: Gate) -> bool:
+    """
+    Whether b undoes a: the same gate with an odd number of adjoints
+    between them (eg S and S^+), or the same involutary gate twice.
+    Matrix gates (U1/U2) are compared by their operators.
+    """
+    if _is_opaque(a) or _is_opaque(b):
+        return False
+    if base_gate_name(a.name) in Matrix_gate_names or base_gate_name(
+            b.name) in Matrix_gate_names:
+        return a.nqubit == b.nqubit and np.allclose(b.operator,
+                                                    a.operator.conj().T)
+    if base_gate_name(a.name) != base_gate_name(b.name) or dict(
+            a.parameters) != dict(b.parameters):
+        return False
+    if (num_adjoints(a.name) + num_adjoints(b.name)) % 2 == 1:
+        return True
+    return a.name == b.name and a.involutary
+
+
+def _merged_rotation(a: Gate, b: Gate):
+    """
+    The single rotation equal to a followed by b, None if the rotation
+    is the identity, or False if they can't be merged
+    """
+    if (a.name != b.name or a.name not in Rotation_gate_functions
+            or _is_opaque(a) or _is_opaque(b)):
+        return False
+    theta = a.parameters['theta'] + b.parameters['theta']
+    if abs(theta) < Rotation_tolerance:
+        return None
+    return Rotation_gate_functions[a.name](theta=theta)
+
+
+def _fuse_single_qubit_runs(ops: list, report: CircuitOptimizationReport):
+    """
+    Replaces each run of two or more single-qubit gates on a qubit (with
+    nothing else on that qubit in between) by one U1 gate
+    """
+    closed = []
+    current = {}  # qubit -> indices into ops of the current run
+    for index, (qubits, gate) in enumerate(ops):
+        if len(qubits) == 1 and not _is_opaque(gate):
+            current.setdefault(qubits[0], []).append(index)
+        else:
+            for qubit in qubits:
+                if qubit in current:
+                    closed.append(current.pop(qubit))
+    closed.extend(current.values())
+    fused = list(ops)
+    for run in closed:
+        if len(run) < 2:
+            continue
+        U = np.eye(2, dtype=np.complex128)
+        for index in run:
+            U = ops[index][1].operator @ U
+        fused[run[0]] = (ops[run[0]][0], Gate.U1(U))
+        for index in run[1:]:
+            fused[index] = None
+        report.gates_fused += len(run)
+    return [op for op in fused if op is not None]
+
+
+def optimize_circuit(
+        circuit: Circuit,
+        drop_identities: bool = True,
+        cancel_inverses: bool = True,
+        merge_rotations: bool = True,
+        fuse_single_qubit: bool = False
+) -> Tuple[Circuit, CircuitOptimizationReport]:
+    """
+    Returns an optimized copy of circuit together with a report of the
+    reduction.  Gates are visited in time order; each gate is compared
+    with the last remaining gate on exactly the same qubits, so a
+    cancellation can expose a further one (eg H X X H).  Composite and
+    controlled gates are left untouched and act as barriers.  The
+    result keeps the qubit range of circuit, but gates are rescheduled
+    as early as possible.
+    """
+    report = CircuitOptimizationReport(len(circuit.gates),
+                                       circuit.nparameter)
+    ops = []
+    last_ops = {}  # qubit -> stack of indices into ops
+    for (times, qubits), gate in circuit.gates.items():
+        if drop_identities and gate.name == 'I':
+            report.identities_removed += 1
+            continue
+        stacks = [last_ops.get(qubit, []) for qubit in qubits]
+        previous = stacks[0][-1] if stacks[0] else None
+        if previous is not None and ops[previous][0] == qubits and all(
+                stack and stack[-1] == previous for stack in stacks):
+            previous_gate = ops[previous][1]
+            if cancel_inverses and _are_inverse(previous_gate, gate):
+                report.inverse_pairs_cancelled += 1
+                replacement = None
+            elif merge_rotations:
+                replacement = _merged_rotation(previous_gate, gate)
+                if replacement is not False:
+                    report.rotations_merged += 1
+            else:
+                replacement = False
+            if replacement is None:
+                ops[previous] = None
+                for stack in stacks:
+                    stack.pop()
+                continue
+            elif replacement is not False:
+                ops[previous] = (qubits, replacement)
+                continue
+        # parameterized gates are copied so the result doesn't share
+        # mutable parameters with circuit
+        ops.append((qubits, gate.copy() if gate.nparameter > 0 else gate))
+        for qubit in qubits:
+            last_ops.setdefault(qubit, []).append(len(ops) - 1)
+    ops = [op for op in ops if op is not None]
+    if fuse_single_qubit:
+        ops = _fuse_single_qubit_runs(ops, report)
+
+    next_time = {}
+    gates = []
+    for qubits, gate in ops:
+        start = max(next_time.get(qubit, 0) for qubit in qubits)
+        for qubit in qubits:
+            next_time[qubit] = start + gate.ntime
+        times = tuple(range(start, start + gate.ntime))
+        gates.append(((times, qubits), gate))
+    result = gates_to_quasar(gates)
+    # keep the qubit range even if every gate on an edge qubit is removed
+    result.qubits = SortedSet(circuit.qubits)
+    report.ngate_after = len(result.gates)
+    report.nparameter_after = result.nparameter
+    return result, report
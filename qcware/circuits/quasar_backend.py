@@ -1,15 +1,158 @@
 from quasar.backend import Backend
-from quasar import Circuit
+from quasar import Circuit, Pauli, PauliExpectation, QuasarSimulatorBackend
+import asyncio
+import functools
+import inspect
 import numpy as np
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, Tuple, Union
 from . import (run_backend_method)
+from .backend_extensions import Backend_extensions, run_extended_backend_method
+from .expectation_cache import PauliExpectationCache, expectation_context
+from .microbatch import MicroBatcher
+from .router import (LatencyRouter, Local, Local_equivalent_backends,
+                     call_nqubit)
+from .optimize import optimize_circuit
+from .. import logger
+from ..exceptions import ApiCallExecutionError
+from ..util.circuit_templates import TemplatedCircuit, circuit_template_id
+from ..util.transforms.result_policy import ResultWithPolicy, reduce_result
+from ..util.shots import (merge_measurement_shots,
+                          merge_probability_histograms, split_nmeasurement)
 
+# methods whose arguments or results refer to the circuit's parameters
+Parameter_dependent_methods = (
+    'run_pauli_expectation_value_sweep',
+    'run_pauli_expectation_value_gradient',
+    'run_pauli_expectation_value_gradient_pauli_contraction',
+    'run_pauli_expectation_value_hessian',
+)
 
+
+# quasar.Backend methods which are not run on Forge
+Unforwarded_methods = ('linear_commuting_group', )
+
+
+def _forwarded_signature(name: str) -> inspect.Signature:
+    """
+    The signature of a forwarded backend method, without its self (or
+    backend) argument.  quasar.Backend properties are forwarded as
+    methods without arguments.
+    """
+    f = Backend_extensions.get(name, None)
+    if f is None:
+        f = inspect.getattr_static(Backend, name)
+        if isinstance(f, property):
+            return inspect.Signature([])
+        if isinstance(f, staticmethod):
+            return inspect.signature(f.__func__)
+    return inspect.Signature(
+        list(inspect.signature(f).parameters.values())[1:])
+
+
+# the signature of each method run on Forge, by name
+Forwarded_signatures = {
+    name: _forwarded_signature(name)
+    for name in sorted(set(dir(Backend)) | set(Backend_extensions))
+    if name[0] != '_' and name not in Unforwarded_methods
+}
+
+
+def _bound_kwargs(method: str, args: tuple, kwargs: dict) -> dict:
+    """
+    The keyword arguments of a call of a forwarded method, with positional
+    args bound to their parameter names
+    """
+    if len(args) == 0:
+        return kwargs
+    signature = Forwarded_signatures[method]
+    result = {}
+    for name, value in signature.bind_partial(*args,
+                                              **kwargs).arguments.items():
+        if signature.parameters[name].kind == inspect.Parameter.VAR_KEYWORD:
+            result.update(value)
+        else:
+            result[name] = value
+    return result
+
+
+def _forwarding_method(name: str) -> Callable:
+    "A QuasarBackend method which runs the backend method name on Forge"
+    def method(self, *args, **kwargs):
+        return self._run_backend_method(name,
+                                        _bound_kwargs(name, args, kwargs))
+
+    signature = Forwarded_signatures[name]
+    method.__name__ = name
+    method.__qualname__ = f'QuasarBackend.{name}'
+    method.__doc__ = (f'Runs quasar\'s `{name}` on Forge.  Takes the same '
+                      f'arguments as `quasar.Backend.{name}`.')
+    method.__signature__ = signature.replace(parameters=[
+        inspect.Parameter('self', inspect.Parameter.POSITIONAL_OR_KEYWORD)
+    ] + list(signature.parameters.values()))
+    return method
+
+
+def _unforwarded_method(name: str) -> Callable:
+    def method(self, *args, **kwargs):
+        raise NotImplementedError(name)
+
+    method.__name__ = name
+    method.__qualname__ = f'QuasarBackend.{name}'
+    return method
+
+
+def _add_forwarded_methods(cls):
+    """
+    Adds a method to cls for each forwarded backend method it doesn't
+    define itself, so that attribute access finds an ordinary bound
+    method rather than building one on each call
+    """
+    for name in Forwarded_signatures:
+        if name not in cls.__dict__:
+            setattr(cls, name, _forwarding_method(name))
+    for name in Unforwarded_methods:
+        setattr(cls, name, _unforwarded_method(name))
+    return cls
+
+
+def _local_result(result):
+    """
+    The result of a call run on the local simulator, reduced as its result
+    policy (if any) asks
+    """
+    if isinstance(result, ResultWithPolicy):
+        return reduce_result(result.result, result.policy)
+    return result
+
+
+def _check_shift_rule(circuit: Circuit, parameter_indices, what: str):
+    "Checks that the parameter shift rule applies to these parameters"
+    parameter_keys = circuit.parameter_keys
+    for parameter_index in parameter_indices:
+        times, qubits, _ = parameter_keys[parameter_index]
+        gate = circuit.gates[(times, qubits)]
+        if gate.name not in ('Rx', 'Ry', 'Rz'):
+            raise RuntimeError(
+                f'Unknown {what} rule: presently can only differentiate '
+                f'Rx, Ry, Rz gates: {gate}')
+
+
+@_add_forwarded_methods
 class QuasarBackend(object):
     """
     A backend for Quasar which runs on the Forge SaaS service.
     Forge must be configured with an api key prior to using this.
     """
-    def __init__(self, forge_backend: str, backend_args={}):
+    def __init__(self,
+                 forge_backend: str,
+                 backend_args={},
+                 use_templates: bool = False,
+                 optimize_circuits: Union[bool, dict] = False,
+                 micro_batch: Union[bool, dict] = False,
+                 local_routing: Union[bool, dict, LatencyRouter] = False,
+                 expectation_cache: Union[bool, dict] = False):
         """
         Creates the QuasarBackend.  You must provide a Forge backend, and
         provide Forge backend arguments if necessary.
@@ -19,18 +162,498 @@ class QuasarBackend(object):
 
         :param backend_args: A dict of arguments for the Forge backend.  Typically not necessary; defaults to `{}`
         :type backend_args: dict
+
+        :param use_templates: If True, the structure of each circuit is uploaded once as a template, and later calls with a circuit of the same structure send only the template id and the circuit's parameter values.  Useful in variational loops; defaults to False
+        :type use_templates: bool
+
+        :param optimize_circuits: If True, each circuit is simplified by `qcware.circuits.optimize.optimize_circuit` before it is sent (removing identities, cancelling inverse pairs and merging rotations); a dict is passed to `optimize_circuit` as keyword arguments, eg `{'fuse_single_qubit': True}`.  The report of the last optimization is kept in `last_optimization_report`; defaults to False
+        :type optimize_circuits: bool or dict
+
+        :param micro_batch: If True, calls made concurrently (eg from several threads) are coalesced: calls of the same method made within 10ms of each other, up to 100 calls, are sent as one `run_batch` call.  A dict sets the `window` (in seconds) and `max_batch_size` of the `qcware.circuits.microbatch.MicroBatcher`; defaults to False
+        :type micro_batch: bool or dict
+
+        :param local_routing: If True, calls on small circuits are run with the local quasar simulator instead of on Forge: by default those on at most 12 qubits, with the threshold then adjusted from measured latencies.  A dict is passed to `qcware.circuits.router.LatencyRouter` as keyword arguments (eg `{'threshold': 8, 'learn': False}`), or a router can be given.  Only available for backends which the local simulator reproduces (`classical/simulator`); defaults to False
+        :type local_routing: bool, dict or LatencyRouter
+
+        :param expectation_cache: If True, `run_pauli_expectation_value` without `nmeasurement` caches the expectation value of each Pauli string for the circuit (and its parameter values and initial statevector), and only sends the strings it hasn't seen to Forge.  A dict is passed to `qcware.circuits.expectation_cache.PauliExpectationCache` as keyword arguments (eg `{'max_size': 10000}`); defaults to False
+        :type expectation_cache: bool or dict
         """
         self.forge_backend = forge_backend
         self.backend_args = backend_args
+        self.use_templates = use_templates
+        self._uploaded_templates = set()
+        self.optimize_circuits = optimize_circuits
+        self.last_optimization_report = None
+        self._micro_batcher = None
+        if micro_batch:
+            self._micro_batcher = MicroBatcher(
+                self._run_micro_batch,
+                **(micro_batch if isinstance(micro_batch, dict) else {}))
+        self.router = None
+        if local_routing:
+            if forge_backend not in Local_equivalent_backends:
+                raise ValueError(
+                    f'local routing is not available for {forge_backend}')
+            self.router = local_routing if isinstance(
+                local_routing, LatencyRouter) else LatencyRouter(
+                    **(local_routing if isinstance(local_routing, dict
+                                                   ) else {}))
+            self._local_backend = QuasarSimulatorBackend()
+        self.expectation_cache = None
+        if expectation_cache:
+            self.expectation_cache = PauliExpectationCache(
+                **(expectation_cache if isinstance(expectation_cache, dict
+                                                   ) else {}))
+
+    def _optimized(self, circuit: Circuit) -> Circuit:
+        options = self.optimize_circuits if isinstance(
+            self.optimize_circuits, dict) else {}
+        circuit, self.last_optimization_report = optimize_circuit(
+            circuit, **options)
+        logger.info(f'Optimized circuit: {self.last_optimization_report}')
+        return circuit
+
+    def _templated(self, batch: List[dict],
+                   include_structure: bool) -> Tuple[List[dict], set]:
+        """
+        Replaces the circuit argument of each dict of keyword arguments
+        in batch by a template reference, including the structure the
+        first time a template is sent (or always, if include_structure).
+        Returns the new batch and the set of template ids it uses.
+        """
+        sent = set()
+        templated_batch = []
+        for kwargs in batch:
+            circuit = kwargs.get('circuit', None)
+            if isinstance(circuit, Circuit):
+                template_id = circuit_template_id(circuit)
+                templated = TemplatedCircuit(
+                    circuit, template_id, include_structure
+                    or (template_id not in self._uploaded_templates
+                        and template_id not in sent))
+                sent.add(template_id)
+                kwargs = {**kwargs, 'circuit': templated}
+            templated_batch.append(kwargs)
+        return templated_batch, sent
+
+    def _send(self, method: str, batch: List[dict], call: Callable):
+        """
+        Optimizes and templates the circuit arguments of batch (a list of
+        dicts of keyword arguments for method) as configured and passes
+        the result to call, which makes the Forge API call.  Circuits
+        are not optimized for methods which depend on the circuit's
+        parameters, since optimizing can change them.
+        """
+        if self.optimize_circuits and (method
+                                       not in Parameter_dependent_methods):
+            batch = [
+                dict(kwargs, circuit=self._optimized(kwargs['circuit']))
+                if isinstance(kwargs.get('circuit', None), Circuit) else kwargs
+                for kwargs in batch
+            ]
+        if not self.use_templates:
+            return call(batch)
+        templated_batch, sent = self._templated(batch, False)
+        try:
+            result = call(templated_batch)
+        except ApiCallExecutionError as e:
+            # the server may have evicted a template; upload them again
+            if not sent or 'Unknown circuit template' not in str(e):
+                raise
+            templated_batch, sent = self._templated(batch, True)
+            result = call(templated_batch)
+        self._uploaded_templates.update(sent)
+        return result
+
+    def _run_backend_method(self, method: str, kwargs: dict):
+        """
+        Runs a backend method on Forge, optimizing the circuit argument
+        if optimize_circuits is set and sending it as a template reference
+        if use_templates is set.  With micro-batching, the call waits to be
+        sent together with concurrent calls of the same method.  With
+        local routing, small circuits are run locally instead.
+        """
+        return self._routed(
+            call_nqubit(kwargs), lambda: _local_result(
+                run_extended_backend_method(self._local_backend, method,
+                                            kwargs)),
+            lambda: self._run_remote(method, kwargs))
+
+    def _run_remote(self, method: str, kwargs: dict):
+        if self._micro_batcher is not None:
+            return self._micro_batcher.submit(method, kwargs).result()
+        return self._send(method, [kwargs], lambda batch: run_backend_method(
+            self.forge_backend, method, batch[0]))
+
+    def _routed(self, nqubit: int, run_local: Callable, run_remote: Callable):
+        "Runs a call locally or remotely as chosen by the router, if any"
+        if self.router is None:
+            return run_remote()
+        route = self.router.choose(nqubit)
+        start = time.perf_counter()
+        result = run_local() if route == Local else run_remote()
+        self.router.record(route, nqubit, time.perf_counter() - start)
+        return result
+
+    def _run_micro_batch(self, method: str, list_of_kwargs: List[dict]):
+        """
+        Sends calls coalesced by the micro-batcher.  The calls have already
+        been routed (and will be recorded) one by one, so the batch is sent
+        directly rather than through run_batch.
+        """
+        if len(list_of_kwargs) == 1:
+            return [
+                self._send(method, list_of_kwargs,
+                           lambda batch: run_backend_method(
+                               self.forge_backend, method, batch[0]))
+            ]
+        return self._send(method, list_of_kwargs,
+                          self._batch_call(method, {}))
+
+    def _batch_call(self, method: str, shared_kwargs: dict) -> Callable:
+        "A call sending a batch of keyword arguments for method to run_batch"
+        def call(batch):
+            return run_backend_method(
+                self.forge_backend, 'run_batch',
+                dict(method=method, batch=batch,
+                     shared_kwargs=shared_kwargs))['results']
+
+        return call
 
-    def __getattr__(self, name):
-        def wrapper(*args, **kwargs):
-            if ((name in dir(Backend)) and (name[0] != '_') and (name not in (
-                    'linear_commuting_group',
-                    'run_pauli_expectation_value_gradient_pauli_contraction',
-                    'run_pauli_expectation_value_hessian'))):
-                return run_backend_method(self.forge_backend, name, kwargs)
+    def run_batch(self, method: str, list_of_kwargs: Sequence[dict],
+                  **shared_kwargs) -> list:
+        """
+        Runs a backend method once for each dict of keyword arguments in
+        list_of_kwargs, in a single Forge API call.  Each item's arguments
+        (typically including its circuit) are encoded as for a single
+        call, and are optimized and templated as configured.
+
+        :param method: The name of a backend method, eg `run_measurement`
+        :type method: str
+
+        :param list_of_kwargs: The keyword arguments of each call
+        :type list_of_kwargs: Sequence[dict]
+
+        :param shared_kwargs: Keyword arguments used by every call in the batch (eg `nmeasurement` or `pauli`), sent only once; the arguments of each item take precedence
+
+        :return: The results of the calls, in the order of list_of_kwargs
+        :rtype: list
+        """
+        if not self._is_forwarded(method):
+            raise NotImplementedError(method)
+        list_of_kwargs = list(list_of_kwargs)
+        nqubits = [
+            call_nqubit({
+                **shared_kwargs,
+                **kwargs
+            }) for kwargs in list_of_kwargs
+        ]
+        return self._routed(
+            None if None in nqubits or len(nqubits) == 0 else max(nqubits),
+            lambda: [
+                _local_result(r) for r in run_extended_backend_method(
+                    self._local_backend, 'run_batch',
+                    dict(method=method,
+                         batch=list_of_kwargs,
+                         shared_kwargs=shared_kwargs))['results']
+            ],
+            lambda: self._send(method, list_of_kwargs,
+                               self._batch_call(method, shared_kwargs)))
+
+    def run_pauli_expectation_value(self,
+                                    circuit: Circuit,
+                                    pauli,
+                                    nmeasurement: int = None,
+                                    **kwargs):
+        """
+        Runs quasar's `run_pauli_expectation_value` on Forge.  With the
+        expectation cache enabled and no `nmeasurement`, only the Pauli
+        strings whose values aren't cached are sent (with
+        `run_pauli_expectation`), and the total is assembled locally.
+
+        :return: The expectation value of pauli
+        :rtype: complex
+        """
+        if self.expectation_cache is None or nmeasurement is not None:
+            return self._run_backend_method(
+                'run_pauli_expectation_value',
+                dict(kwargs,
+                     circuit=circuit,
+                     pauli=pauli,
+                     nmeasurement=nmeasurement))
+        context = expectation_context(
+            circuit, **{
+                k: kwargs[k]
+                for k in ('statevector', 'min_qubit', 'nqubit', 'dtype')
+                if k in kwargs
+            })
+        values = {}
+        uncached = []
+        for pauli_string in pauli.keys():
+            value = self.expectation_cache.get(context, pauli_string)
+            if value is None:
+                uncached.append(pauli_string)
             else:
-                raise NotImplementedError(name)
+                values[pauli_string] = value
+        if len(uncached) > 0:
+            # quasar takes the default qubit range from the Pauli, so the
+            # range of the whole of pauli is passed with the uncached part
+            qubit_range = dict(
+                min_qubit=pauli.min_qubit if kwargs.get(
+                    'min_qubit', None) is None else kwargs['min_qubit'],
+                nqubit=pauli.nqubit
+                if kwargs.get('nqubit', None) is None else kwargs['nqubit'])
+            expectations = self._run_backend_method(
+                'run_pauli_expectation',
+                dict(kwargs,
+                     circuit=circuit,
+                     pauli=Pauli([(s, 1.0) for s in uncached]),
+                     **qubit_range))
+            for pauli_string in uncached:
+                value = expectations[pauli_string]
+                self.expectation_cache.put(context, pauli_string, value)
+                values[pauli_string] = value
+        return PauliExpectation([(s, values[s])
+                                 for s in pauli.keys()]).dot(pauli)
+
+    def run_pauli_expectation_value_sweep(self, circuit: Circuit, pauli,
+                                          parameter_matrix: np.ndarray,
+                                          **kwargs) -> np.ndarray:
+        """
+        Evaluates `run_pauli_expectation_value` at many parameter points in
+        a single Forge call.  The circuit and Pauli are sent once, and the
+        circuit's parameters are set to each row of parameter_matrix in
+        turn on the server.  Takes the same further keyword arguments as
+        `run_pauli_expectation_value`.
+
+        :param circuit: The circuit to evaluate
+        :type circuit: quasar.Circuit
+
+        :param pauli: The Pauli operator to take the expectation value of
+        :type pauli: quasar.Pauli
+
+        :param parameter_matrix: A matrix with one row of parameter values per point; the columns are the circuit's parameters, or those given in the keyword argument `parameter_indices`
+        :type parameter_matrix: numpy.ndarray
+
+        :return: The expectation value at each row of parameter_matrix
+        :rtype: numpy.ndarray
+        """
+        parameter_matrix = np.asarray(parameter_matrix, dtype=np.float64)
+        parameter_indices = kwargs.get('parameter_indices', None)
+        ncolumn = circuit.nparameter if parameter_indices is None else len(
+            parameter_indices)
+        if parameter_matrix.ndim != 2 or parameter_matrix.shape[1] != ncolumn:
+            raise ValueError(
+                f'parameter_matrix must have shape (npoint, {ncolumn})')
+        return self._run_backend_method(
+            'run_pauli_expectation_value_sweep',
+            dict(kwargs,
+                 circuit=circuit,
+                 pauli=pauli,
+                 parameter_matrix=parameter_matrix))
+
+    def run_pauli_expectation_value_gradient_pauli_contraction(
+            self,
+            circuit: Circuit,
+            pauli,
+            parameter_coefficients,
+            parameter_indices=None,
+            **kwargs) -> PauliExpectation:
+        """
+        As quasar's `run_pauli_expectation_value_gradient_pauli_contraction`:
+        the parameter-shift gradient of the Pauli expectation, contracted
+        with parameter_coefficients.  The 2P shifted circuits are built
+        locally and evaluated with one `run_batch` call.
+
+        :return: The contracted gradient
+        :rtype: quasar.PauliExpectation
+        """
+        parameter_values = circuit.parameter_values
+        if parameter_indices is None:
+            parameter_indices = list(range(len(parameter_values)))
+        if len(parameter_coefficients) != len(parameter_indices):
+            raise RuntimeError(
+                'len(parameter_coefficients) != len(parameter_indices)')
+        _check_shift_rule(circuit, parameter_indices, 'gradient')
+        batch = []
+        for parameter_index in parameter_indices:
+            for shift in (np.pi / 4.0, -np.pi / 4.0):
+                shifted_values = list(parameter_values)
+                shifted_values[parameter_index] += shift
+                shifted = circuit.copy()
+                shifted.set_parameter_values(shifted_values)
+                batch.append(dict(circuit=shifted))
+        expectations = self.run_batch('run_pauli_expectation',
+                                      batch,
+                                      pauli=pauli,
+                                      **kwargs)
+        pauli_gradient = PauliExpectation.zero()
+        for index, coefficient in enumerate(parameter_coefficients):
+            pauli_gradient += coefficient * (expectations[2 * index] -
+                                             expectations[2 * index + 1])
+        return pauli_gradient
+
+    def run_pauli_expectation_value_hessian(self,
+                                            circuit: Circuit,
+                                            pauli,
+                                            parameter_pair_indices=None,
+                                            dtype=np.complex128,
+                                            **kwargs) -> np.ndarray:
+        """
+        As quasar's `run_pauli_expectation_value_hessian`: the
+        parameter-shift Hessian of the Pauli expectation value for each
+        pair in parameter_pair_indices (by default every pair).  The four
+        shifted parameter sets of each distinct pair are built locally and
+        evaluated with one `run_pauli_expectation_value_sweep` call.
+
+        :return: The Hessian entry for each pair of parameter indices
+        :rtype: numpy.ndarray
+        """
+        parameter_values = np.array(circuit.parameter_values,
+                                    dtype=np.float64)
+        nparameter = len(parameter_values)
+        if parameter_pair_indices is None:
+            parameter_pair_indices = [(i, j) for i in range(nparameter)
+                                      for j in range(nparameter)]
+        parameter_pair_indices = [tuple(p) for p in parameter_pair_indices]
+        _check_shift_rule(circuit,
+                          {i
+                           for pair in parameter_pair_indices
+                           for i in pair}, 'Hessian')
+        # the Hessian is symmetric, so each unordered pair is run once
+        pairs = sorted({tuple(sorted(p)) for p in parameter_pair_indices})
+        if len(pairs) == 0:
+            return np.zeros((0, ), dtype=dtype)
+        shifts = np.pi / 4.0 * np.array([(1, 1), (1, -1), (-1, 1), (-1, -1)])
+        parameter_matrix = np.tile(parameter_values, (4 * len(pairs), 1))
+        for index, (i, j) in enumerate(pairs):
+            parameter_matrix[4 * index:4 * index + 4, i] += shifts[:, 0]
+            parameter_matrix[4 * index:4 * index + 4, j] += shifts[:, 1]
+        values = self.run_pauli_expectation_value_sweep(
+            circuit, pauli, parameter_matrix, dtype=dtype, **kwargs)
+        # Epp - Epm - Emp + Emm for each pair
+        by_pair = dict(
+            zip(pairs,
+                values.reshape(len(pairs), 4) @ np.array([1, -1, -1, 1])))
+        return np.array([by_pair[tuple(sorted(p))]
+                         for p in parameter_pair_indices],
+                        dtype=dtype)
 
-        return wrapper
+    def run_measurement(self,
+                        *args,
+                        return_shots: bool = False,
+                        parallel_shards: int = 1,
+                        shard_backends: Sequence[Union[str,
+                                                       'QuasarBackend']] = None,
+                        **kwargs):
+        """
+        Runs quasar's `run_measurement` on Forge.  Takes the same
+        arguments as `quasar.Backend.run_measurement`.
+
+        :param return_shots: If True, return every shot rather than a histogram.  Requires `nmeasurement`; defaults to False
+        :type return_shots: bool
+
+        :param parallel_shards: The number of concurrent calls `nmeasurement` is split across; the histograms (or shots) of the calls are merged into one.  Requires `nmeasurement`; defaults to 1
+        :type parallel_shards: int
+
+        :param shard_backends: The backends the shards are run on in turn, as Forge backend strings or QuasarBackend instances; defaults to None, running every shard on this backend
+        :type shard_backends: Sequence[Union[str, QuasarBackend]]
+
+        :return: A `quasar.ProbabilityHistogram`, or with `return_shots` a `qcware.util.shots.MeasurementShots` holding the shots as a packed-bit uint8 matrix
+        :rtype: quasar.ProbabilityHistogram or MeasurementShots
+        """
+        kwargs = _bound_kwargs('run_measurement', args, kwargs)
+        if parallel_shards < 1:
+            raise ValueError('parallel_shards must be at least 1')
+        if parallel_shards > 1 or shard_backends:
+            return self._run_sharded_measurement(kwargs, return_shots,
+                                                 parallel_shards,
+                                                 shard_backends)
+        if return_shots:
+            if kwargs.get('nmeasurement', None) is None:
+                raise ValueError('return_shots requires nmeasurement')
+            return self._run_backend_method('run_measurement_shots', kwargs)
+        else:
+            return self._run_backend_method('run_measurement', kwargs)
+
+    def _run_sharded_measurement(self, kwargs: dict, return_shots: bool,
+                                 parallel_shards: int,
+                                 shard_backends: Optional[Sequence]):
+        """
+        Splits the shots of a run_measurement call across parallel_shards
+        concurrent calls, on shard_backends in turn, and merges the results
+        """
+        nmeasurement = kwargs.get('nmeasurement', None)
+        if nmeasurement is None:
+            raise ValueError('parallel_shards requires nmeasurement')
+        if nmeasurement < 1:
+            raise ValueError('parallel_shards requires nmeasurement of at '
+                             'least 1')
+        backends = [self] if not shard_backends else [
+            b if isinstance(b, QuasarBackend) else QuasarBackend(
+                b, self.backend_args) for b in shard_backends
+        ]
+        sizes = split_nmeasurement(nmeasurement,
+                                   max(parallel_shards, len(backends)))
+
+        def run_shard(index: int):
+            return backends[index % len(backends)].run_measurement(
+                return_shots=return_shots,
+                **dict(kwargs, nmeasurement=sizes[index]))
+
+        with ThreadPoolExecutor(max_workers=len(sizes)) as executor:
+            results = list(executor.map(run_shard, range(len(sizes))))
+        if return_shots:
+            return merge_measurement_shots(results)
+        return merge_probability_histograms(results)
+
+    @staticmethod
+    def _is_forwarded(name: str) -> bool:
+        "Whether a backend method is run on Forge"
+        return name in Forwarded_signatures
+
+
+def _async_method(name: str) -> Callable:
+    "An AsyncQuasarBackend method which runs QuasarBackend's in a thread"
+    f = getattr(QuasarBackend, name)
+
+    @functools.wraps(f)
+    async def method(self, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor,
+            functools.partial(getattr(self.backend, name), *args, **kwargs))
+
+    method.__qualname__ = f'AsyncQuasarBackend.{name}'
+    return method
+
+
+def _add_async_methods(cls):
+    "Adds an async counterpart to cls of each public QuasarBackend method"
+    for name in dir(QuasarBackend):
+        if name[0] != '_' and callable(getattr(QuasarBackend, name)):
+            setattr(cls, name, _async_method(name))
+    return cls
+
+
+@_add_async_methods
+class AsyncQuasarBackend(object):
+    """
+    An asyncio counterpart of QuasarBackend, whose methods are coroutines.
+    Each call runs the QuasarBackend method in an executor, so the event
+    loop isn't blocked while waiting for Forge and concurrent calls
+    (eg with asyncio.gather) are in flight together.
+    """
+    def __init__(self,
+                 forge_backend: str,
+                 *args,
+                 executor: Optional[Executor] = None,
+                 **kwargs):
+        """
+        Creates the AsyncQuasarBackend.  Takes the same arguments as
+        QuasarBackend, and:
+
+        :param executor: The executor calls are run in; defaults to None, which uses the event loop's default executor
+        :type executor: concurrent.futures.Executor
+        """
+        self.backend = QuasarBackend(forge_backend, *args, **kwargs)
+        self.executor = executor
@@ -0,0 +1,93 @@
+"""
+Routing of QuasarBackend calls between a local quasar simulator and
+Forge.  For circuits on a few qubits the Forge round trip costs far more
+than simulating locally, so calls on at most `threshold` qubits run
+locally.  The router can learn the crossover from the latencies it
+measures.
+"""
+import threading
+from typing import Optional
+
+Local = 'local'
+Remote = 'remote'
+
+# Forge backends whose results the local quasar simulator reproduces
+Local_equivalent_backends = ('classical/simulator', )
+
+
+class LatencyRouter(object):
+    """
+    Chooses between running a call locally and on Forge by the number of
+    qubits of its circuit: calls on at most threshold qubits (and never
+    more than max_local_nqubit) run locally.
+
+    With learn=True the router keeps an exponentially weighted moving
+    average (weight smoothing for each new sample) of the latency of each
+    route for each qubit count.  Every explore_every-th call at a qubit
+    count next to the threshold is sent the other way, and once both
+    routes have been measured at a qubit count the threshold is moved to
+    the crossover: above it if the local route is faster there, below it
+    otherwise.
+    """
+    def __init__(self,
+                 threshold: int = 12,
+                 learn: bool = True,
+                 smoothing: float = 0.2,
+                 explore_every: int = 20,
+                 max_local_nqubit: int = 24):
+        self.threshold = threshold
+        self.learn = learn
+        self.smoothing = smoothing
+        self.explore_every = explore_every
+        self.max_local_nqubit = max_local_nqubit
+        self.latencies = {Local: {}, Remote: {}}
+        self._ncall = {}
+        self._lock = threading.Lock()
+
+    def choose(self, nqubit: Optional[int]) -> str:
+        "The route, Local or Remote, for a call on nqubit qubits"
+        if nqubit is None or nqubit > self.max_local_nqubit:
+            return Remote
+        route = Local if nqubit <= self.threshold else Remote
+        if not self.learn or abs(nqubit - self.threshold) > 1:
+            return route
+        with self._lock:
+            ncall = self._ncall.get(nqubit, 0) + 1
+            self._ncall[nqubit] = ncall
+        if ncall % self.explore_every == 0:
+            return Remote if route == Local else Local
+        return route
+
+    def record(self, route: str, nqubit: Optional[int], seconds: float):
+        "Records the latency of a call, updating the threshold if learning"
+        if nqubit is None or not self.learn:
+            return
+        with self._lock:
+            latencies = self.latencies[route]
+            previous = latencies.get(nqubit, None)
+            latencies[nqubit] = seconds if previous is None else (
+                (1.0 - self.smoothing) * previous + self.smoothing * seconds)
+            local = self.latencies[Local].get(nqubit, None)
+            remote = self.latencies[Remote].get(nqubit, None)
+            if local is None or remote is None:
+                return
+            if local < remote and nqubit > self.threshold:
+                self.threshold = min(nqubit, self.max_local_nqubit)
+            elif local >= remote and nqubit <= self.threshold:
+                self.threshold = nqubit - 1
+
+
+def call_nqubit(kwargs: dict) -> Optional[int]:
+    """
+    The number of qubits a backend call acts on: the nqubit argument, or
+    that of the circuit or statevector argument, or None if unknown
+    """
+    if kwargs.get('nqubit', None) is not None:
+        return kwargs['nqubit']
+    circuit = kwargs.get('circuit', None)
+    if circuit is not None and hasattr(circuit, 'nqubit'):
+        return circuit.nqubit
+    statevector = kwargs.get('statevector', None)
+    if statevector is not None:
+        return (len(statevector) - 1).bit_length()
+    return None
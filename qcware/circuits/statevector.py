@@ -0,0 +1,202 @@
+"""
+Post-processing of statevectors returned by `run_statevector`, so that
+expectation values, marginals, measurement histograms and Pauli
+diagonals can be computed locally instead of with further Forge calls.
+
+Pauli operators are applied to all basis states at once with bit-index
+arithmetic on np.arange(2**nqubit): a Pauli string maps basis state i to
+phase(i) * |i ^ flip>, where flip has the bits of its X and Y qubits and
+the sign of phase(i) is the parity of the bits of i on its Y and Z
+qubits.  As in quasar, qubit min_qubit is the most significant bit of
+the basis state index.
+"""
+import numpy as np
+from typing import Optional, Sequence, Tuple
+from quasar.measurement import ProbabilityHistogram
+from quasar.pauli import Pauli, PauliExpectation, PauliString
+from ..util.serialize_quasar import arrays_to_probability_histogram
+
+
+def statevector_nqubit(statevector: np.ndarray) -> int:
+    "The number of qubits of a statevector of length 2**nqubit"
+    nqubit = (len(statevector) - 1).bit_length()
+    if len(statevector) != 2**nqubit:
+        raise ValueError(f'statevector length {len(statevector)} '
+                         f'is not a power of 2')
+    return nqubit
+
+
+def _parity(x: np.ndarray) -> np.ndarray:
+    "The parity of the set bits of each element of a uint64 array"
+    for shift in (32, 16, 8, 4, 2, 1):
+        x = x ^ (x >> np.uint64(shift))
+    return x & np.uint64(1)
+
+
+def _string_masks(pauli_string: PauliString, min_qubit: int,
+                  nqubit: int) -> Tuple[int, int, int]:
+    """
+    The flip mask (X and Y qubits) and phase mask (Y and Z qubits) of a
+    Pauli string as basis state bits, and its number of Y operators
+    """
+    flip = 0
+    phase = 0
+    ny = 0
+    for qubit, char in zip(pauli_string.qubits, pauli_string.chars):
+        if qubit < min_qubit or qubit >= min_qubit + nqubit:
+            raise ValueError(f'qubit {qubit} is outside the statevector '
+                             f'(min_qubit={min_qubit}, nqubit={nqubit})')
+        bit = 1 << (nqubit - 1 - (qubit - min_qubit))
+        if char in ('X', 'Y'):
+            flip |= bit
+        if char in ('Y', 'Z'):
+            phase |= bit
+        ny += char == 'Y'
+    return flip, phase, ny
+
+
+def _apply_string(statevector: np.ndarray, indices: np.ndarray,
+                  pauli_string: PauliString, min_qubit: int,
+                  nqubit: int) -> np.ndarray:
+    "The Pauli string applied to statevector"
+    flip, phase, ny = _string_masks(pauli_string, min_qubit, nqubit)
+    signs = 1.0 - 2.0 * _parity(indices & np.uint64(phase)).astype(np.float64)
+    result = np.empty_like(statevector)
+    # P|i> = (1j**ny) * signs[i] * |i ^ flip>
+    result[indices ^ np.uint64(flip)] = (1j**ny) * signs * statevector
+    return result
+
+
+def pauli_expectation(statevector: np.ndarray,
+                      pauli: Pauli,
+                      min_qubit: int = 0) -> PauliExpectation:
+    """
+    The expectation value of each Pauli string of pauli in statevector,
+    as returned by quasar's `run_pauli_expectation`
+
+    :param statevector: A statevector from `run_statevector`
+    :type statevector: numpy.ndarray
+
+    :param pauli: The Pauli operator whose strings are evaluated
+    :type pauli: quasar.Pauli
+
+    :param min_qubit: The qubit of the most significant bit of the basis state indices; defaults to 0
+    :type min_qubit: int
+
+    :return: The expectation value of each Pauli string
+    :rtype: quasar.PauliExpectation
+    """
+    statevector = np.asarray(statevector)
+    nqubit = statevector_nqubit(statevector)
+    indices = np.arange(len(statevector), dtype=np.uint64)
+    conjugate = np.conj(statevector)
+    values = []
+    for pauli_string in pauli.keys():
+        flip, phase, ny = _string_masks(pauli_string, min_qubit, nqubit)
+        signs = 1.0 - 2.0 * _parity(indices & np.uint64(phase)).astype(
+            np.float64)
+        # <psi|P|psi> = sum_i conj(psi[i ^ flip]) phase(i) psi[i]
+        value = (1j**ny) * np.sum(
+            conjugate[indices ^ np.uint64(flip)] * signs * statevector)
+        values.append((pauli_string, value))
+    return PauliExpectation(values)
+
+
+def pauli_expectation_value(statevector: np.ndarray,
+                            pauli: Pauli,
+                            min_qubit: int = 0):
+    """
+    The expectation value of pauli in statevector, as returned by quasar's
+    `run_pauli_expectation_value` without `nmeasurement`
+    """
+    return pauli_expectation(statevector, pauli, min_qubit).dot(pauli)
+
+
+def pauli_sigma(statevector: np.ndarray,
+                pauli: Pauli,
+                min_qubit: int = 0) -> np.ndarray:
+    "pauli applied to statevector, as returned by quasar's `run_pauli_sigma`"
+    statevector = np.asarray(statevector)
+    nqubit = statevector_nqubit(statevector)
+    indices = np.arange(len(statevector), dtype=np.uint64)
+    result = np.zeros_like(statevector, dtype=np.result_type(
+        statevector, np.complex64))
+    for pauli_string, value in pauli.items():
+        result += value * _apply_string(statevector, indices, pauli_string,
+                                        min_qubit, nqubit)
+    return result
+
+
+def pauli_diagonal(pauli: Pauli,
+                   min_qubit: Optional[int] = None,
+                   nqubit: Optional[int] = None,
+                   dtype=np.complex128) -> np.ndarray:
+    """
+    The diagonal of the matrix of pauli, as returned by quasar's
+    `run_pauli_diagonal`: only the strings of I and Z operators contribute
+    """
+    min_qubit = pauli.min_qubit if min_qubit is None else min_qubit
+    nqubit = pauli.nqubit if nqubit is None else nqubit
+    indices = np.arange(2**nqubit, dtype=np.uint64)
+    result = np.zeros((2**nqubit, ), dtype=dtype)
+    for pauli_string, value in pauli.items():
+        if any(char != 'Z' for char in pauli_string.chars):
+            continue
+        _, phase, _ = _string_masks(pauli_string, min_qubit, nqubit)
+        result += value * (1.0 - 2.0 * _parity(
+            indices & np.uint64(phase)).astype(np.float64))
+    return result
+
+
+def probabilities(statevector: np.ndarray) -> np.ndarray:
+    "The probability of measuring each basis state"
+    statevector = np.asarray(statevector)
+    return statevector.real**2 + statevector.imag**2
+
+
+def marginal_probabilities(statevector: np.ndarray,
+                           qubits: Sequence[int],
+                           min_qubit: int = 0) -> np.ndarray:
+    """
+    The probabilities of the outcomes of measuring only qubits, indexed
+    (as basis states) with qubits[0] as the most significant bit
+    """
+    nqubit = statevector_nqubit(np.asarray(statevector))
+    axes = [qubit - min_qubit for qubit in qubits]
+    tensor = probabilities(statevector).reshape((2, ) * nqubit)
+    summed = tensor.sum(axis=tuple(a for a in range(nqubit)
+                                   if a not in axes))
+    # the remaining axes are in increasing qubit order
+    return np.transpose(summed, np.argsort(np.argsort(axes))).reshape(-1)
+
+
+def qubit_marginals(statevector: np.ndarray) -> np.ndarray:
+    "The probability of measuring 1 on each qubit (length nqubit)"
+    nqubit = statevector_nqubit(np.asarray(statevector))
+    tensor = probabilities(statevector).reshape((2, ) * nqubit)
+    return np.array([
+        tensor.sum(axis=tuple(a for a in range(nqubit) if a != qubit))[1]
+        for qubit in range(nqubit)
+    ])
+
+
+def measurement_histogram(statevector: np.ndarray,
+                          nmeasurement: Optional[int] = None,
+                          random_state: Optional[np.random.RandomState] = None
+                          ) -> ProbabilityHistogram:
+    """
+    The histogram of nmeasurement measurements of every qubit of
+    statevector, as returned by quasar's `run_measurement`; with
+    nmeasurement None, the exact probabilities of the (nonzero) outcomes
+    """
+    p = probabilities(statevector)
+    nqubit = statevector_nqubit(p)
+    if nmeasurement is None:
+        outcomes = np.flatnonzero(p)
+        return arrays_to_probability_histogram(nqubit, outcomes, p[outcomes])
+    random_state = np.random if random_state is None else random_state
+    counts = random_state.multinomial(nmeasurement, p / p.sum())
+    outcomes = np.flatnonzero(counts)
+    return arrays_to_probability_histogram(nqubit, outcomes,
+                                           counts[outcomes] / nmeasurement,
+                                           nmeasurement)
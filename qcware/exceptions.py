@@ -20,3 +20,16 @@ class ApiTimeoutError(ApiException):
     def __init__(self, message, api_call_info):
         super().__init__(message)
         self.api_call_info = api_call_info
+
+
+class UnknownCircuitTemplateError(QCWareClientException):
+    def __init__(self, template_id):
+        super().__init__(f"Unknown circuit template {template_id}")
+        self.template_id = template_id
+
+
+class CircuitTemplateMismatchError(QCWareClientException):
+    def __init__(self, template_id):
+        super().__init__(
+            f"Circuit structure does not match template id {template_id}")
+        self.template_id = template_id
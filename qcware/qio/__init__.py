@@ -1,5 +1,10 @@
-#  AUTO-GENERATED FILE - MODIFY AT OWN RISK
 #  Project: qcware
 #  Copyright (c) 2019 QC Ware Corp - All Rights Reserved
+#
+#  Not generated: besides the generated API functions, this exports the
+#  client-side loaders of local_loader, so it must not be overwritten by
+#  the generator.
 
 from .loader import loader, async_loader
+from .loader_batch import loader_batch, async_loader_batch
+from .local_loader import local_loader, local_loader_batch
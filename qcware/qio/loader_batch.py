@@ -0,0 +1,82 @@
+#  AUTO-GENERATED FILE - MODIFY AT OWN RISK
+#  Project: qcware
+#  Copyright (c) 2019 QC Ware Corp - All Rights Reserved
+
+import numpy
+
+import asyncio
+from .. import logger
+from ..api_calls import post_call, wait_for_call, handle_result
+from ..util.transforms import client_args_to_wire
+from ..exceptions import ApiTimeoutError
+
+
+def loader_batch(data: numpy.ndarray,
+                 mode: str = 'optimized',
+                 at_beginning_of_circuit: bool = True,
+                 api_key: str = None,
+                 host: str = None):
+    r"""Creates a data loader circuit for each row of a matrix, as loader does for a single vector, in a single API call.  The loaders of every row share the same structure, which is sent once along with the angles of each row.
+
+Arguments:
+
+:param data: A 2-d array whose rows are the classical data to be represented in the circuits
+:type data: numpy.ndarray
+
+:param mode: Whether to used the "optimized" loader (using approximately :math:`~sqrt(d)` depth and :math:`~sqrt(d)` qubits) or the "parallel" loader (using approximately :math:`log(d)` depth and `d` qubits., defaults to optimized
+:type mode: str
+
+:param at_beginning_of_circuit: Whether the loaders are at the beginning of the circuit (in which they perform an initial X gate on the first qubit), defaults to True
+:type at_beginning_of_circuit: bool
+
+
+:return: A list of Quasar circuits, one loading each row of data into a quantum state.
+:rtype: List[quasar.Circuit]
+    """
+    data = client_args_to_wire('qio.loader_batch', **locals())
+    api_call = post_call('qio/loader_batch', data, host=host)
+    logger.info(
+        f'API call to qio.loader_batch successful. Your API token is {api_call["uid"]}'
+    )
+    return handle_result(
+        wait_for_call(api_key=api_key, host=host, call_token=api_call['uid']))
+
+
+async def async_loader_batch(data: numpy.ndarray,
+                             mode: str = 'optimized',
+                             at_beginning_of_circuit: bool = True,
+                             api_key: str = None,
+                             host: str = None):
+    r"""Async version of loader_batch
+Creates a data loader circuit for each row of a matrix, as loader does for a single vector, in a single API call.  The loaders of every row share the same structure, which is sent once along with the angles of each row.
+
+
+Arguments:
+
+:param data: A 2-d array whose rows are the classical data to be represented in the circuits
+:type data: numpy.ndarray
+
+:param mode: Whether to used the "optimized" loader (using approximately :math:`~sqrt(d)` depth and :math:`~sqrt(d)` qubits) or the "parallel" loader (using approximately :math:`log(d)` depth and `d` qubits., defaults to optimized
+:type mode: str
+
+:param at_beginning_of_circuit: Whether the loaders are at the beginning of the circuit (in which they perform an initial X gate on the first qubit), defaults to True
+:type at_beginning_of_circuit: bool
+
+
+:return: A list of Quasar circuits, one loading each row of data into a quantum state.
+:rtype: List[quasar.Circuit]
+    """
+    data = client_args_to_wire('qio.loader_batch', **locals())
+    api_call = post_call('qio/loader_batch', data, host=host)
+    logger.info(
+        f'API call to qio.loader_batch successful. Your API token is {api_call["uid"]}'
+    )
+
+    while True:
+        try:
+            return handle_result(
+                wait_for_call(api_key=api_key,
+                              host=host,
+                              call_token=api_call['uid']))
+        except ApiTimeoutError as e:
+            await asyncio.sleep(5)
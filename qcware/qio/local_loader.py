@@ -0,0 +1,224 @@
+"""
+Client-side construction of the data loader circuits of `qio.loader`, so
+that loading a vector doesn't need a Forge round trip.
+
+A vector of length d (padded with zeros to a power of 2) is loaded in
+unary: the parallel loader prepares sum_i x_i |e_i> on d qubits with a
+binary tree of RBS gates, and the optimized loader prepares
+sum_{r,c} x_{r n2 + c} |e_r>|e_c> on n1 + n2 qubits (n1 n2 = d) by loading
+the row norms on the first register and then each row, controlled on
+its qubit of the first register, on the second.  The RBS angles of
+every tree are computed together from the norms of the subtrees.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Iterator, List, Sequence, Tuple
+import numpy as np
+from quasar.circuit import Circuit, ControlledGate, Gate
+from ..util.serialize_quasar import circuits_from_template
+
+Loader_modes = ('optimized', 'parallel')
+
+# the number of loader circuits kept by local_loader
+Loader_cache_size = 128
+
+_loader_cache = OrderedDict()
+_loader_cache_lock = threading.Lock()
+
+
+def _padded_length(d: int) -> int:
+    return 1 << max(0, (d - 1).bit_length())
+
+
+def tree_angles(x: np.ndarray) -> List[np.ndarray]:
+    """
+    The RBS angles of the loader trees of each row of the 2-d array x (of
+    a power of 2 columns), by level from the root: level k is an array of
+    shape (nrow, 2**k).  The angle of a node splits its norm between its
+    two subtrees; those of the leaves are signed, so negative entries are
+    loaded too.
+    """
+    if x.shape[1] == 1:
+        return []
+    levels = [np.arctan2(x[:, 1::2], x[:, 0::2])]
+    norms = np.hypot(x[:, 0::2], x[:, 1::2])
+    while norms.shape[1] > 1:
+        levels.append(np.arctan2(norms[:, 1::2], norms[:, 0::2]))
+        norms = np.hypot(norms[:, 0::2], norms[:, 1::2])
+    return levels[::-1]
+
+
+def _add_tree(circuit: Circuit,
+              qubits: List[int],
+              angles: Iterator[float],
+              control: int = None):
+    """
+    Adds the RBS gates of a loader tree over qubits, level by level from
+    the root, taking their angles from angles in turn; the tree moves
+    amplitude from qubits[0] to every qubit
+    """
+    span = len(qubits) // 2
+    while span >= 1:
+        for node in range(0, len(qubits), 2 * span):
+            pair = (qubits[node], qubits[node + span])
+            gate = Gate.RBS(theta=next(angles))
+            if control is None:
+                circuit.add_gate(gate, pair, copy=False)
+            else:
+                circuit.add_gate(ControlledGate(gate), (control, ) + pair,
+                                 copy=False)
+        span //= 2
+
+
+def optimized_shape(d: int) -> Tuple[int, int]:
+    "The sizes (n1, n2) of the two registers of the optimized loader"
+    m = (_padded_length(d) - 1).bit_length()
+    return 1 << (m // 2), 1 << (m - m // 2)
+
+
+def _check_mode(mode: str):
+    if mode not in Loader_modes:
+        raise ValueError(f'mode must be one of {Loader_modes}: {mode}')
+
+
+def _padded(data: np.ndarray) -> np.ndarray:
+    "The rows of data padded with zeros to a power of 2 columns"
+    data = np.asarray(data, dtype=np.float64)
+    x = np.zeros((data.shape[0], _padded_length(data.shape[1])))
+    x[:, :data.shape[1]] = data
+    return x
+
+
+def loader_angles(x: np.ndarray, mode: str) -> np.ndarray:
+    """
+    The RBS angles of the loader of each row of x (of a power of 2
+    columns), in the order their gates are added by loader_circuit
+    """
+    if mode == 'parallel':
+        return np.concatenate([np.zeros((x.shape[0], 0))] + tree_angles(x),
+                              axis=1)
+    n1, n2 = optimized_shape(x.shape[1])
+    rows = x.reshape(x.shape[0], n1, n2)
+    row_levels = [
+        level.reshape(x.shape[0], n1, -1)
+        for level in tree_angles(rows.reshape(-1, n2))
+    ]
+    return np.concatenate(
+        [np.zeros((x.shape[0], 0))] +
+        tree_angles(np.linalg.norm(rows, axis=2)) + [
+            np.concatenate([np.zeros((x.shape[0], n1, 0))] + row_levels,
+                           axis=2).reshape(x.shape[0], -1)
+        ],
+        axis=1)
+
+
+def loader_circuit(d: int, mode: str, at_beginning_of_circuit: bool,
+                   angles: Sequence[float]) -> Circuit:
+    """
+    The loader circuit for vectors of padded length d, with the RBS
+    angles given in the order of loader_angles
+    """
+    angles = iter(angles)
+    circuit = Circuit()
+    if mode == 'parallel':
+        if at_beginning_of_circuit:
+            circuit.X(0)
+        _add_tree(circuit, list(range(d)), angles)
+        return circuit
+    n1, n2 = optimized_shape(d)
+    if at_beginning_of_circuit:
+        circuit.X(0)
+        circuit.X(n1)
+    _add_tree(circuit, list(range(n1)), angles)
+    for row in range(n1):
+        _add_tree(circuit, list(range(n1, n1 + n2)), angles, row)
+    return circuit
+
+
+def build_loader(data: np.ndarray,
+                 mode: str = 'optimized',
+                 at_beginning_of_circuit: bool = True) -> Circuit:
+    """
+    Builds the loader circuit of a vector (without caching; see
+    local_loader)
+    """
+    _check_mode(mode)
+    x = _padded(np.reshape(data, (1, -1)))
+    return loader_circuit(x.shape[1], mode, at_beginning_of_circuit,
+                          loader_angles(x, mode)[0].tolist())
+
+
+def build_loader_batch(data: np.ndarray,
+                       mode: str = 'optimized',
+                       at_beginning_of_circuit: bool = True) -> List[Circuit]:
+    """
+    Builds the loader circuit of each row of a 2-d array.  The loaders
+    of every row have the same structure, so it is built once, and each
+    row's circuit is filled in from it with that row's angles.
+    """
+    _check_mode(mode)
+    x = _padded(data)
+    angles = loader_angles(x, mode)
+    # numbering the angles shows the order of the circuit's parameters
+    template = loader_circuit(x.shape[1], mode, at_beginning_of_circuit,
+                              range(angles.shape[1]))
+    order = np.array(template.parameter_values, dtype=np.int64)
+    return circuits_from_template(template, angles[:, order])
+
+
+def _data_digest(data: np.ndarray) -> str:
+    data = np.ascontiguousarray(data, dtype=np.float64)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str(data.shape).encode('utf-8'))
+    h.update(data.tobytes())
+    return h.hexdigest()
+
+
+def local_loader(data: np.ndarray,
+                 mode: str = 'optimized',
+                 at_beginning_of_circuit: bool = True) -> Circuit:
+    """
+    Builds the same loader circuit as `qio.loader`, locally.  The last
+    Loader_cache_size circuits built are cached by a digest of the data
+    and the options; a copy is returned, so it may be modified freely.
+
+    :param data: A 1-d array representing the classical data to be represented in the circuit
+    :type data: numpy.ndarray
+
+    :param mode: Whether to use the "optimized" loader (using approximately :math:`~sqrt(d)` depth and :math:`~sqrt(d)` qubits) or the "parallel" loader (using approximately :math:`log(d)` depth and `d` qubits), defaults to optimized
+    :type mode: str
+
+    :param at_beginning_of_circuit: Whether the loader is at the beginning of the circuit, in which case it starts with X gates preparing the first state of each unary register, defaults to True
+    :type at_beginning_of_circuit: bool
+
+    :return: A Quasar circuit which loads the classical vector into a quantum state
+    :rtype: quasar.Circuit
+    """
+    key = (_data_digest(data), mode, at_beginning_of_circuit)
+    with _loader_cache_lock:
+        circuit = _loader_cache.get(key, None)
+        if circuit is not None:
+            _loader_cache.move_to_end(key)
+    if circuit is None:
+        circuit = build_loader(data, mode, at_beginning_of_circuit)
+        with _loader_cache_lock:
+            _loader_cache[key] = circuit
+            while len(_loader_cache) > Loader_cache_size:
+                _loader_cache.popitem(last=False)
+    return circuit.copy()
+
+
+def local_loader_batch(data: np.ndarray,
+                       mode: str = 'optimized',
+                       at_beginning_of_circuit: bool = True) -> List[Circuit]:
+    """
+    Builds the same loader circuits as `qio.loader_batch`, locally: one
+    for each row of data.  The circuits aren't cached.
+    """
+    return build_loader_batch(data, mode, at_beginning_of_circuit)
+
+
+def clear_loader_cache():
+    with _loader_cache_lock:
+        _loader_cache.clear()
@@ -1,5 +1,13 @@
-#  AUTO-GENERATED FILE - MODIFY AT OWN RISK
 #  Project: qcware
 #  Copyright (c) 2019 QC Ware Corp - All Rights Reserved
+#
+#  Not generated: besides the generated API functions, this exports the
+#  streaming predictions of stream and the estimators of estimators, so
+#  it must not be overwritten by the generator.
 
 from .fit_and_predict import fit_and_predict, async_fit_and_predict
+from .fit import fit, async_fit
+from .predict import predict, async_predict
+from .stream import predict_stream, fit_and_predict_stream
+from .estimators import (QNearestCentroid, QNeighborsClassifier,
+                         QNeighborsRegressor, QMeans)
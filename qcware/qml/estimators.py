@@ -0,0 +1,222 @@
+"""
+scikit-learn compatible estimators for the qml models, for use in
+pipelines, cross-validation and grid searches.  Fitting uploads the
+training data with `fit`; the handles of the last Fit_cache_size fitted
+models are cached by a digest of the training data and the model's
+settings, so refitting an identical model (as cross-validation and grid
+searches do repeatedly) doesn't upload the training data again.
+
+scikit-learn is optional: when it is installed, the estimators derive
+from its BaseEstimator and mixins.
+"""
+import hashlib
+import inspect
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+import numpy
+from ..config import qcware_api_key
+from .fit import fit
+from .stream import predict_stream
+
+try:
+    from sklearn.base import (BaseEstimator as _BaseEstimator,
+                              ClassifierMixin as _ClassifierMixin,
+                              ClusterMixin as _ClusterMixin,
+                              RegressorMixin as _RegressorMixin)
+    from sklearn.exceptions import NotFittedError
+except ImportError:
+
+    class _BaseEstimator(object):
+        "get_params and set_params, as provided by sklearn's BaseEstimator"
+        @classmethod
+        def _get_param_names(cls):
+            signature = inspect.signature(cls.__init__)
+            return sorted(p.name for p in signature.parameters.values()
+                          if p.name != 'self')
+
+        def get_params(self, deep=True):
+            return {k: getattr(self, k) for k in self._get_param_names()}
+
+        def set_params(self, **params):
+            valid = self._get_param_names()
+            for k, v in params.items():
+                if k not in valid:
+                    raise ValueError(
+                        f'Invalid parameter {k} for estimator {self}')
+                setattr(self, k, v)
+            return self
+
+    class _ClassifierMixin(object):
+        _estimator_type = 'classifier'
+
+    class _ClusterMixin(object):
+        _estimator_type = 'clusterer'
+
+    class _RegressorMixin(object):
+        _estimator_type = 'regressor'
+
+    class NotFittedError(ValueError, AttributeError):
+        pass
+
+
+Fit_cache_size = 128
+_fit_cache = OrderedDict()
+_fit_cache_lock = threading.Lock()
+
+
+def _array_digest(x) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    if x is not None:
+        x = numpy.ascontiguousarray(x)
+        h.update(str((x.dtype.str, x.shape)).encode('utf-8'))
+        h.update(x.tobytes())
+    return h.hexdigest()
+
+
+def cached_fit(X: numpy.ndarray,
+               model: str,
+               y: numpy.ndarray = None,
+               parameters: dict = {},
+               backend: str = 'classical/simulator',
+               api_key: str = None,
+               host: str = None) -> dict:
+    """
+    `fit`, returning the handle of an identical model fitted earlier
+    with the same API key (same training data, model, parameters and
+    backend) rather than uploading the training data again
+    """
+    api_key = qcware_api_key(api_key)
+    key = (hashlib.blake2b(str(api_key).encode('utf-8'),
+                           digest_size=16).hexdigest(), _array_digest(X),
+           _array_digest(y), model,
+           json.dumps(parameters, sort_keys=True, default=str), backend, host)
+    with _fit_cache_lock:
+        handle = _fit_cache.get(key, None)
+        if handle is not None:
+            _fit_cache.move_to_end(key)
+            return handle
+    handle = fit(X=X,
+                 model=model,
+                 y=y,
+                 parameters=parameters,
+                 backend=backend,
+                 api_key=api_key,
+                 host=host)
+    with _fit_cache_lock:
+        _fit_cache[key] = handle
+        while len(_fit_cache) > Fit_cache_size:
+            _fit_cache.popitem(last=False)
+    return handle
+
+
+def clear_fit_cache():
+    with _fit_cache_lock:
+        _fit_cache.clear()
+
+
+class _QMLEstimator(_BaseEstimator):
+    _model = None
+
+    def __init__(self,
+                 parameters: dict = None,
+                 backend: str = 'classical/simulator',
+                 n_jobs: int = None,
+                 batch_size: int = None,
+                 api_key: str = None,
+                 host: str = None):
+        """
+        :param parameters: Dictionary containing parameters for the model, defaults to None (no parameters)
+        :type parameters: dict
+
+        :param backend: String describing the backend to use; currently one of [classical/simulator, vulcan/simulator], defaults to classical/simulator
+        :type backend: str
+
+        :param n_jobs: The number of predictions to run concurrently; -1 to use one per processor, defaults to None (1)
+        :type n_jobs: int
+
+        :param batch_size: The number of rows of test data sent with each prediction, defaults to None (the test data split evenly between n_jobs predictions)
+        :type batch_size: int
+        """
+        self.parameters = parameters
+        self.backend = backend
+        self.n_jobs = n_jobs
+        self.batch_size = batch_size
+        self.api_key = api_key
+        self.host = host
+
+    def fit(self, X, y=None):
+        X = numpy.asarray(X)
+        if y is not None:
+            y = numpy.asarray(y)
+        self.model_handle_ = cached_fit(X=X,
+                                        model=self._model,
+                                        y=y,
+                                        parameters=self.parameters or {},
+                                        backend=self.backend,
+                                        api_key=self.api_key,
+                                        host=self.host)
+        self.n_features_in_ = X.shape[1]
+        return self
+
+    def _n_jobs(self) -> int:
+        if self.n_jobs is None:
+            return 1
+        if self.n_jobs < 0:
+            return max(1, (os.cpu_count() or 1) + 1 + self.n_jobs)
+        return self.n_jobs
+
+    def predict(self, T):
+        if not hasattr(self, 'model_handle_'):
+            raise NotFittedError(
+                f'This {type(self).__name__} instance is not fitted yet')
+        T = numpy.asarray(T)
+        if T.shape[0] == 0:
+            return numpy.zeros(0)
+        n_jobs = self._n_jobs()
+        batch_size = (self.batch_size if self.batch_size is not None else
+                      math.ceil(T.shape[0] / n_jobs))
+        return numpy.concatenate(
+            list(
+                predict_stream(self.model_handle_,
+                               T,
+                               batch_size=batch_size,
+                               max_in_flight=n_jobs,
+                               api_key=self.api_key,
+                               host=self.host)))
+
+
+class _QMLClassifier(_ClassifierMixin, _QMLEstimator):
+    def fit(self, X, y):
+        self.classes_ = numpy.unique(y)
+        return super().fit(X, y)
+
+
+class QNearestCentroid(_QMLClassifier):
+    "The QNearestCentroid classifier as a scikit-learn estimator"
+    _model = 'QNearestCentroid'
+
+
+class QNeighborsClassifier(_QMLClassifier):
+    "The QNeighborsClassifier classifier as a scikit-learn estimator"
+    _model = 'QNeighborsClassifier'
+
+
+class QNeighborsRegressor(_RegressorMixin, _QMLEstimator):
+    "The QNeighborsRegressor regressor as a scikit-learn estimator"
+    _model = 'QNeighborsRegressor'
+
+    def fit(self, X, y):
+        return super().fit(X, y)
+
+
+class QMeans(_ClusterMixin, _QMLEstimator):
+    "The QMeans clustering model as a scikit-learn estimator"
+    _model = 'QMeans'
+
+    def fit(self, X, y=None):
+        super().fit(X)
+        self.labels_ = self.predict(X)
+        return self
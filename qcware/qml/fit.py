@@ -0,0 +1,102 @@
+#  AUTO-GENERATED FILE - MODIFY AT OWN RISK
+#  Project: qcware
+#  Copyright (c) 2019 QC Ware Corp - All Rights Reserved
+
+import numpy
+
+import asyncio
+from .. import logger
+from ..api_calls import post_call, wait_for_call, handle_result
+from ..util.transforms import client_args_to_wire
+from ..exceptions import ApiTimeoutError
+
+
+def fit(X: numpy.array,
+        model: str,
+        y: numpy.array = None,
+        parameters: dict = {},
+        backend: str = 'classical/simulator',
+        api_key: str = None,
+        host: str = None):
+    r"""Fits data to a quantum model for the purposes of classification, returning a handle to the fitted model which is kept on Forge.  Predictions are then made with `predict`, which sends only the data to classify, so that classifying many batches of data doesn't send (or fit) the training data again.
+The interface and use are similar to scikit-learn's fit function.
+Four clustering models are implemented at this time (see parameter `model`)
+
+Arguments:
+
+:param X: Training data: :math:`(N\times d)` array containing training data
+:type X: numpy.array
+
+:param model: String for the clustering model; one of ['QNearestCentroid', 'QNeighborsClassifier', 'QNeighborsRegressor', 'QMeans']
+:type model: str
+
+:param y: Label vector: length :math:`d` array containing respective labels of each data, defaults to None
+:type y: numpy.array
+
+:param parameters: Dictionary containing parameters for the model, defaults to {}
+:type parameters: dict
+
+:param backend: String describing the backend to use; currently one of [classical/simulator, vulcan/simulator], defaults to classical/simulator
+:type backend: str
+
+
+:return: A handle to the fitted model, to be passed to `predict`.  The handle is a JSON-serializable dict and can be stored and reused
+:rtype: dict
+    """
+    data = client_args_to_wire('qml.fit', **locals())
+    api_call = post_call('qml/fit', data, host=host)
+    logger.info(
+        f'API call to qml.fit successful. Your API token is {api_call["uid"]}'
+    )
+    return handle_result(
+        wait_for_call(api_key=api_key, host=host, call_token=api_call['uid']))
+
+
+async def async_fit(X: numpy.array,
+                    model: str,
+                    y: numpy.array = None,
+                    parameters: dict = {},
+                    backend: str = 'classical/simulator',
+                    api_key: str = None,
+                    host: str = None):
+    r"""Async version of fit
+Fits data to a quantum model for the purposes of classification, returning a handle to the fitted model which is kept on Forge.  Predictions are then made with `predict`, which sends only the data to classify, so that classifying many batches of data doesn't send (or fit) the training data again.
+The interface and use are similar to scikit-learn's fit function.
+Four clustering models are implemented at this time (see parameter `model`)
+
+
+Arguments:
+
+:param X: Training data: :math:`(N\times d)` array containing training data
+:type X: numpy.array
+
+:param model: String for the clustering model; one of ['QNearestCentroid', 'QNeighborsClassifier', 'QNeighborsRegressor', 'QMeans']
+:type model: str
+
+:param y: Label vector: length :math:`d` array containing respective labels of each data, defaults to None
+:type y: numpy.array
+
+:param parameters: Dictionary containing parameters for the model, defaults to {}
+:type parameters: dict
+
+:param backend: String describing the backend to use; currently one of [classical/simulator, vulcan/simulator], defaults to classical/simulator
+:type backend: str
+
+
+:return: A handle to the fitted model, to be passed to `predict`.  The handle is a JSON-serializable dict and can be stored and reused
+:rtype: dict
+    """
+    data = client_args_to_wire('qml.fit', **locals())
+    api_call = post_call('qml/fit', data, host=host)
+    logger.info(
+        f'API call to qml.fit successful. Your API token is {api_call["uid"]}'
+    )
+
+    while True:
+        try:
+            return handle_result(
+                wait_for_call(api_key=api_key,
+                              host=host,
+                              call_token=api_call['uid']))
+        except ApiTimeoutError as e:
+            await asyncio.sleep(5)
@@ -0,0 +1,76 @@
+#  AUTO-GENERATED FILE - MODIFY AT OWN RISK
+#  Project: qcware
+#  Copyright (c) 2019 QC Ware Corp - All Rights Reserved
+
+import numpy
+
+import asyncio
+from .. import logger
+from ..api_calls import post_call, wait_for_call, handle_result
+from ..util.transforms import client_args_to_wire
+from ..exceptions import ApiTimeoutError
+
+
+def predict(model_handle: dict,
+            T: numpy.array,
+            api_key: str = None,
+            host: str = None):
+    r"""Classifies data with a model fitted by `fit`.  Only the data to classify is sent, so the cost of each call doesn't depend on the size of the training data.
+The interface and use are similar to scikit-learn's predict function.
+
+Arguments:
+
+:param model_handle: The handle returned by `fit`
+:type model_handle: dict
+
+:param T: Test data: :math:`(M\times d)` array containing test data
+:type T: numpy.array
+
+
+:return: A numpy array the length of the test data `T` containing fit labels
+:rtype: numpy.array
+    """
+    data = client_args_to_wire('qml.predict', **locals())
+    api_call = post_call('qml/predict', data, host=host)
+    logger.info(
+        f'API call to qml.predict successful. Your API token is {api_call["uid"]}'
+    )
+    return handle_result(
+        wait_for_call(api_key=api_key, host=host, call_token=api_call['uid']))
+
+
+async def async_predict(model_handle: dict,
+                        T: numpy.array,
+                        api_key: str = None,
+                        host: str = None):
+    r"""Async version of predict
+Classifies data with a model fitted by `fit`.  Only the data to classify is sent, so the cost of each call doesn't depend on the size of the training data.
+The interface and use are similar to scikit-learn's predict function.
+
+
+Arguments:
+
+:param model_handle: The handle returned by `fit`
+:type model_handle: dict
+
+:param T: Test data: :math:`(M\times d)` array containing test data
+:type T: numpy.array
+
+
+:return: A numpy array the length of the test data `T` containing fit labels
+:rtype: numpy.array
+    """
+    data = client_args_to_wire('qml.predict', **locals())
+    api_call = post_call('qml/predict', data, host=host)
+    logger.info(
+        f'API call to qml.predict successful. Your API token is {api_call["uid"]}'
+    )
+
+    while True:
+        try:
+            return handle_result(
+                wait_for_call(api_key=api_key,
+                              host=host,
+                              call_token=api_call['uid']))
+        except ApiTimeoutError as e:
+            await asyncio.sleep(5)
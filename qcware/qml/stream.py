@@ -0,0 +1,121 @@
+"""
+Streaming prediction for test sets too large to send (or hold) at once:
+the test data is split into batches which are classified by concurrent
+`predict` calls, and the labels of each batch are yielded in order as
+they arrive.
+"""
+import collections
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Union
+import numpy
+from .fit import fit
+from .predict import predict
+
+
+def _test_data(T: Union[numpy.ndarray, str]) -> numpy.ndarray:
+    "T, or the .npy file it names opened as a read-only memmap"
+    if isinstance(T, str):
+        return numpy.load(T, mmap_mode='r')
+    return T
+
+
+def _check_batching(batch_size: int, max_in_flight: int):
+    if batch_size < 1 or max_in_flight < 1:
+        raise ValueError('batch_size and max_in_flight must be positive')
+
+
+def predict_stream(model_handle: dict,
+                   T: Union[numpy.ndarray, str],
+                   batch_size: int = 10000,
+                   max_in_flight: int = 4,
+                   api_key: str = None,
+                   host: str = None) -> Iterator[numpy.ndarray]:
+    r"""Classifies test data in batches of `batch_size` rows with a model fitted by `fit`, keeping up to `max_in_flight` `predict` calls in progress at once, and yields the labels of each batch in order.  Rows of `T` are only read when their batch is sent, so a `numpy.memmap` (or the name of a .npy file, which is opened as one) is never read into memory as a whole.
+
+Arguments:
+
+:param model_handle: The handle returned by `fit`
+:type model_handle: dict
+
+:param T: Test data: :math:`(M\times d)` array containing test data, or the name of a .npy file containing it
+:type T: numpy.ndarray or str
+
+:param batch_size: The number of rows of `T` sent with each call, defaults to 10000
+:type batch_size: int
+
+:param max_in_flight: The maximum number of calls in progress at once, defaults to 4
+:type max_in_flight: int
+
+
+:return: An iterator over the arrays of labels of each batch of `T`, in order
+:rtype: Iterator[numpy.ndarray]
+    """
+    # the arguments are checked now rather than when iteration starts
+    if not isinstance(model_handle, dict):
+        raise ValueError('model_handle must be the handle returned by fit')
+    _check_batching(batch_size, max_in_flight)
+    T = _test_data(T)
+    if T.ndim != 2:
+        raise ValueError(f'T must be a 2-d array: {T.shape}')
+    return _predict_batches(model_handle, T, batch_size, max_in_flight,
+                            api_key, host)
+
+
+def _predict_batches(model_handle: dict, T: numpy.ndarray, batch_size: int,
+                     max_in_flight: int, api_key: str,
+                     host: str) -> Iterator[numpy.ndarray]:
+    "The generator behind predict_stream"
+    starts = iter(range(0, T.shape[0], batch_size))
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        in_flight = collections.deque()
+
+        def submit_next() -> bool:
+            start = next(starts, None)
+            if start is None:
+                return False
+            in_flight.append(
+                executor.submit(predict,
+                                model_handle=model_handle,
+                                T=numpy.asarray(T[start:start + batch_size]),
+                                api_key=api_key,
+                                host=host))
+            return True
+
+        while len(in_flight) < max_in_flight and submit_next():
+            pass
+        while len(in_flight) > 0:
+            labels = in_flight.popleft().result()
+            submit_next()
+            yield labels
+
+
+def fit_and_predict_stream(X: numpy.ndarray,
+                           model: str,
+                           T: Union[numpy.ndarray, str],
+                           y: numpy.ndarray = None,
+                           parameters: dict = {},
+                           backend: str = 'classical/simulator',
+                           batch_size: int = 10000,
+                           max_in_flight: int = 4,
+                           api_key: str = None,
+                           host: str = None) -> Iterator[numpy.ndarray]:
+    r"""A streaming counterpart of `fit_and_predict`: fits the model once with `fit`, then classifies `T` with `predict_stream`, yielding the labels of each batch of `batch_size` rows in order.  Takes the arguments of `fit_and_predict` and `predict_stream`.
+
+:return: An iterator over the arrays of labels of each batch of `T`, in order
+:rtype: Iterator[numpy.ndarray]
+    """
+    # bad batching would otherwise only be reported after fitting
+    _check_batching(batch_size, max_in_flight)
+    model_handle = fit(X=X,
+                       model=model,
+                       y=y,
+                       parameters=parameters,
+                       backend=backend,
+                       api_key=api_key,
+                       host=host)
+    return predict_stream(model_handle,
+                          T,
+                          batch_size=batch_size,
+                          max_in_flight=max_in_flight,
+                          api_key=api_key,
+                          host=host)
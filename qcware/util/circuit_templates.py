@@ -0,0 +1,139 @@
+# Circuit templates: a circuit's structure is registered with Forge once,
+# and later calls with the same structure send only the template id and
+# the vector of parameter values.
+import contextlib
+import contextvars
+import threading
+from collections import OrderedDict
+from typing import Optional, Sequence
+import numpy as np
+from quasar.circuit import Circuit
+from sortedcontainers import SortedDict, SortedSet
+from .serialize_quasar import (quasar_to_string, quasar_to_compact_string,
+                               string_to_quasar,
+                               circuit_structure_fingerprint)
+from .transforms.helpers import ndarray_to_dict, dict_to_ndarray
+from ..exceptions import (UnknownCircuitTemplateError,
+                          CircuitTemplateMismatchError)
+
+
+class TemplatedCircuit(object):
+    """
+    Marks a circuit to be sent as a reference to a template.  The structure
+    is only included on the wire if include_structure is True (ie the first
+    time a given template is sent).
+    """
+    def __init__(self,
+                 circuit: Circuit,
+                 template_id: str,
+                 include_structure: bool = True):
+        self.circuit = circuit
+        self.template_id = template_id
+        self.include_structure = include_structure
+
+
+def circuit_template_id(q: Circuit) -> str:
+    """
+    A digest of the structure of the circuit: gate names, times, qubits
+    and anything which is not a circuit parameter (eg U1/U2 matrices),
+    but not the parameter values themselves
+    """
+    return circuit_structure_fingerprint(q)
+
+
+def substitute_parameters(structure: Circuit,
+                          parameter_values: Sequence[float]) -> Circuit:
+    """
+    Returns a copy of structure with its parameters set to
+    parameter_values (in the order of Circuit.parameter_values).
+    Parameterless gates are shared with structure rather than copied,
+    and the circuit internals are filled directly rather than through
+    add_gate.
+    """
+    if len(parameter_values) != structure.nparameter:
+        raise ValueError(f'{len(parameter_values)} parameter values given '
+                         f'for a circuit with {structure.nparameter}')
+    values = iter(parameter_values)
+    gates = []
+    for key, gate in structure.gates.items():
+        if gate.nparameter > 0:
+            gate = gate.copy()
+            for parameter_key in list(gate.parameters.keys()):
+                gate.set_parameter(parameter_key, next(values))
+        gates.append((key, gate))
+    result = Circuit.__new__(Circuit)
+    result.gates = SortedDict(gates)
+    result.qubits = SortedSet(structure.qubits)
+    result.times = SortedSet(structure.times)
+    result.times_and_qubits = SortedSet(structure.times_and_qubits)
+    return result
+
+
+def templated_circuit_to_dict(t: TemplatedCircuit) -> dict:
+    parameter_values = np.array(t.circuit.parameter_values, dtype=np.float64)
+    return dict(template_id=t.template_id,
+                parameters=ndarray_to_dict(parameter_values),
+                structure=quasar_to_compact_string(t.circuit)
+                if t.include_structure else None)
+
+
+# Server-side cache of template structures, in least-recently-used order,
+# keyed by (api key, template id) so that each key has its own templates
+Max_cached_templates = 256
+_template_cache = OrderedDict()
+_template_cache_lock = threading.Lock()
+_template_api_key = contextvars.ContextVar('template_api_key', default=None)
+
+
+@contextlib.contextmanager
+def template_namespace(api_key: Optional[str]):
+    "Templates decoded within the context are cached under api_key"
+    token = _template_api_key.set(api_key)
+    try:
+        yield
+    finally:
+        _template_api_key.reset(token)
+
+
+def dict_to_templated_circuit(d: dict) -> Circuit:
+    """
+    Rebuilds a circuit sent by templated_circuit_to_dict, caching the
+    structure if it was sent (after checking that it matches the template
+    id) and otherwise looking it up from the cache
+    """
+    template_id = d['template_id']
+    key = (_template_api_key.get(), template_id)
+    if d.get('structure', None) is not None:
+        structure = string_to_quasar(d['structure'])
+        if circuit_template_id(structure) != template_id:
+            raise CircuitTemplateMismatchError(template_id)
+        with _template_cache_lock:
+            _template_cache[key] = structure
+            while len(_template_cache) > Max_cached_templates:
+                _template_cache.popitem(last=False)
+    else:
+        with _template_cache_lock:
+            structure = _template_cache.get(key, None)
+            if structure is None:
+                raise UnknownCircuitTemplateError(template_id)
+            _template_cache.move_to_end(key)
+    return substitute_parameters(structure,
+                                 dict_to_ndarray(d['parameters']).tolist())
+
+
+def circuit_to_wire(c):
+    "Serializes a Circuit or TemplatedCircuit argument"
+    if isinstance(c, TemplatedCircuit):
+        return templated_circuit_to_dict(c)
+    else:
+        return quasar_to_string(c)
+
+
+def circuit_from_wire(c) -> Optional[Circuit]:
+    "Deserializes an argument serialized by circuit_to_wire"
+    if isinstance(c, dict):
+        return dict_to_templated_circuit(c)
+    elif isinstance(c, str):
+        return string_to_quasar(c)
+    else:
+        return c
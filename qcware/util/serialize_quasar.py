@@ -1,11 +1,15 @@
 # helper routines to serialize to/from quasar circuits
 import re
+import collections
+import functools
+import hashlib
+import threading
 from quasar.circuit import Circuit, CompositeGate, ControlledGate, Gate
 from quasar.pauli import PauliString, Pauli
-from quasar.measurement import ProbabilityHistogram
+from quasar.measurement import Histogram, ProbabilityHistogram, CountHistogram
 from .transforms.helpers import ndarray_to_dict, dict_to_ndarray, scalar_to_dict, dict_to_scalar
 import numpy as np
-from typing import Sequence, List, Tuple, Dict, Mapping
+from typing import Callable, Sequence, List, Tuple, Dict, Mapping
 import json
 import lz4
 import base64
@@ -100,9 +104,9 @@ def num_adjoints(gate_name: str) -> str:
 # to programatically get it (eg from a SimpleNamespace)
 Canonical_gate_names = [
     'CCX', 'CF', 'CS', 'CST', 'CSWAP', 'CX', 'CY', 'CZ', 'H', 'I', 'R_ion',
-    'Rx', 'Rx2', 'Rx2T', 'Rx_ion', 'Ry', 'Ry_ion', 'Rz', 'Rz_ion', 'S', 'SO4',
-    'SO42', 'ST', 'SWAP', 'T', 'TT', 'U1', 'U2', 'X', 'XX_ion', 'Y', 'Z', 'u1',
-    'u2', 'u3'
+    'RBS', 'Rx', 'Rx2', 'Rx2T', 'Rx_ion', 'Ry', 'Ry_ion', 'Rz', 'Rz_ion', 'S',
+    'SO4', 'SO42', 'ST', 'SWAP', 'T', 'TT', 'U1', 'U2', 'X', 'XX_ion', 'Y', 'Z',
+    'iRBS', 'u1', 'u2', 'u3'
 ]
 
 Name_to_gatefn = {
@@ -117,6 +121,7 @@ Name_to_gatefn = {
     'H': wrap_gate(Gate.H),
     'I': wrap_gate(Gate.I),
     'R_ion': wrap_gate(Gate.R_ion),
+    'RBS': wrap_gate(Gate.RBS),
     'Rx': wrap_gate(Gate.Rx),
     'Rx2': wrap_gate(Gate.Rx2),
     'Rx2T': wrap_gate(Gate.Rx2T),
@@ -139,6 +144,7 @@ Name_to_gatefn = {
     'Z': wrap_gate(Gate.Z),
     "CompositeGate": wrap_composite_gate,
     "ControlledGate": wrap_controlled_gate,
+    'iRBS': wrap_gate(Gate.iRBS),
     'u1': wrap_gate(Gate.u1),
     'u2': wrap_gate(Gate.u2),
     'u3': wrap_gate(Gate.u3)
@@ -149,19 +155,103 @@ class GateSerializationNotImplementedError(NotImplementedError):
     pass
 
 
+class GateDefinitions(object):
+    """
+    Collects the bodies of composite and controlled gates while a circuit
+    is serialized, so that each distinct body is written once to a
+    definitions table and instructions refer to it as
+    {"definition": index}.  Gates are memoized by identity and then
+    deduplicated by their serialized content; the gates nested in a body
+    are always defined before the body itself.
+    """
+    def __init__(self):
+        self.definitions = []
+        self._by_content = {}
+        self._by_id = {}
+        # memoized gates are kept alive so that their ids stay unique
+        self._gates = []
+
+    def instruction(self, k, v) -> Dict:
+        "As q_instruction_to_s, but with subcircuits replaced by references"
+        if isinstance(v, (CompositeGate, ControlledGate)):
+            return dict(gate=_side_table_gate_name(v),
+                        parameters=dict(definition=self.reference(v)),
+                        bits=k[1],
+                        times=k[0])
+        return q_instruction_to_s(k, v)
+
+    def reference(self, v: Gate) -> int:
+        "The index of the definition of a composite or controlled gate"
+        index = self._by_id.get(id(v), None)
+        if index is not None:
+            return index
+        if isinstance(v, CompositeGate):
+            body = dict(gate="CompositeGate",
+                        parameters=dict(name=v.name,
+                                        circuit=[
+                                            self.instruction(k, g)
+                                            for k, g in v.circuit.gates.items()
+                                        ],
+                                        ascii_symbols=v.ascii_symbols))
+        else:
+            body = dict(gate="ControlledGate",
+                        parameters=dict(gate=self.instruction([None, None],
+                                                              v.gate),
+                                        controls=v.controls))
+        content = json.dumps(body, sort_keys=True)
+        index = self._by_content.get(content, None)
+        if index is None:
+            index = len(self.definitions)
+            self.definitions.append(body)
+            self._by_content[content] = index
+        self._by_id[id(v)] = index
+        self._gates.append(v)
+        return index
+
+
+def definitions_to_gates(definitions: Sequence[Dict]) -> List[Gate]:
+    """
+    Rebuilds the gates of a definitions table made by GateDefinitions.
+    Each definition is built once; _instruction_gate gives every
+    instruction referring to a parameterized definition its own copy.
+    """
+    gates = []
+    for d in definitions:
+        parameters = d['parameters']
+        if d['gate'] == 'CompositeGate':
+            gates.append(
+                CompositeGate(
+                    sequence_to_quasar(parameters['circuit'], gates),
+                    parameters['name'], parameters['ascii_symbols']))
+        else:
+            inner = parameters['gate']
+            gates.append(
+                ControlledGate(
+                    _instruction_gate(inner['gate'], inner['parameters'],
+                                      gates), parameters['controls']))
+    return gates
+
+
 def quasar_to_dict(q: Circuit) -> Dict:
     """
     Returns a serializable dict object suitable for conversion to JSON
     or other simple format, with format
       { "instructions": sequence of dicts in form q_instruction_to_s,
+        "definitions": sequence of composite/controlled gate bodies,
         "qubits": sequence of ints from circuit.qubits,
         "times": sequence of ints from circuit.times }
+    where instructions for composite and controlled gates refer to an
+    entry of "definitions" (see GateDefinitions) rather than repeating
+    the subcircuit.
     This is for the intent of faster serialization by constructing the 
     base objects of Circuit (SortedDict, SortedSet) more directly, 
     providing them sorted sequences which should be quickly iterable
     by timsort on construction
     """
-    return dict(instructions=quasar_to_list(q),
+    definitions = GateDefinitions()
+    instructions = [definitions.instruction(k, v) for k, v in q.gates.items()]
+    return dict(instructions=instructions,
+                definitions=definitions.definitions,
                 qubits=list(q.qubits),
                 times=list(q.times),
                 times_and_qubits=list(q.times_and_qubits))
@@ -172,23 +262,136 @@ def dict_to_quasar(d: Mapping) -> Circuit:
     Takes a serialized mapping dict as in quasar_to_dict and returns
     a rebuilt circuit from the elements therein
     """
-    gate_generator = (((tuple(instruction['times']),
-                        tuple(instruction['bits'])),
-                       make_gate(instruction['gate'],
-                                 instruction['parameters']))
-                      for instruction in d['instructions'])
-    gates = SortedDict(gate_generator)
-    qubits = SortedSet(d['qubits'])
-    times = SortedSet(d['times'])
-    times_and_qubits = SortedSet([tuple(x) for x in d['times_and_qubits']])
+    return sequence_to_quasar(
+        d['instructions'], definitions_to_gates(d.get('definitions', [])))
+
+
+def gates_to_quasar(keyed_gates: Sequence[Tuple[Tuple, Gate]]) -> Circuit:
+    """
+    Builds a circuit in a single pass from ((times, qubits), gate) pairs
+    by filling the SortedDict/SortedSet internals of Circuit directly,
+    rather than going through Circuit.add_gate gate by gate.  Gates are
+    not copied.  The only check made is that no two gates occupy the
+    same (time, qubit) location.
+    """
+    gates = SortedDict(keyed_gates)
+    times_and_qubits = [(time, qubit) for times, qubits in gates.keys()
+                        for time in times for qubit in qubits]
     result = Circuit.__new__(Circuit)
     result.gates = gates
-    result.qubits = qubits
-    result.times = times
-    result.times_and_qubits = times_and_qubits
+    result.times_and_qubits = SortedSet(times_and_qubits)
+    if len(result.times_and_qubits) != len(times_and_qubits) or len(
+            gates) != len(keyed_gates):
+        raise RuntimeError('gates occupy overlapping circuit locations')
+    result.times = SortedSet(time for time, _ in result.times_and_qubits)
+    result.qubits = SortedSet(qubit for _, qubit in times_and_qubits)
     return result
 
 
+def _parameter_filler(gate: Gate) -> Callable[[Sequence[float]], Gate]:
+    """
+    A function making copies of a gate (or controlled gate) with new
+    values of its parameters, in the order of gate.parameters.  The
+    copies are made by copying the gate's attributes, without validation.
+    """
+    if isinstance(gate, ControlledGate):
+        fill_inner = _parameter_filler(gate.gate)
+
+        def fill(values):
+            result = ControlledGate.__new__(ControlledGate)
+            result.__dict__.update(gate.__dict__)
+            result.gate = fill_inner(values)
+            return result
+
+        return fill
+    names = tuple(gate.parameters.keys())
+    attributes = gate.__dict__
+
+    def fill(values):
+        result = Gate.__new__(Gate)
+        result.__dict__.update(attributes)
+        result.parameters = collections.OrderedDict(zip(names, values))
+        return result
+
+    return fill
+
+
+def _has_composite(gate: Gate) -> bool:
+    "Whether a gate is, or controls, a composite gate"
+    while isinstance(gate, ControlledGate):
+        gate = gate.gate
+    return isinstance(gate, CompositeGate)
+
+
+def circuits_from_template(template: Circuit,
+                           parameter_matrix: np.ndarray) -> List[Circuit]:
+    """
+    Builds one circuit per row of parameter_matrix, each with the
+    structure of template and its parameters set to the row.  The
+    template's key order and sorted sets are shared by copying, gates
+    without parameters are shared, and only parameterized gates are made
+    anew, so the cost is dominated by filling in the parameters.
+    """
+    keys = list(template.gates.keys())
+    gates = [template.gates[k] for k in keys]
+    # composite gates (controlled or not) can't be filled in here
+    if any(_has_composite(gate) for gate in gates):
+        raise NotImplementedError(
+            'circuits_from_template does not support composite gates')
+    # (slice start, slice stop, filler) for each gate with parameters
+    fillers = []
+    index = 0
+    for gate in gates:
+        nparameter = len(gate.parameters)
+        fillers.append(None if nparameter == 0 else (
+            index, index + nparameter, _parameter_filler(gate)))
+        index += nparameter
+    if parameter_matrix.shape[1] != index:
+        raise ValueError(
+            f'parameter_matrix must have {index} columns: '
+            f'{parameter_matrix.shape}')
+    result = []
+    for row in parameter_matrix.tolist():
+        circuit = Circuit.__new__(Circuit)
+        circuit.gates = SortedDict(
+            zip(keys, [
+                gate if filler is None else filler[2](
+                    row[filler[0]:filler[1]])
+                for gate, filler in zip(gates, fillers)
+            ]))
+        circuit.times_and_qubits = template.times_and_qubits.copy()
+        circuit.times = template.times.copy()
+        circuit.qubits = template.qubits.copy()
+        result.append(circuit)
+    return result
+
+
+def circuits_to_dict(circuits: Sequence[Circuit]) -> dict:
+    """
+    Serializes a list of circuits.  If they all have the same structure
+    (as the loaders of the rows of a matrix do), the first circuit is sent
+    as a template along with a matrix of every circuit's parameter values.
+    """
+    if len(circuits) > 0 and not any(
+            _has_composite(gate) for gate in circuits[0].gates.values()
+    ) and len(
+                {circuit_structure_fingerprint(c)
+                 for c in circuits}) == 1:
+        return dict(template=quasar_to_list(circuits[0]),
+                    parameters=ndarray_to_dict(
+                        np.array([c.parameter_values for c in circuits],
+                                 dtype=np.float64).reshape(
+                                     len(circuits), -1)))
+    return dict(circuits=[quasar_to_list(c) for c in circuits])
+
+
+def dict_to_circuits(d: dict) -> List[Circuit]:
+    if 'template' in d:
+        return circuits_from_template(sequence_to_quasar(d['template']),
+                                      dict_to_ndarray(d['parameters']))
+    return [sequence_to_quasar(c) for c in d['circuits']]
+
+
 def quasar_to_sequence(q: Circuit) -> Sequence:
     return (q_instruction_to_s(k, v) for k, v in q.gates.items())
 
@@ -203,7 +406,7 @@ def quasar_to_string(q: Circuit) -> str:
     return base64.b64encode(cb).decode('utf-8')
 
 
-def make_gate(gate_name: str, original_parameters: dict):
+def _make_gate_uncached(gate_name: str, original_parameters: dict):
     # U1 and U2 have translated ndarrays, so we must convert them
     parameters = original_parameters.copy()
     if gate_name in ['U1', 'U2']:
@@ -220,38 +423,476 @@ def make_gate(gate_name: str, original_parameters: dict):
     return gate
 
 
-def sequence_to_quasar(s: Sequence) -> Circuit:
-    # make a sequence of tuples (gate, qubits, times) and manually
-    # add to circuit, no need for copy
-    instructions = [(make_gate(instruction['gate'], instruction['parameters']),
-                     tuple(instruction['bits']), tuple(instruction['times']))
-                    for instruction in s]
-    gate_dict = SortedDict({(x[2], x[1]): x[0] for x in instructions}.items())
-    qubit_set = SortedSet
-    result = Circuit()
-    for instruction in s:
-        gate = make_gate(instruction['gate'], instruction['parameters'])
-        # add_gate is quite fussy about taking tuples
-        result.add_gate(gate,
-                        tuple(instruction['bits']),
-                        times=tuple(instruction['times']))
-    return result
+Max_cached_gates = 4096
+
+
+@functools.lru_cache(maxsize=Max_cached_gates)
+def _gate_prototype(gate_name: str, parameter_names: Tuple[str]) -> Gate:
+    """
+    Builds (once per key) the gate for a name and parameter names.
+    Parameter values are filled in by make_gate, so the prototype is
+    built with zeros.
+    """
+    return _make_gate_uncached(gate_name,
+                               {k: 0.0
+                                for k in parameter_names})
+
+
+# U1/U2 gates, in least-recently-used order, keyed by the gate name and a
+# digest of the encoded matrix (rather than by the encoded matrix itself)
+_matrix_gate_cache = collections.OrderedDict()
+_matrix_gate_cache_lock = threading.Lock()
+
+
+def _encoded_matrix_digest(U: dict) -> str:
+    "A digest of a matrix encoded by ndarray_to_dict"
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str((U['compression'], U['dtype'], tuple(
+        U['shape']))).encode('utf-8'))
+    h.update(U['ndarray'].encode('utf-8'))
+    return h.hexdigest()
+
+
+def _matrix_gate(gate_name: str, U: dict) -> Gate:
+    "The (shared) U1/U2 gate for an encoded matrix"
+    key = (gate_name, _encoded_matrix_digest(U))
+    with _matrix_gate_cache_lock:
+        gate = _matrix_gate_cache.get(key, None)
+        if gate is not None:
+            _matrix_gate_cache.move_to_end(key)
+            return gate
+    gate = _make_gate_uncached(gate_name, dict(U=U))
+    with _matrix_gate_cache_lock:
+        _matrix_gate_cache[key] = gate
+        while len(_matrix_gate_cache) > Max_cached_gates:
+            _matrix_gate_cache.popitem(last=False)
+    return gate
+
+
+def make_gate(gate_name: str, original_parameters: dict):
+    """
+    Makes a gate from its serialized name and parameters.  Gates without
+    parameters (including U1/U2, keyed by a digest of their encoded
+    matrix) are shared instances from a bounded cache, as quasar itself
+    does for Gate.H and friends.  Parameterized gates must stay distinct,
+    since Circuit.set_parameter_values changes gate parameters in place,
+    so they are cheap copies of a cached prototype with their own
+    parameters.
+    """
+    if gate_name in ('CompositeGate', 'ControlledGate'):
+        return _make_gate_uncached(gate_name, original_parameters)
+    if gate_name in ('U1', 'U2'):
+        return _matrix_gate(gate_name, original_parameters['U'])
+    prototype = _gate_prototype(gate_name, tuple(original_parameters.keys()))
+    if len(prototype.parameters) == 0:
+        return prototype
+    return Gate.unchecked_gate(
+        nqubit=prototype.nqubit,
+        operator_function=prototype.operator_function,
+        parameters=collections.OrderedDict(
+            (k, original_parameters.get(k, v))
+            for k, v in prototype.parameters.items()),
+        name=prototype.name,
+        ascii_symbols=prototype.ascii_symbols,
+        involutary=prototype.involutary,
+        adjoint_function=prototype.adjoint_function)
+
+
+def _instruction_gate(gate_name: str, parameters: dict,
+                      defined_gates: Sequence[Gate]) -> Gate:
+    """
+    make_gate, resolving references to a definitions table.  Each use of
+    a parameterized definition is a copy, so that the parameters of one
+    use can be set without changing the others.
+    """
+    if defined_gates is not None and 'definition' in parameters:
+        gate = defined_gates[parameters['definition']]
+        return gate.copy() if gate.nparameter > 0 else gate
+    return make_gate(gate_name, parameters)
+
+
+def sequence_to_quasar(s: Sequence,
+                       defined_gates: Sequence[Gate] = None) -> Circuit:
+    """
+    Rebuilds a circuit from a sequence of instructions in the form of
+    q_instruction_to_s.  defined_gates are the gates of the definitions
+    table (from definitions_to_gates), if the instructions refer to one.
+    """
+    return gates_to_quasar([((tuple(instruction['times']),
+                              tuple(instruction['bits'])),
+                             _instruction_gate(instruction['gate'],
+                                               instruction['parameters'],
+                                               defined_gates))
+                            for instruction in s])
 
 
 def string_to_quasar(s: str) -> Circuit:
+    """
+    Decodes a string from either quasar_to_string or
+    quasar_to_compact_string
+    """
     cb = base64.b64decode(s)
     b = lz4.frame.decompress(cb)
+    if b[:len(Compact_circuit_magic)] == Compact_circuit_magic:
+        return bytes_to_quasar(b)
     qdict = json.loads(b.decode('utf-8'))
     return dict_to_quasar(qdict)
 
 
-def probability_histogram_to_dict(hist: ProbabilityHistogram):
-    return dict(nqubit=hist.nqubit,
-                histogram=hist.histogram,
-                nmeasurement=hist.nmeasurement)
+# The compact binary circuit format is
+#   magic (4 bytes) | header length (uint32 LE) | JSON header | arrays
+# The header holds the opcode table (gate names), the parameter names
+# for each opcode, a side table for gates which don't reduce to floats
+# (U1/U2 matrices, and references to the definitions table for composite
+# and controlled gates; gates with equal entries share one), the
+# definitions table and the array lengths.
+# The arrays follow in the order of Compact_circuit_arrays; times are
+# stored as (first time, number of times) since they are contiguous, and
+# qubits/times/times_and_qubits are rebuilt from the gates on decode.
+Compact_circuit_magic = b'QCB1'
+Compact_circuit_arrays = [('opcodes', '<u2', 'ngate'),
+                          ('nbits', '<u1', 'ngate'),
+                          ('time_starts', '<i4', 'ngate'),
+                          ('ntimes', '<i4', 'ngate'),
+                          ('side_indices', '<i4', 'ngate'),
+                          ('bits', '<i4', 'nbit'),
+                          ('parameters', '<f8', 'nparameter')]
+
+
+def _side_table_parameters(v: Gate, definitions: GateDefinitions):
+    """
+    For gates whose parameters can't be packed as floats, returns the
+    parameters in the form used by GateDefinitions.instruction; otherwise
+    None
+    """
+    if isinstance(v, (CompositeGate, ControlledGate)) or v.name in [
+            'U1', 'U2'
+    ]:
+        return definitions.instruction((None, None), v)['parameters']
+    return None
+
+
+def _side_table_key(v: Gate, definitions: GateDefinitions):
+    """
+    For gates whose parameters go in the side table, a key which is equal
+    for gates with equal side table entries (the definition of a composite
+    or controlled gate, or a digest of a U1/U2 matrix); otherwise None
+    """
+    if isinstance(v, (CompositeGate, ControlledGate)):
+        return ('definition', definitions.reference(v))
+    if v.name in ['U1', 'U2']:
+        U = np.ascontiguousarray(v.operator_function(None))
+        h = hashlib.blake2b(digest_size=16)
+        h.update(str((U.dtype.str, U.shape)).encode('utf-8'))
+        h.update(U.tobytes())
+        return (v.name, h.hexdigest())
+    return None
+
+
+def _side_table_gate_name(v: Gate) -> str:
+    if isinstance(v, CompositeGate):
+        return 'CompositeGate'
+    elif isinstance(v, ControlledGate):
+        return 'ControlledGate'
+    else:
+        return v.name
+
+
+def quasar_to_bytes(q: Circuit) -> bytes:
+    """
+    Serializes a circuit to the compact binary format described above
+    """
+    definitions = GateDefinitions()
+    opcode_table = {}
+    parameter_names = []
+    side_table = []
+    side_table_indices = {}
+    opcodes = []
+    nbits = []
+    time_starts = []
+    ntimes = []
+    side_indices = []
+    bits = []
+    parameters = []
+    for (times, qubits), gate in q.gates.items():
+        side_key = _side_table_key(gate, definitions)
+        name = _side_table_gate_name(gate)
+        if side_key is None and base_gate_name(
+                name) not in Canonical_gate_names:
+            raise GateSerializationNotImplementedError(name)
+        opcode = opcode_table.get(name, None)
+        if opcode is None:
+            opcode = len(opcode_table)
+            opcode_table[name] = opcode
+            parameter_names.append([] if side_key is not None else
+                                   list(gate.parameters.keys()))
+        opcodes.append(opcode)
+        nbits.append(len(qubits))
+        time_starts.append(times[0])
+        ntimes.append(len(times))
+        bits.extend(qubits)
+        if side_key is None:
+            side_indices.append(-1)
+            parameters.extend(gate.parameters.values())
+        else:
+            # gates with equal side table entries share one entry
+            side_index = side_table_indices.get(side_key, None)
+            if side_index is None:
+                side_index = len(side_table)
+                side_table_indices[side_key] = side_index
+                side_table.append(_side_table_parameters(gate, definitions))
+            side_indices.append(side_index)
+    arrays = dict(opcodes=opcodes,
+                  nbits=nbits,
+                  time_starts=time_starts,
+                  ntimes=ntimes,
+                  side_indices=side_indices,
+                  bits=bits,
+                  parameters=parameters)
+    header = dict(opcodes=list(opcode_table.keys()),
+                  parameter_names=parameter_names,
+                  side_table=side_table,
+                  definitions=definitions.definitions,
+                  ngate=len(opcodes),
+                  nbit=len(bits),
+                  nparameter=len(parameters))
+    header_bytes = json.dumps(header).encode('utf-8')
+    chunks = [
+        Compact_circuit_magic,
+        np.array([len(header_bytes)], dtype='<u4').tobytes(), header_bytes
+    ]
+    for name, dtype, _ in Compact_circuit_arrays:
+        chunks.append(np.array(arrays[name], dtype=dtype).tobytes())
+    return b''.join(chunks)
+
+
+def bytes_to_quasar(b: bytes) -> Circuit:
+    """
+    Rebuilds a circuit from the compact binary format of quasar_to_bytes
+    """
+    offset = len(Compact_circuit_magic)
+    if b[:offset] != Compact_circuit_magic:
+        raise ValueError('not a compact binary circuit')
+    header_length = int(np.frombuffer(b, dtype='<u4', count=1,
+                                      offset=offset)[0])
+    offset += 4
+    header = json.loads(b[offset:offset + header_length].decode('utf-8'))
+    offset += header_length
+    arrays = {}
+    for name, dtype, length_key in Compact_circuit_arrays:
+        count = header[length_key]
+        arrays[name] = np.frombuffer(b, dtype=dtype, count=count,
+                                     offset=offset).tolist()
+        offset += count * np.dtype(dtype).itemsize
+
+    opcode_names = header['opcodes']
+    parameter_names = header['parameter_names']
+    side_table = header['side_table']
+    defined_gates = definitions_to_gates(header.get('definitions', []))
+    bits = arrays['bits']
+    parameters = arrays['parameters']
+    gates = []
+    bit_offset = 0
+    parameter_offset = 0
+    for opcode, nbit, time_start, ntime, side_index in zip(
+            arrays['opcodes'], arrays['nbits'], arrays['time_starts'],
+            arrays['ntimes'], arrays['side_indices']):
+        names = parameter_names[opcode]
+        if side_index >= 0:
+            gate_parameters = side_table[side_index]
+        else:
+            gate_parameters = dict(
+                zip(names, parameters[parameter_offset:parameter_offset +
+                                      len(names)]))
+            parameter_offset += len(names)
+        key = (tuple(range(time_start, time_start + ntime)),
+               tuple(bits[bit_offset:bit_offset + nbit]))
+        bit_offset += nbit
+        gates.append((key,
+                      _instruction_gate(opcode_names[opcode], gate_parameters,
+                                        defined_gates)))
+
+    return gates_to_quasar(gates)
+
+
+def quasar_to_compact_string(q: Circuit) -> str:
+    """
+    As quasar_to_string, but using the compact binary format, which avoids
+    the per-instruction JSON of quasar_to_dict.  string_to_quasar decodes
+    either form.
+    """
+    cb = lz4.frame.compress(quasar_to_bytes(q))
+    return base64.b64encode(cb).decode('utf-8')
+
+
+def _gate_token(gate: Gate, include_parameters: bool, memo: dict) -> Tuple:
+    """
+    A hashable description of a U1/U2, composite or controlled gate for
+    circuit_fingerprint, memoized by gate object in memo.  Other gates
+    are described by their name and parameter names, with the parameter
+    values packed separately.
+    """
+    token = memo.get(id(gate), None)
+    if token is not None:
+        return token
+    if isinstance(gate, CompositeGate):
+        token = ('CompositeGate', gate.name, str(gate.ascii_symbols),
+                 _circuit_fingerprint(gate.circuit, include_parameters, memo))
+    elif isinstance(gate, ControlledGate):
+        inner = gate.gate
+        if isinstance(inner, (CompositeGate, ControlledGate)) or inner.name \
+                in ('U1', 'U2'):
+            inner_token, values = _gate_token(inner, include_parameters,
+                                              memo), ()
+        else:
+            inner_token = (inner.name, *inner.parameters.keys())
+            values = tuple(float(v) + 0.0 for v in inner.parameters.values()
+                           ) if include_parameters else ()
+        token = ('ControlledGate', str(gate.controls), inner_token, values)
+    else:
+        # the matrix is part of the structure; adding 0.0 turns -0.0 to 0.0
+        operator = np.asarray(gate.operator_function(None),
+                              dtype=np.complex128) + 0.0
+        token = (gate.name,
+                 hashlib.blake2b(operator.tobytes(),
+                                 digest_size=16).hexdigest())
+    memo[id(gate)] = token
+    return token
+
+
+def _circuit_fingerprint(circuit: Circuit, include_parameters: bool,
+                         memo: dict) -> str:
+    tokens = {}
+    locations = []
+    parameters = []
+    keys = circuit.gates.keys()
+    # SortedDict.items() looks each key up again; this is much faster
+    for (times, qubits), gate in zip(keys, map(circuit.gates.__getitem__,
+                                               keys)):
+        if isinstance(gate, (CompositeGate, ControlledGate)) or gate.name \
+                in ('U1', 'U2'):
+            token = _gate_token(gate, include_parameters, memo)
+        else:
+            gate_parameters = gate.parameters
+            token = (gate.name, *gate_parameters.keys())
+            if include_parameters:
+                parameters.extend(gate_parameters.values())
+        locations.append(tokens.setdefault(token, len(tokens)))
+        locations.append(len(times))
+        locations.extend(times)
+        locations.append(len(qubits))
+        locations.extend(qubits)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps(list(tokens.keys())).encode('utf-8'))
+    h.update(np.array(locations, dtype='<i8').tobytes())
+    if include_parameters:
+        # float64 packing makes 1 and 1.0 agree; adding 0.0 turns -0.0 to 0.0
+        h.update((np.array(parameters, dtype='<f8') + 0.0).tobytes())
+    return h.hexdigest()
+
+
+def circuit_fingerprint(circuit: Circuit,
+                        include_parameters: bool = True) -> str:
+    """
+    A canonical hex digest of a circuit computed directly from its gates,
+    without serializing it: the distinct gate types are hashed once as a
+    table, and gate locations and (if include_parameters) parameter
+    values are packed into integer and float64 arrays.  Representation
+    noise doesn't change the digest; 1 and 1.0 or np.float32 and float
+    parameters agree, and -0.0 is hashed as 0.0.  With
+    include_parameters False this is a digest of the circuit structure
+    only (see circuit_structure_fingerprint); U1/U2 matrices count as
+    structure.
+    """
+    return _circuit_fingerprint(circuit, include_parameters, {})
+
+
+def circuit_structure_fingerprint(circuit: Circuit) -> str:
+    """
+    A digest of the circuit's gates and their locations but not of the
+    parameter values, so that circuits differing only in their angles
+    share a fingerprint
+    """
+    return circuit_fingerprint(circuit, include_parameters=False)
+
+
+def histogram_to_arrays(hist: Histogram) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the contents of a histogram as two parallel arrays: the
+    outcome indices (uint64) and the probabilities (float64) or, for
+    a CountHistogram, the counts (int64)
+    """
+    n = len(hist.histogram)
+    value_dtype = np.int64 if isinstance(hist, CountHistogram) else np.float64
+    outcomes = np.fromiter(hist.histogram.keys(), dtype=np.uint64, count=n)
+    values = np.fromiter(hist.histogram.values(), dtype=value_dtype, count=n)
+    return outcomes, values
+
+
+def arrays_to_probability_histogram(
+        nqubit: int,
+        outcomes: np.ndarray,
+        probabilities: np.ndarray,
+        nmeasurement: int = None) -> ProbabilityHistogram:
+    """
+    Builds a ProbabilityHistogram directly from parallel arrays of outcome
+    indices and probabilities.  The key/value checks done by the
+    ProbabilityHistogram constructor are bypassed; tolist() already
+    yields python ints and floats, so the result is equivalent.
+    """
+    result = ProbabilityHistogram.__new__(ProbabilityHistogram)
+    result.nqubit = int(nqubit)
+    result.histogram = dict(zip(outcomes.tolist(), probabilities.tolist()))
+    result.nmeasurement = nmeasurement
+    return result
+
+
+def arrays_to_count_histogram(nqubit: int, outcomes: np.ndarray,
+                              counts: np.ndarray,
+                              nmeasurement: int) -> CountHistogram:
+    """
+    As arrays_to_probability_histogram, but for a CountHistogram
+    """
+    result = CountHistogram.__new__(CountHistogram)
+    result.nqubit = int(nqubit)
+    result.histogram = dict(zip(outcomes.tolist(), counts.tolist()))
+    result.nmeasurement = nmeasurement
+    return result
+
+
+def probability_histogram_to_dict(hist: Histogram):
+    """
+    Serializes a histogram as two arrays encoded with ndarray_to_dict,
+    rather than as a JSON object with every integer key turned into a
+    string.  Histograms over more than 64 qubits don't fit in uint64
+    outcome indices and fall back to the older dict form.
+    """
+    if hist.nqubit > 64:
+        return dict(nqubit=hist.nqubit,
+                    histogram=hist.histogram,
+                    nmeasurement=hist.nmeasurement)
+    outcomes, values = histogram_to_arrays(hist)
+    value_key = 'counts' if isinstance(hist, CountHistogram) \
+        else 'probabilities'
+    return {
+        'nqubit': hist.nqubit,
+        'nmeasurement': hist.nmeasurement,
+        'outcomes': ndarray_to_dict(outcomes),
+        value_key: ndarray_to_dict(values)
+    }
 
 
 def dict_to_probability_histogram(d: dict):
+    if 'outcomes' in d:
+        outcomes = dict_to_ndarray(d['outcomes'])
+        if 'counts' in d:
+            return arrays_to_count_histogram(d['nqubit'], outcomes,
+                                             dict_to_ndarray(d['counts']),
+                                             d['nmeasurement'])
+        return arrays_to_probability_histogram(
+            d['nqubit'], outcomes, dict_to_ndarray(d['probabilities']),
+            d['nmeasurement'])
+    # older servers send the histogram as a dict with string keys
     d2 = d.copy()
     if 'histogram' in d2:
         d2['histogram'] = {int(k): v for k, v in d2['histogram'].items()}
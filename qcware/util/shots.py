@@ -0,0 +1,172 @@
+# helper routines for raw measurement shots stored as packed bits
+import numpy as np
+from typing import List, Sequence
+from quasar.measurement import ProbabilityHistogram
+from .transforms.helpers import ndarray_to_dict, dict_to_ndarray
+from .serialize_quasar import arrays_to_probability_histogram
+
+
+class MeasurementShots(object):
+    """
+    The raw result of a measurement run: one row per shot, with the measured
+    bits packed by np.packbits into a uint8 matrix of shape
+    (nmeasurement, ceil(nqubit/8)).  As with quasar kets, qubit 0 is the
+    most significant (first) bit of each row.
+    """
+    def __init__(self, nqubit: int, shots: np.ndarray):
+        self.nqubit = nqubit
+        self.shots = shots
+
+    @property
+    def nmeasurement(self) -> int:
+        return self.shots.shape[0]
+
+    def bits(self) -> np.ndarray:
+        "The shots unpacked to a (nmeasurement, nqubit) uint8 matrix of 0/1"
+        return unpack_shots(self.shots, self.nqubit)
+
+    def indices(self) -> np.ndarray:
+        "The ket index (as in ProbabilityHistogram keys) of each shot"
+        return packed_shots_to_indices(self.shots, self.nqubit)
+
+    def histogram(self) -> ProbabilityHistogram:
+        return packed_shots_histogram(self.shots, self.nqubit)
+
+    def marginals(self) -> np.ndarray:
+        return packed_shots_marginals(self.shots, self.nqubit)
+
+    def correlations(self) -> np.ndarray:
+        return packed_shots_correlations(self.shots, self.nqubit)
+
+
+def indices_to_packed_shots(indices: np.ndarray, nqubit: int) -> np.ndarray:
+    """
+    Packs an array of ket indices (nqubit <= 64) into a
+    (len(indices), ceil(nqubit/8)) uint8 matrix, qubit 0 first
+    """
+    if nqubit > 64:
+        raise ValueError('packed shots from indices need nqubit <= 64')
+    big_endian = np.asarray(indices, dtype=np.uint64).astype('>u8')
+    all_bits = np.unpackbits(big_endian.view(np.uint8).reshape(-1, 8),
+                             axis=1)
+    return np.packbits(all_bits[:, 64 - nqubit:], axis=1)
+
+
+def unpack_shots(shots: np.ndarray, nqubit: int) -> np.ndarray:
+    return np.unpackbits(shots, axis=1, count=nqubit)
+
+
+def packed_shots_to_indices(shots: np.ndarray, nqubit: int) -> np.ndarray:
+    """
+    Converts packed shots back to uint64 ket indices without going through
+    python ints: rows are zero-padded to 8 bytes, viewed as big-endian
+    uint64 and shifted down past the padding bits.
+    """
+    if nqubit > 64:
+        raise ValueError('ket indices of packed shots need nqubit <= 64')
+    nshot, nbyte = shots.shape
+    padded = np.zeros((nshot, 8), dtype=np.uint8)
+    padded[:, :nbyte] = shots
+    return padded.view('>u8').reshape(nshot).astype(np.uint64) >> np.uint64(
+        64 - nqubit)
+
+
+def packed_shots_histogram(shots: np.ndarray,
+                           nqubit: int) -> ProbabilityHistogram:
+    "Aggregates packed shots into a ProbabilityHistogram"
+    nshot = shots.shape[0]
+    outcomes, counts = np.unique(packed_shots_to_indices(shots, nqubit),
+                                 return_counts=True)
+    return arrays_to_probability_histogram(nqubit, outcomes, counts / nshot,
+                                           nshot)
+
+
+def packed_shots_marginals(shots: np.ndarray, nqubit: int) -> np.ndarray:
+    "The probability of measuring 1 on each qubit (length nqubit)"
+    return unpack_shots(shots, nqubit).mean(axis=0)
+
+
+def packed_shots_correlations(shots: np.ndarray, nqubit: int) -> np.ndarray:
+    """
+    The (nqubit, nqubit) matrix of two-point correlations <Z_i Z_j>
+    estimated from the shots, where Z is +1 for a measured 0 and -1 for 1
+    """
+    z = 1.0 - 2.0 * unpack_shots(shots, nqubit)
+    return z.T @ z / shots.shape[0]
+
+
+def sample_packed_shots(probabilities: np.ndarray, nmeasurement: int,
+                        nqubit: int) -> np.ndarray:
+    """
+    Samples nmeasurement shots from a probability vector of length
+    2**nqubit, returning them as packed bits
+    """
+    cumulative = np.cumsum(probabilities)
+    indices = np.searchsorted(cumulative,
+                              np.random.rand(nmeasurement) * cumulative[-1],
+                              side='right')
+    indices = np.minimum(indices, len(probabilities) - 1)
+    return indices_to_packed_shots(indices, nqubit)
+
+
+def split_nmeasurement(nmeasurement: int, nshard: int) -> List[int]:
+    """
+    Splits nmeasurement shots into at most nshard (non-empty) shards whose
+    sizes differ by at most one
+    """
+    size, remainder = divmod(nmeasurement, nshard)
+    sizes = [size + 1] * remainder + [size] * (nshard - remainder)
+    return [n for n in sizes if n > 0]
+
+
+def merge_probability_histograms(
+        histograms: Sequence[ProbabilityHistogram]) -> ProbabilityHistogram:
+    """
+    Merges the histograms of independent measurement runs of the same
+    circuit into the histogram of all their shots, weighting each by its
+    nmeasurement.  The outcomes and shot counts of all the histograms are
+    accumulated as arrays with np.unique and np.bincount.
+    """
+    nqubit = histograms[0].nqubit
+    nmeasurement = sum(h.nmeasurement for h in histograms)
+    if nqubit > 64:
+        counts = {}
+        for h in histograms:
+            for outcome, probability in h.histogram.items():
+                counts[outcome] = counts.get(
+                    outcome, 0.0) + probability * h.nmeasurement
+        return ProbabilityHistogram(
+            nqubit, {k: v / nmeasurement
+                     for k, v in counts.items()}, nmeasurement)
+    outcomes = np.concatenate([
+        np.fromiter(h.histogram.keys(), dtype=np.uint64, count=len(h.histogram))
+        for h in histograms
+    ])
+    counts = np.concatenate([
+        np.fromiter(h.histogram.values(),
+                    dtype=np.float64,
+                    count=len(h.histogram)) * h.nmeasurement
+        for h in histograms
+    ])
+    merged_outcomes, inverse = np.unique(outcomes, return_inverse=True)
+    merged_counts = np.bincount(inverse,
+                                weights=counts,
+                                minlength=len(merged_outcomes))
+    return arrays_to_probability_histogram(nqubit, merged_outcomes,
+                                           merged_counts / nmeasurement,
+                                           nmeasurement)
+
+
+def merge_measurement_shots(
+        shots: Sequence[MeasurementShots]) -> MeasurementShots:
+    "Concatenates the shots of independent measurement runs"
+    return MeasurementShots(shots[0].nqubit,
+                            np.concatenate([s.shots for s in shots]))
+
+
+def measurement_shots_to_dict(s: MeasurementShots) -> dict:
+    return dict(nqubit=s.nqubit, shots=ndarray_to_dict(s.shots))
+
+
+def dict_to_measurement_shots(d: dict) -> MeasurementShots:
+    return MeasurementShots(d['nqubit'], dict_to_ndarray(d['shots']))
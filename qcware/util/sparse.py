@@ -0,0 +1,25 @@
+# sparse array results, as returned with a top_k or threshold result policy
+import numpy as np
+from typing import Tuple
+
+
+class SparseAmplitudes(object):
+    """
+    Selected entries of an array result (eg the largest amplitudes of a
+    statevector): the flat indices of the entries into an array of the
+    given shape, in increasing order, and their values
+    """
+    def __init__(self, indices: np.ndarray, values: np.ndarray,
+                 shape: Tuple[int, ...]):
+        self.indices = indices
+        self.values = values
+        self.shape = tuple(shape)
+
+    def __len__(self):
+        return len(self.indices)
+
+    def to_dense(self) -> np.ndarray:
+        "The array with every entry not selected set to zero"
+        result = np.zeros(int(np.prod(self.shape)), dtype=self.values.dtype)
+        result[self.indices] = self.values
+        return result.reshape(self.shape)
@@ -2,6 +2,7 @@ import numpy as np
 import base64
 from typing import Dict
 import lz4.frame
+from ..sparse import SparseAmplitudes
 
 
 def ndarray_to_dict(x: np.ndarray):
@@ -27,6 +28,8 @@ def ndarray_to_dict(x: np.ndarray):
 def dict_to_ndarray(d: dict):
     if d is None:
         return None
+    elif 'sparse_shape' in d:
+        return dict_to_sparse(d)
     else:
         b = base64.b64decode(d['ndarray'])
         if d['compression'] == 'lz4':
@@ -37,6 +40,21 @@ def dict_to_ndarray(d: dict):
         ).reshape(d['shape'])
 
 
+def sparse_to_dict(x: SparseAmplitudes) -> dict:
+    # the indices are sent as the smallest unsigned type which holds them
+    size = int(np.prod(x.shape))
+    index_dtype = np.uint32 if size <= 2**32 else np.uint64
+    return dict(indices=ndarray_to_dict(x.indices.astype(index_dtype)),
+                values=ndarray_to_dict(x.values),
+                sparse_shape=x.shape)
+
+
+def dict_to_sparse(d: dict) -> SparseAmplitudes:
+    return SparseAmplitudes(
+        dict_to_ndarray(d['indices']).astype(np.int64),
+        dict_to_ndarray(d['values']), tuple(d['sparse_shape']))
+
+
 def scalar_to_dict(v) -> Dict:
     """
     Hack for individual numerical scalars to serializable form.
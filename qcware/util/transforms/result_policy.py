@@ -0,0 +1,74 @@
+"""
+Per-call policies for how the result of a backend method is sent back
+from Forge.  A call passes `result_policy`, a dict, among its keyword
+arguments; the server removes it before running the method and applies
+it when encoding the result.  The recognised keys are:
+
+  dtype: The dtype an array result is converted to before it is sent,
+      eg 'complex64' where single precision is enough
+  top_k: Only the top_k entries of largest magnitude of an array result
+      are sent, returned as a qcware.util.sparse.SparseAmplitudes
+  threshold: Only the entries of magnitude at least threshold are sent,
+      returned as a SparseAmplitudes (with top_k, the top_k largest of them)
+"""
+import numpy as np
+from typing import Optional
+from .helpers import ndarray_to_dict, sparse_to_dict
+from ..sparse import SparseAmplitudes
+
+
+class ResultWithPolicy(object):
+    "A backend method's result and the result policy of its call"
+    def __init__(self, result, policy: dict):
+        self.result = result
+        self.policy = policy
+
+
+def reduce_result(result, policy: dict):
+    """
+    An array result converted to the policy's dtype, and reduced to a
+    SparseAmplitudes if the policy selects entries; other results are
+    returned unchanged
+    """
+    if not isinstance(result, np.ndarray):
+        return result
+    dtype = policy.get('dtype', None)
+    if dtype is not None:
+        result = result.astype(dtype, copy=False)
+    top_k = policy.get('top_k', None)
+    threshold = policy.get('threshold', None)
+    if top_k is not None or threshold is not None:
+        return select_amplitudes(result, top_k, threshold)
+    return result
+
+
+def apply_result_policy(result, policy: dict) -> Optional[dict]:
+    """
+    The wire form of result under policy, or None if the policy doesn't
+    apply to this result (which is then encoded as usual)
+    """
+    if not isinstance(result, np.ndarray):
+        return None
+    result = reduce_result(result, policy)
+    if isinstance(result, SparseAmplitudes):
+        return sparse_to_dict(result)
+    return ndarray_to_dict(result)
+
+
+def select_amplitudes(x: np.ndarray,
+                      top_k: Optional[int] = None,
+                      threshold: Optional[float] = None) -> SparseAmplitudes:
+    """
+    The entries of x of magnitude at least threshold (if given), and of
+    those the top_k of largest magnitude (if given)
+    """
+    flat = x.reshape(-1)
+    magnitudes = np.abs(flat)
+    if threshold is None:
+        indices = np.arange(flat.shape[0])
+    else:
+        indices = np.flatnonzero(magnitudes >= threshold)
+    if top_k is not None and top_k < indices.shape[0]:
+        largest = np.argpartition(-magnitudes[indices], top_k - 1)[:top_k]
+        indices = np.sort(indices[largest])
+    return SparseAmplitudes(indices, flat[indices], x.shape)
@@ -2,8 +2,9 @@
 Methods to transform FROM native types used by the backends
 TO serializable types for the api to send to the client
 """
-from ..serialize_quasar import (quasar_to_string, string_to_quasar,
-                                pauli_to_list, list_to_pauli)
+from ..serialize_quasar import pauli_to_list, list_to_pauli
+from ..circuit_templates import (circuit_to_wire, circuit_from_wire,
+                                 template_namespace)
 from .helpers import (ndarray_to_dict, dict_to_ndarray, scalar_to_dict,
                       dict_to_scalar, remap_q_indices_from_strings,
                       remap_q_indices_to_strings, complex_dtype_to_string,
@@ -22,6 +23,21 @@ def update_with_replacers(d: Mapping[object, object],
     return result
 
 
+def transform_batch_args(transform: Callable, kwargs: dict):
+    """
+    The arguments of run_batch are a method name, keyword arguments shared
+    by the whole batch and a list of keyword arguments for each item; the
+    shared and per-item arguments are transformed as arguments of the
+    batched method
+    """
+    method_name = '_shadowed.' + kwargs.get('method', '')
+    shared_kwargs = transform(method_name, **kwargs.get('shared_kwargs', {}))
+    batch = [
+        transform(method_name, **item) for item in kwargs.get('batch', [])
+    ]
+    return {**kwargs, 'shared_kwargs': shared_kwargs, 'batch': batch}
+
+
 _to_wire_arg_replacers = {}
 
 
@@ -33,6 +49,8 @@ def client_args_to_wire(method_name: str, **kwargs):
         inner_kwargs = client_args_to_wire(method_name,
                                            **kwargs.get('kwargs', {}))
         return {**kwargs, **{'kwargs': inner_kwargs}}
+    elif method_name == '_shadowed.run_batch':
+        return transform_batch_args(client_args_to_wire, kwargs)
     else:
         return update_with_replacers(
             kwargs, _to_wire_arg_replacers.get(method_name, {}))
@@ -46,9 +64,13 @@ def server_args_from_wire(method_name: str, **kwargs):
     # key replacers and apply them
     if method_name == 'circuits.run_backend_method':
         method_name = '_shadowed.' + kwargs.get('method', '')
-        inner_kwargs = server_args_from_wire(method_name,
-                                             **kwargs.get('kwargs', {}))
+        # circuit templates are cached separately for each API key
+        with template_namespace(kwargs.get('api_key', None)):
+            inner_kwargs = server_args_from_wire(method_name,
+                                                 **kwargs.get('kwargs', {}))
         return {**kwargs, **{'kwargs': inner_kwargs}}
+    elif method_name == '_shadowed.run_batch':
+        return transform_batch_args(server_args_from_wire, kwargs)
     else:
         return update_with_replacers(
             kwargs, _from_wire_arg_replacers.get(method_name, {}))
@@ -73,6 +95,10 @@ register_argument_transform('qio.loader',
                             to_wire={'data': ndarray_to_dict},
                             from_wire={'data': dict_to_ndarray})
 
+register_argument_transform('qio.loader_batch',
+                            to_wire={'data': ndarray_to_dict},
+                            from_wire={'data': dict_to_ndarray})
+
 register_argument_transform('qml.fit_and_predict',
                             to_wire={
                                 'X': ndarray_to_dict,
@@ -85,75 +111,122 @@ register_argument_transform('qml.fit_and_predict',
                                 'T': dict_to_ndarray
                             })
 
+register_argument_transform('qml.fit',
+                            to_wire={
+                                'X': ndarray_to_dict,
+                                'y': ndarray_to_dict
+                            },
+                            from_wire={
+                                'X': dict_to_ndarray,
+                                'y': dict_to_ndarray
+                            })
+
+register_argument_transform('qml.predict',
+                            to_wire={'T': ndarray_to_dict},
+                            from_wire={'T': dict_to_ndarray})
+
 register_argument_transform('_shadowed.run_measurement',
                             to_wire={
-                                'circuit': quasar_to_string,
+                                'circuit': circuit_to_wire,
                                 'statevector': ndarray_to_dict,
                                 'dtype': complex_dtype_to_string
                             },
                             from_wire={
+                                'circuit': circuit_from_wire,
+                                'statevector': dict_to_ndarray,
+                                'dtype': string_to_complex_dtype
+                            })
+
+register_argument_transform('_shadowed.run_measurement_shots',
+                            to_wire={
+                                'circuit': circuit_to_wire,
+                                'statevector': ndarray_to_dict,
+                                'dtype': complex_dtype_to_string
+                            },
+                            from_wire={
+                                'circuit': circuit_from_wire,
                                 'statevector': dict_to_ndarray,
                                 'dtype': string_to_complex_dtype
                             })
 
 register_argument_transform('_shadowed.run_statevector',
                             to_wire={
-                                'circuit': quasar_to_string,
+                                'circuit': circuit_to_wire,
                                 'statevector': ndarray_to_dict,
                                 'dtype': complex_dtype_to_string
                             },
                             from_wire={
+                                'circuit': circuit_from_wire,
                                 'statevector': dict_to_ndarray,
                                 'dtype': string_to_complex_dtype
                             })
 
 register_argument_transform('_shadowed.circuit_in_basis',
                             to_wire={
-                                'circuit': quasar_to_string,
+                                'circuit': circuit_to_wire,
                             },
-                            from_wire={})
+                            from_wire={'circuit': circuit_from_wire})
 register_argument_transform('_shadowed.run_density_matrix',
-                            to_wire=dict(circuit=quasar_to_string,
+                            to_wire=dict(circuit=circuit_to_wire,
                                          statevector=ndarray_to_dict),
-                            from_wire=dict(statevector=dict_to_ndarray))
+                            from_wire=dict(circuit=circuit_from_wire,
+                                           statevector=dict_to_ndarray))
 register_argument_transform('_shadowed.run_pauli_diagonal',
                             to_wire=dict(pauli=pauli_to_list),
                             from_wire=dict(pauli=list_to_pauli))
 register_argument_transform('_shadowed.run_pauli_expectation',
-                            to_wire=dict(circuit=quasar_to_string,
+                            to_wire=dict(circuit=circuit_to_wire,
                                          pauli=pauli_to_list,
                                          statevector=ndarray_to_dict),
-                            from_wire=dict(pauli=list_to_pauli,
+                            from_wire=dict(circuit=circuit_from_wire,
+                                           pauli=list_to_pauli,
                                            statevector=dict_to_ndarray))
 register_argument_transform('_shadowed.run_pauli_expectation_ideal',
-                            to_wire=dict(circuit=quasar_to_string,
+                            to_wire=dict(circuit=circuit_to_wire,
                                          pauli=pauli_to_list,
                                          statevector=ndarray_to_dict),
-                            from_wire=dict(pauli=list_to_pauli,
+                            from_wire=dict(circuit=circuit_from_wire,
+                                           pauli=list_to_pauli,
                                            statevector=dict_to_ndarray))
 register_argument_transform('_shadowed.run_pauli_expectation_measurement',
-                            to_wire=dict(circuit=quasar_to_string,
+                            to_wire=dict(circuit=circuit_to_wire,
                                          pauli=pauli_to_list,
                                          statevector=ndarray_to_dict),
-                            from_wire=dict(pauli=list_to_pauli,
+                            from_wire=dict(circuit=circuit_from_wire,
+                                           pauli=list_to_pauli,
                                            statevector=dict_to_ndarray))
 register_argument_transform('_shadowed.run_pauli_expectation_value',
-                            to_wire=dict(circuit=quasar_to_string,
+                            to_wire=dict(circuit=circuit_to_wire,
                                          pauli=pauli_to_list,
                                          statevector=ndarray_to_dict),
-                            from_wire=dict(pauli=list_to_pauli,
+                            from_wire=dict(circuit=circuit_from_wire,
+                                           pauli=list_to_pauli,
                                            statevector=dict_to_ndarray))
 register_argument_transform('_shadowed.run_pauli_expectation_value_gradient',
-                            to_wire=dict(circuit=quasar_to_string,
+                            to_wire=dict(circuit=circuit_to_wire,
                                          pauli=pauli_to_list,
                                          statevector=ndarray_to_dict),
-                            from_wire=dict(pauli=list_to_pauli,
+                            from_wire=dict(circuit=circuit_from_wire,
+                                           pauli=list_to_pauli,
                                            statevector=dict_to_ndarray))
+register_argument_transform(
+    '_shadowed.run_pauli_expectation_value_sweep',
+    to_wire=dict(circuit=circuit_to_wire,
+                 pauli=pauli_to_list,
+                 parameter_matrix=ndarray_to_dict,
+                 statevector=ndarray_to_dict,
+                 dtype=complex_dtype_to_string),
+    from_wire=dict(circuit=circuit_from_wire,
+                   pauli=list_to_pauli,
+                   parameter_matrix=dict_to_ndarray,
+                   statevector=dict_to_ndarray,
+                   dtype=string_to_complex_dtype))
 register_argument_transform('_shadowed.run_pauli_expectation_value_ideal',
-                            to_wire=dict(circuit=quasar_to_string,
+                            to_wire=dict(circuit=circuit_to_wire,
                                          pauli=pauli_to_list,
                                          statevector=ndarray_to_dict),
-                            from_wire=dict(pauli=list_to_pauli,
+                            from_wire=dict(circuit=circuit_from_wire,
+                                           pauli=list_to_pauli,
                                            statevector=dict_to_ndarray))
 register_argument_transform('_shadowed.run_pauli_sigma',
                             to_wire=dict(pauli=pauli_to_list,
@@ -161,5 +234,5 @@ register_argument_transform('_shadowed.run_pauli_sigma',
                             from_wire=dict(pauli=list_to_pauli,
                                            statevector=dict_to_ndarray))
 register_argument_transform('_shadowed.run_unitary',
-                            to_wire=dict(circuit=quasar_to_string),
-                            from_wire=dict())
+                            to_wire=dict(circuit=circuit_to_wire),
+                            from_wire=dict(circuit=circuit_from_wire))
@@ -3,9 +3,12 @@ from typing import Optional, Callable
 from ..serialize_quasar import (quasar_to_list, sequence_to_quasar,
                                 probability_histogram_to_dict,
                                 dict_to_probability_histogram, pauli_to_list,
-                                list_to_pauli)
+                                list_to_pauli, circuits_to_dict,
+                                dict_to_circuits)
+from ..shots import measurement_shots_to_dict, dict_to_measurement_shots
 from .helpers import (ndarray_to_dict, dict_to_ndarray, scalar_to_dict,
                       dict_to_scalar)
+from .result_policy import ResultWithPolicy, apply_result_policy
 _to_wire_result_replacers = {}
 
 
@@ -14,7 +17,10 @@ def debug_is_set() -> bool:
 
 
 def result_represents_error(worker_result: object):
-    return isinstance(worker_result, dict) and 'error' in worker_result
+    # dict.__contains__ rather than "in", since dict subclasses such as
+    # quasar's Pauli parse string keys in their __contains__
+    return isinstance(worker_result, dict) and dict.__contains__(
+        worker_result, 'error')
 
 
 def strip_traceback_if_debug_set(error_result: dict) -> dict:
@@ -24,14 +30,28 @@ def strip_traceback_if_debug_set(error_result: dict) -> dict:
     return result
 
 
-def server_result_to_wire(method_name: str, worker_result: object):
+def server_result_to_wire(method_name: str,
+                          worker_result: object,
+                          result_policy: Optional[dict] = None):
     if result_represents_error(worker_result):
         return strip_traceback_if_debug_set(worker_result)
     else:
+        if result_policy is not None:
+            wire_result = apply_result_policy(worker_result, result_policy)
+            if wire_result is not None:
+                return wire_result
         f = _to_wire_result_replacers.get(method_name, lambda x: x)
         return f(worker_result)
 
 
+def _shadowed_result_to_wire(method_name: str, result: object):
+    "As server_result_to_wire, applying the call's result policy if any"
+    if isinstance(result, ResultWithPolicy):
+        return server_result_to_wire(method_name, result.result,
+                                     result.policy)
+    return server_result_to_wire(method_name, result)
+
+
 _from_wire_result_replacers = {}
 
 
@@ -65,6 +85,9 @@ def transform_optimization_find_optimal_qaoa_angles_from_wire(t):
 register_result_transform('qio.loader',
                           to_wire=quasar_to_list,
                           from_wire=sequence_to_quasar)
+register_result_transform('qio.loader_batch',
+                          to_wire=circuits_to_dict,
+                          from_wire=dict_to_circuits)
 register_result_transform('circuits.run_measurement',
                           to_wire=probability_histogram_to_dict,
                           from_wire=dict_to_probability_histogram)
@@ -78,10 +101,13 @@ register_result_transform(
 register_result_transform('qml.fit_and_predict',
                           to_wire=ndarray_to_dict,
                           from_wire=dict_to_ndarray)
+register_result_transform('qml.predict',
+                          to_wire=ndarray_to_dict,
+                          from_wire=dict_to_ndarray)
 
 
 def run_backend_method_to_wire(backend_method_result: dict):
-    result = server_result_to_wire(
+    result = _shadowed_result_to_wire(
         "_shadowed." + backend_method_result['method'],
         backend_method_result['result'])
     return dict(method=backend_method_result['method'], result=result)
@@ -93,12 +119,39 @@ def run_backend_method_from_wire(backend_method_result: dict):
         backend_method_result['result'])
 
 
+def run_batch_to_wire(batch_result: dict):
+    method_name = '_shadowed.' + batch_result['method']
+    return dict(method=batch_result['method'],
+                results=[
+                    _shadowed_result_to_wire(method_name, result)
+                    for result in batch_result['results']
+                ])
+
+
+def run_batch_from_wire(batch_result: dict):
+    method_name = '_shadowed.' + batch_result['method']
+    return dict(method=batch_result['method'],
+                results=[
+                    client_result_from_wire(method_name, result)
+                    for result in batch_result['results']
+                ])
+
+
 register_result_transform('circuits.run_backend_method',
                           to_wire=run_backend_method_to_wire,
                           from_wire=run_backend_method_from_wire)
+register_result_transform('_shadowed.run_batch',
+                          to_wire=run_batch_to_wire,
+                          from_wire=run_batch_from_wire)
+register_result_transform('_shadowed.run_pauli_expectation_value_sweep',
+                          to_wire=ndarray_to_dict,
+                          from_wire=dict_to_ndarray)
 register_result_transform('_shadowed.run_measurement',
                           to_wire=probability_histogram_to_dict,
                           from_wire=dict_to_probability_histogram)
+register_result_transform('_shadowed.run_measurement_shots',
+                          to_wire=measurement_shots_to_dict,
+                          from_wire=dict_to_measurement_shots)
 register_result_transform('_shadowed.run_statevector',
                           to_wire=ndarray_to_dict,
                           from_wire=dict_to_ndarray)
@@ -0,0 +1,89 @@
+import itertools
+import json
+import pytest
+import quasar
+import qcware.circuits.quasar_backend
+from qcware.util.transforms import (client_args_to_wire,
+                                    server_args_from_wire,
+                                    server_result_to_wire,
+                                    client_result_from_wire)
+from qcware.circuits.backend_extensions import run_extended_backend_method
+
+
+class LocalForge(object):
+    """
+    A stand-in for Forge's circuits.run_backend_method which sends the
+    call through the wire transforms (and JSON) and runs it on the quasar
+    simulator, recording each wire payload
+    """
+    def __init__(self):
+        self.backend = quasar.QuasarSimulatorBackend()
+        self.calls = []
+
+    def run_backend_method(self, backend, method, kwargs, **extra):
+        wire = client_args_to_wire('circuits.run_backend_method',
+                                   backend=backend,
+                                   method=method,
+                                   kwargs=kwargs,
+                                   **extra)
+        wire = json.loads(json.dumps(wire))
+        self.calls.append(wire)
+        server_kwargs = server_args_from_wire('circuits.run_backend_method',
+                                              **wire)
+        result = run_extended_backend_method(self.backend, method,
+                                             server_kwargs['kwargs'])
+        wire_result = server_result_to_wire('circuits.run_backend_method',
+                                            dict(method=method,
+                                                 result=result))
+        wire_result = json.loads(json.dumps(wire_result))
+        return client_result_from_wire('circuits.run_backend_method',
+                                       wire_result)
+
+
+@pytest.fixture
+def local_forge(monkeypatch):
+    forge = LocalForge()
+    monkeypatch.setattr(qcware.circuits.quasar_backend, 'run_backend_method',
+                        forge.run_backend_method)
+    return forge
+
+
+class LocalApi(object):
+    """
+    A stand-in for Forge API endpoints: post_call and wait_for_call are
+    replaced in the module of an API function so that its arguments are
+    sent through the wire transforms (and JSON) to a local implementation
+    of the endpoint, whose result comes back the same way.  Each call's
+    wire arguments are recorded.
+    """
+    def __init__(self, monkeypatch):
+        self.monkeypatch = monkeypatch
+        self.calls = []
+        self._results = {}
+        self._uids = itertools.count()
+
+    def serve(self, module, method_name: str, f):
+        "Serves the API function method_name of module by calling f"
+        def post_call(endpoint, data, host=None):
+            wire = json.loads(json.dumps(data))
+            self.calls.append(wire)
+            kwargs = server_args_from_wire(method_name, **wire)
+            kwargs.pop('api_key', None)
+            kwargs.pop('host', None)
+            result = server_result_to_wire(method_name, f(**kwargs))
+            uid = str(next(self._uids))
+            self._results[uid] = json.loads(json.dumps(result))
+            return dict(uid=uid)
+
+        def wait_for_call(api_key=None, host=None, call_token=None):
+            return dict(state='success',
+                        method=method_name,
+                        result=self._results.pop(call_token))
+
+        self.monkeypatch.setattr(module, 'post_call', post_call)
+        self.monkeypatch.setattr(module, 'wait_for_call', wait_for_call)
+
+
+@pytest.fixture
+def local_api(monkeypatch):
+    return LocalApi(monkeypatch)
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+import quasar
+from qcware.circuits.quasar_backend import QuasarBackend
+from qcware.util.shots import MeasurementShots
+
+
+def ansatz(theta: float) -> quasar.Circuit:
+    return quasar.Circuit().Ry(0, theta=theta).CX(0, 1).Rz(1, theta=-theta)
+
+
+def test_run_batch(local_forge):
+    backend = QuasarBackend('classical/simulator')
+    thetas = np.linspace(0, np.pi, 5)
+    results = backend.run_batch('run_statevector',
+                                [dict(circuit=ansatz(t)) for t in thetas])
+    assert len(local_forge.calls) == 1
+    simulator = quasar.QuasarSimulatorBackend()
+    for theta, result in zip(thetas, results):
+        assert np.allclose(
+            result, simulator.run_statevector(circuit=ansatz(theta)))
+
+    I, X, Y, Z = quasar.Pauli.IXYZ()
+    pauli = Z[0] * Z[1] + 0.5 * X[0]
+    values = backend.run_batch('run_pauli_expectation_value',
+                               [dict(circuit=ansatz(t)) for t in thetas],
+                               pauli=pauli)
+    assert np.allclose(values, [
+        simulator.run_pauli_expectation_value(circuit=ansatz(t), pauli=pauli)
+        for t in thetas
+    ])
+
+    shots = backend.run_batch('run_measurement_shots',
+                              [dict(circuit=ansatz(0.4))] * 2,
+                              nmeasurement=100)
+    assert all(isinstance(s, MeasurementShots) for s in shots)
+    assert [s.nmeasurement for s in shots] == [100, 100]
+
+    with pytest.raises(NotImplementedError):
+        backend.run_batch('linear_commuting_group', [])
+
+
+def test_run_batch_sends_each_template_once(local_forge):
+    backend = QuasarBackend('classical/simulator', use_templates=True)
+    backend.run_batch('run_statevector',
+                      [dict(circuit=ansatz(t)) for t in (0.1, 0.2, 0.3)])
+    backend.run_batch('run_statevector', [dict(circuit=ansatz(0.4))])
+    structures = [
+        item['circuit']['structure'] for call in local_forge.calls
+        for item in call['kwargs']['batch']
+    ]
+    assert structures[0] is not None
+    assert structures[1:] == [None, None, None]
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+import quasar
+from qcware.util.transforms import client_args_to_wire, server_args_from_wire
+from qcware.util.circuit_templates import (TemplatedCircuit,
+                                           circuit_template_id,
+                                           substitute_parameters)
+from qcware.exceptions import (UnknownCircuitTemplateError,
+                               CircuitTemplateMismatchError)
+
+
+def ansatz(theta: float) -> quasar.Circuit:
+    return quasar.Circuit().Ry(0, theta=theta).CX(0, 1).Rz(1, theta=-theta)
+
+
+def test_template_id_ignores_parameter_values():
+    assert circuit_template_id(ansatz(0.1)) == circuit_template_id(
+        ansatz(0.2))
+    assert circuit_template_id(ansatz(0.1)) != circuit_template_id(
+        quasar.Circuit().Rx(0, theta=0.1).CX(0, 1).Rz(1, theta=-0.1))
+
+
+def test_substitute_parameters():
+    q = substitute_parameters(ansatz(0.0), [0.3, -0.3])
+    assert quasar.Circuit.test_equivalence(q, ansatz(0.3))
+    with pytest.raises(ValueError):
+        substitute_parameters(ansatz(0.0), [0.3])
+
+
+def test_templated_circuit_wire_roundtrip():
+    template_id = circuit_template_id(ansatz(0.1))
+    first = client_args_to_wire(
+        'circuits.run_backend_method',
+        backend='classical/simulator',
+        method='run_statevector',
+        kwargs=dict(circuit=TemplatedCircuit(ansatz(0.1), template_id)))
+    assert first['kwargs']['circuit']['structure'] is not None
+    q1 = server_args_from_wire('circuits.run_backend_method',
+                               **first)['kwargs']['circuit']
+    assert quasar.Circuit.test_equivalence(q1, ansatz(0.1))
+
+    second = client_args_to_wire(
+        'circuits.run_backend_method',
+        backend='classical/simulator',
+        method='run_statevector',
+        kwargs=dict(
+            circuit=TemplatedCircuit(ansatz(0.7), template_id, False)))
+    assert second['kwargs']['circuit']['structure'] is None
+    q2 = server_args_from_wire('circuits.run_backend_method',
+                               **second)['kwargs']['circuit']
+    assert quasar.Circuit.test_equivalence(q2, ansatz(0.7))
+
+    second['kwargs']['circuit']['template_id'] = 'not-a-template'
+    with pytest.raises(UnknownCircuitTemplateError):
+        server_args_from_wire('circuits.run_backend_method', **second)
+
+
+def test_templates_are_checked_and_kept_per_api_key():
+    template_id = circuit_template_id(ansatz(0.1))
+
+    def wire(circuit, api_key, include_structure=True):
+        return client_args_to_wire(
+            'circuits.run_backend_method',
+            backend='classical/simulator',
+            method='run_statevector',
+            kwargs=dict(circuit=TemplatedCircuit(circuit, template_id,
+                                                 include_structure)),
+            api_key=api_key)
+
+    # a structure uploaded under another structure's id is rejected
+    forged = wire(quasar.Circuit().Rx(0, theta=0.1).CX(0, 1).Rz(1, theta=0.1),
+                  'mallory')
+    with pytest.raises(CircuitTemplateMismatchError):
+        server_args_from_wire('circuits.run_backend_method', **forged)
+
+    server_args_from_wire('circuits.run_backend_method',
+                          **wire(ansatz(0.1), 'alice'))
+    q = server_args_from_wire('circuits.run_backend_method',
+                              **wire(ansatz(0.4), 'alice',
+                                     False))['kwargs']['circuit']
+    assert quasar.Circuit.test_equivalence(q, ansatz(0.4))
+    with pytest.raises(UnknownCircuitTemplateError):
+        server_args_from_wire('circuits.run_backend_method',
+                              **wire(ansatz(0.4), 'mallory', False))
+
+
+def test_quasar_backend_uploads_structure_once(local_forge):
+    from qcware.circuits.quasar_backend import QuasarBackend
+    backend = QuasarBackend('classical/simulator', use_templates=True)
+    for theta in (0.1, 0.2, 0.3):
+        result = backend.run_statevector(circuit=ansatz(theta))
+        expected = quasar.QuasarSimulatorBackend().run_statevector(
+            circuit=ansatz(theta))
+        assert np.allclose(result, expected)
+    structures = [
+        call['kwargs']['circuit']['structure'] for call in local_forge.calls
+    ]
+    assert structures[0] is not None
+    assert structures[1:] == [None, None]
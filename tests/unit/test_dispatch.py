@@ -0,0 +1,48 @@
+import asyncio
+import inspect
+import numpy as np
+import pytest
+import quasar
+from qcware.circuits.quasar_backend import AsyncQuasarBackend, QuasarBackend
+
+
+def ghz(nqubit: int) -> quasar.Circuit:
+    q = quasar.Circuit().H(0)
+    for i in range(nqubit - 1):
+        q.CX(i, i + 1)
+    return q
+
+
+def test_forwarded_methods_bind_positional_args(local_forge):
+    assert 'run_statevector' in QuasarBackend.__dict__
+    assert list(inspect.signature(
+        QuasarBackend.run_statevector).parameters)[:2] == ['self', 'circuit']
+    backend = QuasarBackend('classical/simulator')
+    assert np.allclose(backend.run_statevector(ghz(3)),
+                       quasar.QuasarSimulatorBackend().run_statevector(
+                           circuit=ghz(3)))
+    backend.run_measurement(ghz(2), 10)
+    backend.run_measurement_shots(ghz(2), 10, dtype=np.complex64)
+    assert [sorted(call['kwargs']) for call in local_forge.calls
+            ] == [['circuit'], ['circuit', 'nmeasurement'],
+                  ['circuit', 'dtype', 'nmeasurement']]
+
+    with pytest.raises(NotImplementedError):
+        backend.linear_commuting_group([])
+    with pytest.raises(AttributeError):
+        backend.no_such_method
+
+
+def test_async_backend(local_forge):
+    backend = AsyncQuasarBackend('classical/simulator')
+    assert inspect.iscoroutinefunction(AsyncQuasarBackend.run_statevector)
+
+    async def run():
+        return await asyncio.gather(
+            *[backend.run_statevector(ghz(n)) for n in (2, 3, 4)],
+            backend.run_measurement(circuit=ghz(2), nmeasurement=10))
+
+    results = asyncio.run(run())
+    assert [len(r) for r in results[:3]] == [4, 8, 16]
+    assert isinstance(results[3], quasar.ProbabilityHistogram)
+    assert len(local_forge.calls) == 4
@@ -0,0 +1,54 @@
+import numpy as np
+import quasar
+from qcware.circuits.expectation_cache import (PauliExpectationCache,
+                                               expectation_context)
+from qcware.circuits.quasar_backend import QuasarBackend
+
+
+def ansatz(theta: float) -> quasar.Circuit:
+    return quasar.Circuit().Ry(0, theta=theta).CX(0, 1).Rx(2, theta=0.4)
+
+
+def test_cache_eviction():
+    cache = PauliExpectationCache(max_size=2)
+    context = expectation_context(ansatz(0.1))
+    I, X, Y, Z = quasar.Pauli.IXYZ()
+    strings = [list(p.keys())[0] for p in (X[0], Y[1], Z[2])]
+    cache.put(context, strings[0], 0.5)
+    cache.put(context, strings[1], 0.25)
+    assert cache.get(context, strings[0]) == 0.5
+    cache.put(context, strings[2], 0.125)
+    # strings[1] was the least recently used
+    assert cache.get(context, strings[1]) is None
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert expectation_context(ansatz(0.2)) != context
+    assert expectation_context(ansatz(0.1),
+                               statevector=np.ones(8) / 8**0.5) != context
+
+
+def test_backend_sends_only_new_terms(local_forge):
+    backend = QuasarBackend('classical/simulator', expectation_cache=True)
+    simulator = quasar.QuasarSimulatorBackend()
+    I, X, Y, Z = quasar.Pauli.IXYZ()
+    hamiltonian = Z[0] * Z[1] + 0.5 * X[0]
+    for term in (0.25 * Y[2], -0.75 * Z[2] * X[0], 0.1 * Z[1]):
+        hamiltonian = hamiltonian + term
+        value = backend.run_pauli_expectation_value(circuit=ansatz(0.3),
+                                                    pauli=hamiltonian)
+        assert np.isclose(
+            value,
+            simulator.run_pauli_expectation_value(circuit=ansatz(0.3),
+                                                  pauli=hamiltonian))
+    sent = [len(call['kwargs']['pauli']) for call in local_forge.calls]
+    assert sent == [3, 1, 1]
+
+    # new angles or sampled expectation values are not taken from the cache
+    backend.run_pauli_expectation_value(circuit=ansatz(0.5), pauli=hamiltonian)
+    backend.run_pauli_expectation_value(circuit=ansatz(0.3),
+                                        pauli=Z[0] * Z[2],
+                                        nmeasurement=100)
+    assert [call['method'] for call in local_forge.calls[3:]] == [
+        'run_pauli_expectation', 'run_pauli_expectation_value'
+    ]
+    assert len(local_forge.calls[3]['kwargs']['pauli']) == 5
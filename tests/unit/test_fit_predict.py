@@ -0,0 +1,123 @@
+import importlib
+import uuid
+import numpy as np
+import pytest
+import qcware
+
+
+class NearestCentroidService(object):
+    "A stand-in for the qml.fit and qml.predict endpoints"
+    def __init__(self):
+        self.models = {}
+
+    def fit(self, X, model, y=None, parameters={}, backend=None):
+        labels = np.unique(y)
+        model_id = str(uuid.uuid4())
+        self.models[model_id] = (labels,
+                                 np.array([X[y == l].mean(axis=0)
+                                           for l in labels]))
+        return dict(model_id=model_id, model=model, backend=backend)
+
+    def predict(self, model_handle, T):
+        labels, centroids = self.models[model_handle['model_id']]
+        distances = np.linalg.norm(T[:, None, :] - centroids[None, :, :],
+                                   axis=2)
+        return labels[np.argmin(distances, axis=1)]
+
+
+def test_fit_then_predict(local_api):
+    service = NearestCentroidService()
+    local_api.serve(importlib.import_module('qcware.qml.fit'), 'qml.fit',
+                    service.fit)
+    local_api.serve(importlib.import_module('qcware.qml.predict'),
+                    'qml.predict', service.predict)
+    X = np.array([[-1, -2, 2, -1], [-1, -1, 2, 0], [2, 1, -2, -1],
+                  [1, 2, 0, -1]])
+    y = np.array([0, 0, 1, 1])
+    handle = qcware.qml.fit(X=X, y=y, model='QNearestCentroid')
+    assert handle['model'] == 'QNearestCentroid'
+    assert (qcware.qml.predict(handle, X) == y).all()
+    assert (qcware.qml.predict(handle, X[::-1]) == y[::-1]).all()
+    # predictions send only the handle and the test data
+    assert sorted(local_api.calls[-1]) == ['T', 'api_key', 'host',
+                                           'model_handle']
+
+
+def test_predict_stream(local_api, tmp_path):
+    service = NearestCentroidService()
+    local_api.serve(importlib.import_module('qcware.qml.fit'), 'qml.fit',
+                    service.fit)
+    local_api.serve(importlib.import_module('qcware.qml.predict'),
+                    'qml.predict', service.predict)
+    rng = np.random.RandomState(5)
+    y = rng.randint(0, 3, size=60)
+    X = rng.normal(scale=0.1, size=(60, 4)) + y[:, None]
+    path = str(tmp_path / 'T.npy')
+    np.save(path, X)
+    T = np.load(path, mmap_mode='r')
+    chunks = list(
+        qcware.qml.fit_and_predict_stream(X=X,
+                                          y=y,
+                                          model='QNearestCentroid',
+                                          T=T,
+                                          batch_size=7,
+                                          max_in_flight=3))
+    assert [len(c) for c in chunks] == [7] * 8 + [4]
+    assert (np.concatenate(chunks) == y).all()
+    # one fit, then one prediction per batch
+    assert len(local_api.calls) == 10
+
+    handle = qcware.qml.fit(X=X, y=y, model='QNearestCentroid')
+    streamed = qcware.qml.predict_stream(handle, path, batch_size=50)
+    assert (np.concatenate(list(streamed)) == y).all()
+
+    # bad arguments are reported by the call, not on the first batch
+    with pytest.raises(ValueError):
+        qcware.qml.predict_stream(None, X)
+    with pytest.raises(ValueError):
+        qcware.qml.predict_stream(handle, X, batch_size=0)
+
+
+def test_estimator_reuses_fitted_models(local_api, monkeypatch):
+    from qcware.qml.estimators import clear_fit_cache
+    clear_fit_cache()
+    monkeypatch.setenv('QCWARE_API_KEY', 'key')
+    service = NearestCentroidService()
+    local_api.serve(importlib.import_module('qcware.qml.fit'), 'qml.fit',
+                    service.fit)
+    local_api.serve(importlib.import_module('qcware.qml.predict'),
+                    'qml.predict', service.predict)
+    rng = np.random.RandomState(7)
+    y = rng.randint(0, 2, size=30)
+    X = rng.normal(scale=0.1, size=(30, 3)) + y[:, None]
+    estimator = qcware.qml.QNearestCentroid(n_jobs=3)
+    assert estimator.get_params()['n_jobs'] == 3
+    assert (estimator.fit(X, y).predict(X) == y).all()
+    assert list(estimator.classes_) == [0, 1]
+    # a fit and three concurrent predictions
+    assert len(local_api.calls) == 4
+
+    # refitting the same data and settings doesn't upload the data again
+    other = qcware.qml.QNearestCentroid(**estimator.get_params())
+    other.set_params(n_jobs=1).fit(X.copy(), y.copy())
+    assert other.model_handle_ == estimator.model_handle_
+    assert (other.predict(X[:5]) == y[:5]).all()
+    assert len(local_api.calls) == 5
+    other.set_params(parameters=dict(normalize=True)).fit(X, y)
+    assert len(local_api.calls) == 6
+
+
+def test_estimator_fits_are_not_shared_between_api_keys(local_api):
+    from qcware.qml.estimators import clear_fit_cache
+    clear_fit_cache()
+    service = NearestCentroidService()
+    local_api.serve(importlib.import_module('qcware.qml.fit'), 'qml.fit',
+                    service.fit)
+    X = np.array([[0.0, 1.0], [1.0, 0.0]])
+    y = np.array([0, 1])
+    first = qcware.qml.QNearestCentroid(api_key='key-1').fit(X, y)
+    second = qcware.qml.QNearestCentroid(api_key='key-2').fit(X, y)
+    assert first.model_handle_ != second.model_handle_
+    assert [call['api_key'] for call in local_api.calls] == ['key-1', 'key-2']
+    qcware.qml.QNearestCentroid(api_key='key-1').fit(X, y)
+    assert len(local_api.calls) == 2
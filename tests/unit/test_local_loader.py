@@ -0,0 +1,114 @@
+import importlib
+import numpy as np
+import pytest
+import quasar
+from qcware.qio import loader_batch, local_loader
+from qcware.qio.local_loader import (build_loader, build_loader_batch,
+                                     optimized_shape)
+from qcware.util.serialize_quasar import (circuits_to_dict, dict_to_circuits,
+                                          circuits_from_template)
+
+
+def unary_indices(nqubit: int, qubit_pairs) -> list:
+    return [
+        sum(1 << (nqubit - 1 - q) for q in qubits) for qubits in qubit_pairs
+    ]
+
+
+@pytest.mark.parametrize('d', [4, 5, 16])
+def test_loaders_load_data(d):
+    x = np.random.randn(d)
+    x = x / np.linalg.norm(x)
+    simulator = quasar.QuasarSimulatorBackend()
+    statevector = simulator.run_statevector(
+        circuit=local_loader(x, mode='parallel'))
+    nqubit = (len(statevector) - 1).bit_length()
+    indices = unary_indices(nqubit, [(i, ) for i in range(d)])
+    assert np.allclose(statevector[indices], x)
+
+    n1, n2 = optimized_shape(d)
+    statevector = simulator.run_statevector(circuit=local_loader(x))
+    indices = unary_indices(n1 + n2, [(r, n1 + c) for r in range(n1)
+                                      for c in range(n2)])
+    assert np.allclose(statevector[indices[:d]], x)
+    assert np.isclose(np.linalg.norm(statevector), 1.0)
+
+
+def test_local_loader_is_cached():
+    x = np.array([0.5, -0.5, 0.5, 0.5])
+    first = local_loader(x)
+    first.set_parameter_values([0.0] * first.nparameter)
+    second = local_loader(x)
+    assert second.parameter_values == build_loader(x).parameter_values
+    assert local_loader(x, mode='parallel').nqubit == 4
+    with pytest.raises(ValueError):
+        local_loader(x, mode='serial')
+
+
+# The basis states holding x[0], x[1], ... in the statevectors of the
+# local loaders: one qubit per entry for the parallel loader; for the
+# optimized loader, a row and a column qubit per entry, in row-major
+# order.  Only ('optimized', 4) is known from Forge (test_loader.py); the
+# other tables are written out from that layout to catch regressions in
+# the local loaders, not to show parity with Forge
+Loader_indices = {
+    ('parallel', 4): [8, 4, 2, 1],
+    ('parallel', 8): [128, 64, 32, 16, 8, 4, 2, 1],
+    ('optimized', 4): [10, 9, 6, 5],
+    ('optimized', 8): [40, 36, 34, 33, 24, 20, 18, 17],
+    ('optimized', 9): [136, 132, 130, 129, 72, 68, 66, 65, 40],
+}
+
+
+@pytest.mark.parametrize('mode,d', sorted(Loader_indices))
+def test_local_loader_layout(mode, d):
+    x = np.arange(1.0, d + 1) * (-1)**np.arange(d)
+    x = x / np.linalg.norm(x)
+    statevector = quasar.QuasarSimulatorBackend().run_statevector(
+        circuit=local_loader(x, mode=mode))
+    indices = Loader_indices[(mode, d)]
+    assert np.allclose(statevector[indices], x)
+    assert np.isclose(np.linalg.norm(statevector[indices]), 1.0)
+
+
+def test_loader_batch(local_api):
+    local_api.serve(importlib.import_module('qcware.qio.loader_batch'),
+                    'qio.loader_batch', build_loader_batch)
+    data = np.random.randn(6, 12)
+    simulator = quasar.QuasarSimulatorBackend()
+    for mode in ('optimized', 'parallel'):
+        circuits = loader_batch(data=data, mode=mode)
+        assert len(circuits) == 6
+        for row, circuit in zip(data, circuits):
+            assert np.allclose(
+                simulator.run_statevector(circuit=circuit),
+                simulator.run_statevector(circuit=build_loader(row, mode)))
+    assert len(local_api.calls) == 2
+
+    # the circuits are independent of each other
+    circuits[0].set_parameter_values([0.0] * circuits[0].nparameter)
+    assert circuits[1].parameter_values == build_loader(
+        data[1], 'parallel').parameter_values
+
+
+def test_circuits_to_dict():
+    circuits = build_loader_batch(np.random.rand(3, 4))
+    d = circuits_to_dict(circuits)
+    assert d['template'] is not None
+    assert [c.parameter_values for c in dict_to_circuits(d)
+            ] == [c.parameter_values for c in circuits]
+    mixed = circuits_to_dict([circuits[0], quasar.Circuit().H(0)])
+    assert len(dict_to_circuits(mixed)) == 2
+
+    # a controlled composite gate can't be filled in from a template
+    controlled = quasar.Circuit()
+    controlled.add_gate(
+        quasar.ControlledGate(
+            quasar.CompositeGate(quasar.Circuit().Ry(0, theta=0.1))), (0, 1))
+    with pytest.raises(NotImplementedError):
+        circuits_from_template(controlled, np.zeros((1, 1)))
+    d = circuits_to_dict([controlled, controlled.copy()])
+    assert 'template' not in d
+    assert all(
+        quasar.Circuit.test_equivalence(c, controlled)
+        for c in dict_to_circuits(d))
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+import quasar
+from concurrent.futures import ThreadPoolExecutor
+from qcware.circuits.microbatch import MicroBatcher
+from qcware.circuits.quasar_backend import QuasarBackend
+
+
+def test_micro_batcher_coalesces_calls():
+    batches = []
+
+    def run_batch(method, list_of_kwargs):
+        batches.append((method, len(list_of_kwargs)))
+        return [kwargs['x'] * 2 for kwargs in list_of_kwargs]
+
+    batcher = MicroBatcher(run_batch, window=0.05, max_batch_size=4)
+    futures = [batcher.submit('double', dict(x=x)) for x in range(6)]
+    # the first four filled a batch and were sent at once
+    assert batches == [('double', 4)]
+    assert [f.result(timeout=5) for f in futures] == [0, 2, 4, 6, 8, 10]
+    assert batches == [('double', 4), ('double', 2)]
+
+    future = batcher.submit('double', dict(x=1))
+    batcher.flush()
+    assert future.done() and future.result() == 2
+
+
+def test_micro_batcher_propagates_errors():
+    def run_batch(method, list_of_kwargs):
+        raise ValueError(method)
+
+    batcher = MicroBatcher(run_batch, window=0.01)
+    future = batcher.submit('fail', {})
+    with pytest.raises(ValueError):
+        future.result(timeout=5)
+
+
+def test_backend_micro_batches_threads(local_forge):
+    backend = QuasarBackend('classical/simulator',
+                            micro_batch=dict(window=0.2, max_batch_size=8))
+    circuits = [quasar.Circuit().Ry(0, theta=t).CX(0, 1) for t in range(8)]
+    with ThreadPoolExecutor(8) as pool:
+        results = list(
+            pool.map(lambda c: backend.run_statevector(circuit=c), circuits))
+    assert len(local_forge.calls) < len(circuits)
+    simulator = quasar.QuasarSimulatorBackend()
+    for circuit, result in zip(circuits, results):
+        assert np.allclose(result, simulator.run_statevector(circuit=circuit))
+
+
+def test_micro_batches_are_routed_once(local_forge):
+    backend = QuasarBackend('classical/simulator',
+                            micro_batch=dict(window=0.2, max_batch_size=8),
+                            local_routing=dict(threshold=1, learn=False))
+    recorded = []
+    record = backend.router.record
+    backend.router.record = lambda route, nqubit, seconds: (recorded.append(
+        (route, nqubit)), record(route, nqubit, seconds))
+    circuits = [quasar.Circuit().Ry(0, theta=t).CX(0, 1) for t in range(8)]
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda c: backend.run_statevector(circuit=c), circuits))
+    assert len(local_forge.calls) < len(circuits)
+    # one record per call, none for the coalesced batches
+    assert len(recorded) == len(circuits)
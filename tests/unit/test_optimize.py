@@ -0,0 +1,75 @@
+import numpy as np
+import quasar
+from quasar import Circuit
+from qcware.circuits.optimize import optimize_circuit
+from qcware.circuits.quasar_backend import QuasarBackend
+
+
+def statevector(q: Circuit) -> np.ndarray:
+    return quasar.QuasarSimulatorBackend().run_statevector(circuit=q)
+
+
+def test_cancellations_and_merges():
+    q = Circuit().H(0).X(0).X(0).H(0).CX(0, 1).I(1).CX(0, 1).S(2).ST(2)
+    q.Rx(3, theta=0.1).Rx(3, theta=0.2).Rz(3, theta=0.5).Rz(3, theta=-0.5)
+    q2, report = optimize_circuit(q)
+    assert len(q2.gates) == 1
+    assert q2.nqubit == q.nqubit
+    assert np.isclose(q2.gates[((0, ), (3, ))].parameters['theta'], 0.3)
+    assert report.identities_removed == 1
+    assert report.inverse_pairs_cancelled == 4
+    assert report.rotations_merged == 2
+    assert report.gates_removed == len(q.gates) - 1
+    assert np.allclose(statevector(q), statevector(q2))
+
+
+def test_matrix_gates_cancel_only_when_inverse():
+    A = quasar.Matrix.Ry(0.3)
+    B = np.array([[0, 1], [1j, 0]])
+    q = Circuit().U1(0, U=A)
+    q.add_gate(quasar.Gate.U1(B).adjoint(), (0, ))
+    q2, report = optimize_circuit(q)
+    assert report.inverse_pairs_cancelled == 0
+    assert np.allclose(statevector(q), statevector(q2))
+
+    q = Circuit().U1(0, U=A)
+    q.add_gate(quasar.Gate.U1(A).adjoint(), (0, ))
+    q2, report = optimize_circuit(q)
+    assert report.inverse_pairs_cancelled == 1
+
+
+def test_optimized_circuit_is_equivalent():
+    rng = np.random.default_rng(7)
+    q = Circuit()
+    for i in range(200):
+        kind = rng.integers(6)
+        qubit = int(rng.integers(4))
+        if kind == 0:
+            q.CX(qubit, (qubit + 1) % 4)
+        elif kind == 1:
+            q.H(qubit)
+        elif kind == 2:
+            q.S(qubit)
+        elif kind == 3:
+            q.ST(qubit)
+        else:
+            getattr(q, ['Rx', 'Rz'][kind - 4])(qubit,
+                                               theta=rng.uniform(-1, 1))
+    expected = statevector(q)
+    for fuse in [False, True]:
+        q2, report = optimize_circuit(q, fuse_single_qubit=fuse)
+        assert report.ngate_after < report.ngate_before
+        assert np.allclose(expected, statevector(q2))
+    # changing the result doesn't change the input circuit
+    q3, _ = optimize_circuit(q)
+    q3.set_parameter_values([0.0] * q3.nparameter)
+    assert np.allclose(expected, statevector(q))
+
+
+def test_backend_sends_optimized_circuit(local_forge):
+    backend = QuasarBackend('classical/simulator',
+                            optimize_circuits={'fuse_single_qubit': True})
+    q = Circuit().H(0).S(0).T(0).CX(0, 1).Rx(1, theta=0.2).Rx(1, theta=0.3)
+    result = backend.run_statevector(circuit=q)
+    assert np.allclose(result, statevector(q))
+    assert backend.last_optimization_report.ngate_after == 3
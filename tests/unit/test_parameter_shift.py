@@ -0,0 +1,41 @@
+import numpy as np
+import quasar
+from qcware.circuits.quasar_backend import QuasarBackend
+
+
+def ansatz() -> quasar.Circuit:
+    return quasar.Circuit().Ry(0, theta=0.3).CX(0, 1).Rz(1, theta=-0.7).Rx(
+        0, theta=1.1)
+
+
+def test_hessian_in_one_call(local_forge):
+    I, X, Y, Z = quasar.Pauli.IXYZ()
+    pauli = Z[0] * Z[1] + 0.5 * X[0] + 0.25 * Y[1]
+    backend = QuasarBackend('classical/simulator')
+    hessian = backend.run_pauli_expectation_value_hessian(circuit=ansatz(),
+                                                          pauli=pauli)
+    assert len(local_forge.calls) == 1
+    expected = quasar.QuasarSimulatorBackend(
+    ).run_pauli_expectation_value_hessian(circuit=ansatz(), pauli=pauli)
+    assert np.allclose(hessian, expected)
+
+    pairs = [(2, 0), (1, 1), (0, 2)]
+    hessian = backend.run_pauli_expectation_value_hessian(
+        circuit=ansatz(), pauli=pauli, parameter_pair_indices=pairs)
+    assert np.allclose(hessian, expected[[6, 4, 2]])
+
+
+def test_gradient_pauli_contraction_in_one_call(local_forge):
+    I, X, Y, Z = quasar.Pauli.IXYZ()
+    pauli = Z[0] * Z[1] + 0.5 * X[0]
+    coefficients = [0.5, -1.0, 2.0]
+    backend = QuasarBackend('classical/simulator', use_templates=True)
+    gradient = backend.run_pauli_expectation_value_gradient_pauli_contraction(
+        circuit=ansatz(), pauli=pauli, parameter_coefficients=coefficients)
+    assert len(local_forge.calls) == 1
+    expected = quasar.QuasarSimulatorBackend(
+    ).run_pauli_expectation_value_gradient_pauli_contraction(
+        circuit=ansatz(), pauli=pauli, parameter_coefficients=coefficients)
+    assert isinstance(gradient, quasar.PauliExpectation)
+    for key, value in expected.items():
+        assert np.isclose(gradient[key], value)
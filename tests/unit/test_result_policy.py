@@ -0,0 +1,42 @@
+import numpy as np
+import quasar
+from qcware.circuits.quasar_backend import QuasarBackend
+from qcware.util.sparse import SparseAmplitudes
+from qcware.util.transforms.result_policy import select_amplitudes
+
+
+def ghz(nqubit: int) -> quasar.Circuit:
+    q = quasar.Circuit().H(0)
+    for i in range(nqubit - 1):
+        q.CX(i, i + 1)
+    return q
+
+
+def test_select_amplitudes():
+    x = np.array([0.1, -0.7, 0.05, 0.6, 0.3j])
+    assert select_amplitudes(x, top_k=2).indices.tolist() == [1, 3]
+    assert select_amplitudes(x, threshold=0.2).indices.tolist() == [1, 3, 4]
+    selected = select_amplitudes(x, top_k=1, threshold=0.2)
+    assert selected.indices.tolist() == [1]
+    assert np.array_equal(selected.to_dense(), [0, -0.7, 0, 0, 0])
+
+
+def test_reduced_statevector(local_forge):
+    q = quasar.Circuit().Ry(0, theta=0.4).CX(0, 1).H(2)
+    expected = quasar.QuasarSimulatorBackend().run_statevector(circuit=q)
+    backend = QuasarBackend('classical/simulator')
+    single = backend.run_statevector(q, result_policy=dict(dtype='complex64'))
+    assert single.dtype == np.complex64
+    assert np.allclose(single, expected, atol=1e-6)
+
+    top = backend.run_statevector(q, result_policy=dict(top_k=2))
+    assert isinstance(top, SparseAmplitudes)
+    largest = np.argsort(-np.abs(expected))[:2]
+    assert top.indices.tolist() == sorted(largest.tolist())
+    assert np.allclose(top.values, expected[top.indices])
+
+    routed = QuasarBackend('classical/simulator', local_routing=True)
+    local = routed.run_statevector(q, result_policy=dict(threshold=0.1))
+    assert isinstance(local, SparseAmplitudes)
+    assert np.allclose(local.to_dense(),
+                       np.where(np.abs(expected) >= 0.1, expected, 0))
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+import quasar
+from qcware.circuits.quasar_backend import QuasarBackend
+from qcware.circuits.router import LatencyRouter, Local, Remote, call_nqubit
+
+
+def ghz(nqubit: int) -> quasar.Circuit:
+    q = quasar.Circuit().H(0)
+    for i in range(nqubit - 1):
+        q.CX(i, i + 1)
+    return q
+
+
+def test_router_learns_crossover():
+    router = LatencyRouter(threshold=4, explore_every=2, max_local_nqubit=10)
+    assert router.choose(4) == Local
+    assert router.choose(6) == Remote
+    assert router.choose(11) == Remote
+    assert router.choose(None) == Remote
+    # the second call next to the threshold explores the other route
+    assert [router.choose(5) for _ in range(2)] == [Remote, Local]
+
+    router.record(Remote, 5, 1.0)
+    router.record(Local, 5, 0.1)
+    assert router.threshold == 5
+    router.record(Local, 5, 10.0)
+    router.record(Local, 5, 10.0)
+    assert router.threshold == 4
+
+    fixed = LatencyRouter(threshold=4, learn=False)
+    assert [fixed.choose(5) for _ in range(40)] == [Remote] * 40
+
+
+def test_call_nqubit():
+    assert call_nqubit(dict(circuit=ghz(3))) == 3
+    assert call_nqubit(dict(circuit=ghz(3), nqubit=5)) == 5
+    assert call_nqubit(dict(statevector=np.zeros(16))) == 4
+    assert call_nqubit(dict(pauli=None)) is None
+
+
+def test_backend_routes_small_circuits_locally(local_forge):
+    backend = QuasarBackend('classical/simulator',
+                            local_routing=dict(threshold=3, learn=False))
+    local = backend.run_statevector(circuit=ghz(3))
+    assert len(local_forge.calls) == 0
+    remote = QuasarBackend('classical/simulator').run_statevector(
+        circuit=ghz(3))
+    assert np.array_equal(local, remote)
+    assert len(local_forge.calls) == 1
+
+    backend.run_statevector(circuit=ghz(4))
+    assert len(local_forge.calls) == 2
+    backend.run_batch('run_statevector', [dict(circuit=ghz(2))] * 3)
+    assert len(local_forge.calls) == 2
+
+    with pytest.raises(ValueError):
+        QuasarBackend('vulcan/simulator', local_routing=True)
@@ -1,11 +1,17 @@
 import inspect
+import json
+import pytest
 from random import uniform
-from quasar import Circuit, CompositeGate, ControlledGate, Gate
-from qcware.util.serialize_quasar import (quasar_to_sequence,
-                                          sequence_to_quasar, base_gate_name,
-                                          num_adjoints, make_gate,
-                                          quasar_to_string, string_to_quasar,
-                                          Canonical_gate_names)
+import numpy as np
+from quasar import (Circuit, CompositeGate, ControlledGate, Gate,
+                    ProbabilityHistogram, CountHistogram)
+from qcware.util.serialize_quasar import (
+    quasar_to_sequence, sequence_to_quasar, base_gate_name, num_adjoints,
+    make_gate, quasar_to_string, string_to_quasar, Canonical_gate_names,
+    quasar_to_compact_string, quasar_to_bytes, bytes_to_quasar,
+    gates_to_quasar, q_instruction_to_s, quasar_to_dict, dict_to_quasar,
+    circuit_fingerprint, circuit_structure_fingerprint,
+    probability_histogram_to_dict, dict_to_probability_histogram)
 from scipy.stats import unitary_group
 
 
@@ -119,3 +125,161 @@ def test_all_canonical_gates():
     # print(s2)
     q3 = string_to_quasar(s2)
     assert Circuit.test_equivalence(q, q3)
+
+    q4 = string_to_quasar(quasar_to_compact_string(q))
+    assert Circuit.test_equivalence(q, q4)
+    assert list(quasar_to_sequence(q4)) == s
+
+
+def test_compact_format_with_subcircuits():
+    cg = CompositeGate(Circuit().CF(0, 1, theta=0.42).CX(1, 0),
+                       name='PS',
+                       ascii_symbols=['P', 'S'])
+    q = Circuit().H(0).Rx(1, theta=0.1)
+    q.add_gate(cg, (1, 2))
+    q.add_gate(ControlledGate(Gate.Ry(0.3)), (3, 0), times=(5, ))
+    q.Rz(-2, theta=-0.7)
+    q2 = bytes_to_quasar(quasar_to_bytes(q))
+    assert Circuit.test_equivalence(q, q2)
+    assert list(q2.qubits) == list(q.qubits)
+    assert list(q2.times) == list(q.times)
+    assert list(q2.times_and_qubits) == list(q.times_and_qubits)
+    assert q2.parameter_values == q.parameter_values
+
+
+def test_compact_format_shares_side_table_entries():
+    U, V = unitary_group.rvs(2), unitary_group.rvs(4)
+    q = Circuit()
+    for i in range(10):
+        q.U1(i % 3, U=U).U2(3, 4, U=V)
+    q.U1(0, U=unitary_group.rvs(2))
+    b = quasar_to_bytes(q)
+    header_length = int.from_bytes(b[4:8], 'little')
+    header = json.loads(b[8:8 + header_length].decode('utf-8'))
+    assert len(header['side_table']) == 3
+    assert Circuit.test_equivalence(q, bytes_to_quasar(b))
+
+
+def test_probability_histogram_roundtrip():
+    h = ProbabilityHistogram(nqubit=30,
+                             histogram={
+                                 0: 0.25,
+                                 5: 0.5,
+                                 2**30 - 1: 0.25
+                             },
+                             nmeasurement=4)
+    d = probability_histogram_to_dict(h)
+    assert d['outcomes']['dtype'] == np.dtype(np.uint64).str
+    h2 = dict_to_probability_histogram(d)
+    assert isinstance(h2, ProbabilityHistogram)
+    assert h2.nqubit == 30 and h2.nmeasurement == 4
+    assert h2.histogram == h.histogram
+    assert all(isinstance(k, int) for k in h2.histogram.keys())
+    assert all(isinstance(v, float) for v in h2.histogram.values())
+
+
+def test_count_histogram_roundtrip():
+    h = CountHistogram(nqubit=2, histogram={0: 3, 3: 5}, nmeasurement=8)
+    h2 = dict_to_probability_histogram(probability_histogram_to_dict(h))
+    assert isinstance(h2, CountHistogram)
+    assert h2.histogram == h.histogram
+
+
+def test_legacy_probability_histogram_dict():
+    d = dict(nqubit=2, histogram={'0': 0.5, '3': 0.5}, nmeasurement=None)
+    h = dict_to_probability_histogram(d)
+    assert h.histogram == {0: 0.5, 3: 0.5}
+
+
+def test_gates_to_quasar():
+    q = Circuit().H(0).CX(0, 2).Ry(1, theta=0.2).SWAP(1, 2)
+    q2 = gates_to_quasar(list(q.gates.items()))
+    assert Circuit.test_equivalence(q, q2)
+    assert list(q2.qubits) == list(q.qubits)
+    assert list(q2.times) == list(q.times)
+    assert list(q2.times_and_qubits) == list(q.times_and_qubits)
+
+    with pytest.raises(RuntimeError):
+        gates_to_quasar([(((0, ), (0, )), Gate.H),
+                         (((0, ), (1, 0)), Gate.CX)])
+
+
+def test_make_gate_shares_only_parameterless_gates():
+    assert make_gate('H', {}) is make_gate('H', {})
+    U = unitary_group.rvs(2)
+    u1 = q_instruction_to_s(((0, ), (0, )), Gate.U1(U))['parameters']
+    assert make_gate('U1', u1) is make_gate('U1', u1)
+    assert np.allclose(make_gate('U1', u1).operator, U)
+    # the shared U1/U2 gates are keyed by a digest, not the encoded matrix
+    from qcware.util.serialize_quasar import _matrix_gate_cache
+    assert all(u1['U']['ndarray'] not in key for key in _matrix_gate_cache)
+
+    rx1 = make_gate('Rx', {'theta': 0.1})
+    rx2 = make_gate('Rx', {'theta': 0.2})
+    assert rx1 is not rx2
+    assert rx1.parameters['theta'] == 0.1 and rx2.parameters['theta'] == 0.2
+    assert Gate.test_operator_equivalence(rx2, Gate.Rx(0.2))
+    # u3 given only some parameters keeps the defaults for the others
+    assert make_gate('u3', {'phi': 0.3}).parameters == Gate.u3(
+        phi=0.3).parameters
+
+    q = sequence_to_quasar(
+        quasar_to_sequence(Circuit().Ry(0, theta=0.1).Ry(1, theta=0.1)))
+    q.set_parameter_values([0.5], parameter_indices=[0])
+    assert q.parameter_values == [0.5, 0.1]
+
+
+def test_repeated_subcircuits_are_defined_once():
+    layer = CompositeGate(Circuit().Ry(0, theta=0.2).CX(0, 1).Ry(1,
+                                                                 theta=0.4),
+                          name='layer')
+    q = Circuit()
+    for i in range(20):
+        q.add_gate(layer, (i % 3, i % 3 + 1))
+        q.add_gate(ControlledGate(Gate.Rz(0.1)), (5, 6))
+    d = quasar_to_dict(q)
+    assert len(d['definitions']) == 2
+    assert len(string_to_quasar(quasar_to_string(q)).gates) == 40
+
+    for q2 in [dict_to_quasar(d), bytes_to_quasar(quasar_to_bytes(q))]:
+        assert Circuit.test_equivalence(q, q2)
+        assert q2.parameter_values == q.parameter_values
+        # each use of a definition has its own parameters
+        values = list(q2.parameter_values)
+        values[0] = 0.5
+        q2.set_parameter_values(values)
+        assert q2.parameter_values == values
+
+    nested = Circuit().H(0)
+    nested.add_gate(CompositeGate(q), tuple(range(7)))
+    nested.add_gate(layer, (2, 3))
+    assert len(quasar_to_dict(nested)['definitions']) == 3
+    assert Circuit.test_equivalence(nested,
+                                    string_to_quasar(quasar_to_string(nested)))
+
+
+def test_circuit_fingerprint():
+    def ansatz(theta, phi=0.0):
+        q = Circuit().Ry(0, theta=theta).CX(0, 1).Rz(1, theta=phi)
+        q.add_gate(ControlledGate(Gate.Rx(theta)), (2, 1))
+        q.add_gate(CompositeGate(Circuit().Ry(0, theta=theta).H(1)), (3, 4))
+        return q
+
+    fingerprint = circuit_fingerprint(ansatz(1.0, 0.0))
+    assert circuit_fingerprint(ansatz(1, -0.0)) == fingerprint
+    assert circuit_fingerprint(ansatz(np.float32(1.0))) == fingerprint
+    assert circuit_fingerprint(string_to_quasar(quasar_to_string(
+        ansatz(1.0)))) == fingerprint
+    assert circuit_fingerprint(ansatz(1.1)) != fingerprint
+    assert circuit_fingerprint(ansatz(1.0, 0.1)) != fingerprint
+    assert circuit_structure_fingerprint(
+        ansatz(1.1, 0.1)) == circuit_structure_fingerprint(ansatz(1.0))
+    assert circuit_structure_fingerprint(ansatz(1.0)) != fingerprint
+
+    assert circuit_fingerprint(Circuit().CX(0, 1)) != circuit_fingerprint(
+        Circuit().CX(1, 0))
+    assert circuit_fingerprint(Circuit().H(0).H(1)) != circuit_fingerprint(
+        Circuit().H(0).H(1, time_placement='next'))
+    U = unitary_group.rvs(2)
+    assert circuit_structure_fingerprint(Circuit().U1(
+        0, U=U)) != circuit_structure_fingerprint(Circuit().U1(0, U=U.T))
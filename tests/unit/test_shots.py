@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+import quasar
+from qcware.util.shots import (MeasurementShots, indices_to_packed_shots,
+                               packed_shots_to_indices,
+                               measurement_shots_to_dict,
+                               dict_to_measurement_shots,
+                               merge_probability_histograms,
+                               split_nmeasurement)
+from qcware.circuits.backend_extensions import run_measurement_shots
+from qcware.circuits.quasar_backend import QuasarBackend
+
+
+def test_packed_shot_indices_roundtrip():
+    nqubit = 11
+    indices = np.random.randint(0, 2**nqubit, size=100).astype(np.uint64)
+    shots = indices_to_packed_shots(indices, nqubit)
+    assert shots.shape == (100, 2)
+    assert shots.dtype == np.uint8
+    assert (packed_shots_to_indices(shots, nqubit) == indices).all()
+    # qubit 0 is the most significant bit
+    bits = MeasurementShots(nqubit, shots).bits()
+    assert (bits[:, 0] == (indices >> np.uint64(nqubit - 1))).all()
+
+
+def test_shot_statistics():
+    # |00>, |11>, |11>, |01>
+    shots = indices_to_packed_shots(np.array([0, 3, 3, 1]), 2)
+    s = dict_to_measurement_shots(
+        measurement_shots_to_dict(MeasurementShots(2, shots)))
+    h = s.histogram()
+    assert h.histogram == {0: 0.25, 1: 0.25, 3: 0.5}
+    assert h.nmeasurement == 4
+    assert np.allclose(s.marginals(), [0.5, 0.75])
+    assert np.allclose(s.correlations(), [[1.0, 0.5], [0.5, 1.0]])
+
+
+def test_run_measurement_shots_on_simulator():
+    q = quasar.Circuit().H(0).CX(0, 1)
+    s = run_measurement_shots(quasar.QuasarSimulatorBackend(),
+                              circuit=q,
+                              nmeasurement=1000)
+    assert s.nmeasurement == 1000
+    assert set(s.indices().tolist()) <= {0, 3}
+    assert np.allclose(s.correlations()[0, 1], 1.0)
+
+
+def test_merge_probability_histograms():
+    assert split_nmeasurement(10, 4) == [3, 3, 2, 2]
+    assert split_nmeasurement(2, 4) == [1, 1]
+    a = quasar.ProbabilityHistogram(2, {0: 0.5, 3: 0.5}, 100)
+    b = quasar.ProbabilityHistogram(2, {1: 0.25, 3: 0.75}, 300)
+    merged = merge_probability_histograms([a, b])
+    assert merged.nmeasurement == 400
+    assert merged.histogram == {0: 0.125, 1: 0.1875, 3: 0.6875}
+
+
+def test_sharded_run_measurement(local_forge):
+    q = quasar.Circuit().H(0).CX(0, 1)
+    backend = QuasarBackend('classical/simulator')
+    with pytest.raises(ValueError):
+        backend.run_measurement(q, 0, parallel_shards=4)
+    with pytest.raises(ValueError):
+        backend.run_measurement(q, 1000, parallel_shards=0)
+    h = backend.run_measurement(q, 1000, parallel_shards=4)
+    assert h.nmeasurement == 1000
+    assert set(h.histogram) <= {0, 3}
+    assert sorted(call['kwargs']['nmeasurement']
+                  for call in local_forge.calls) == [250] * 4
+    s = backend.run_measurement(circuit=q,
+                                nmeasurement=101,
+                                return_shots=True,
+                                shard_backends=['classical/simulator'] * 2)
+    assert s.nmeasurement == 101
@@ -0,0 +1,55 @@
+import numpy as np
+import quasar
+from qcware.circuits.statevector import (marginal_probabilities,
+                                         measurement_histogram,
+                                         pauli_diagonal, pauli_expectation,
+                                         pauli_expectation_value, pauli_sigma,
+                                         probabilities, qubit_marginals)
+
+
+def circuit() -> quasar.Circuit:
+    return quasar.Circuit().Ry(0, theta=0.3).CX(0, 1).Rx(2, theta=0.7).H(
+        3).CZ(2, 3).Ry(1, theta=1.1)
+
+
+def test_pauli_functions_match_quasar():
+    simulator = quasar.QuasarSimulatorBackend()
+    statevector = simulator.run_statevector(circuit=circuit())
+    I, X, Y, Z = quasar.Pauli.IXYZ()
+    pauli = 0.5 * X[0] * Y[2] + Z[1] + 0.3 * Y[3] * Z[0] * X[1] + 0.2 * I[0]
+    expected = simulator.run_pauli_expectation(circuit=circuit(),
+                                               pauli=pauli,
+                                               nqubit=4)
+    result = pauli_expectation(statevector, pauli)
+    assert all(np.isclose(result[s], expected[s]) for s in pauli.keys())
+    assert np.isclose(
+        pauli_expectation_value(statevector, pauli),
+        simulator.run_pauli_expectation_value(circuit=circuit(),
+                                              pauli=pauli,
+                                              nqubit=4))
+    assert np.allclose(
+        pauli_sigma(statevector, pauli),
+        simulator.run_pauli_sigma(pauli=pauli,
+                                  statevector=statevector,
+                                  nqubit=4))
+    diagonal_pauli = pauli + Z[0] * Z[3]
+    assert np.allclose(
+        pauli_diagonal(diagonal_pauli, nqubit=4),
+        simulator.run_pauli_diagonal(pauli=diagonal_pauli, nqubit=4))
+
+
+def test_marginals_and_histograms():
+    statevector = quasar.QuasarSimulatorBackend().run_statevector(
+        circuit=circuit())
+    p = probabilities(statevector).reshape(2, 2, 2, 2)
+    assert np.allclose(
+        marginal_probabilities(statevector, [2, 0]).reshape(2, 2),
+        p.sum(axis=(1, 3)).T)
+    assert np.allclose(qubit_marginals(statevector),
+                       [p[1].sum(), p[:, 1].sum(), p[:, :, 1].sum(), 0.5])
+    ideal = measurement_histogram(statevector)
+    assert np.isclose(sum(ideal.histogram.values()), 1.0)
+    sampled = measurement_histogram(statevector, 1000,
+                                    np.random.RandomState(0))
+    assert sampled.nmeasurement == 1000
+    assert set(sampled.histogram) <= set(ideal.histogram)
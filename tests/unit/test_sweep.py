@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+import quasar
+from qcware.circuits.quasar_backend import QuasarBackend
+
+
+def test_pauli_expectation_value_sweep(local_forge):
+    circuit = quasar.Circuit().Ry(0, theta=0.0).CX(0, 1).Rz(1, theta=0.0)
+    I, X, Y, Z = quasar.Pauli.IXYZ()
+    pauli = Z[0] * Z[1] + 0.5 * X[0] + 0.25 * Y[1]
+    parameter_matrix = np.random.default_rng(3).uniform(-np.pi, np.pi,
+                                                        (7, 2))
+    backend = QuasarBackend('classical/simulator')
+    values = backend.run_pauli_expectation_value_sweep(
+        circuit, pauli, parameter_matrix)
+    assert len(local_forge.calls) == 1
+    assert values.shape == (7, )
+
+    simulator = quasar.QuasarSimulatorBackend()
+    expected = []
+    for row in parameter_matrix:
+        circuit.set_parameter_values(list(row))
+        expected.append(
+            simulator.run_pauli_expectation_value(circuit=circuit,
+                                                  pauli=pauli))
+    assert np.allclose(values, expected)
+
+    # a sweep over the second parameter only
+    values = backend.run_pauli_expectation_value_sweep(
+        circuit, pauli, parameter_matrix[:, 1:], parameter_indices=[1])
+    circuit.set_parameter_values([parameter_matrix[0, 1]],
+                                 parameter_indices=[1])
+    assert np.isclose(
+        values[0],
+        simulator.run_pauli_expectation_value(circuit=circuit, pauli=pauli))
+
+    with pytest.raises(ValueError):
+        backend.run_pauli_expectation_value_sweep(circuit, pauli,
+                                                  parameter_matrix[:, :1])